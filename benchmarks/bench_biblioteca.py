@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import random
+import shutil
+import tempfile
+from biblioteca import Biblioteca
+from indice_biblioteca import IndiceBiblioteca
+
+NUM_FAIXAS = 30000
+
+
+def criar_colecao(pasta):
+    nomes = [f"faixa_{i:05d}.mp3" for i in range(NUM_FAIXAS)]
+    random.shuffle(nomes)
+    for nome in nomes:
+        with open(os.path.join(pasta, nome), 'wb') as f:
+            f.write(b'ID3')  # Sem tags válidas: o mutagen falha e os metadados padrão são usados
+    return nomes
+
+
+def medir(pasta, arquivo_indice):
+    tempos = {}
+    inicio = time.perf_counter()
+    Biblioteca(IndiceBiblioteca(arquivo_indice)).carregar_diretorio(pasta)
+    tempos['primeira leitura'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    Biblioteca(IndiceBiblioteca(arquivo_indice)).carregar_diretorio(pasta)
+    tempos['reabertura'] = time.perf_counter() - inicio
+
+    nomes = sorted(os.listdir(pasta))
+    for nome in nomes[:100]:
+        os.remove(os.path.join(pasta, nome))
+    for nome in nomes[100:200]:
+        with open(os.path.join(pasta, nome), 'ab') as f:
+            f.write(b'\0')
+    inicio = time.perf_counter()
+    Biblioteca(IndiceBiblioteca(arquivo_indice)).carregar_diretorio(pasta)
+    tempos['reabertura (100 alterados, 100 apagados)'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    Biblioteca().carregar_diretorio(pasta)
+    tempos['sem índice'] = time.perf_counter() - inicio
+    return tempos
+
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    try:
+        musicas = os.path.join(pasta, 'musicas')
+        os.makedirs(musicas)
+        criar_colecao(musicas)
+        tempos = medir(musicas, os.path.join(pasta, 'biblioteca.sqlite3'))
+        print(f"Biblioteca.carregar_diretorio com {NUM_FAIXAS} faixas")
+        for nome, segundos in tempos.items():
+            print(f"  {nome:42}: {segundos * 1000:9.1f} ms")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
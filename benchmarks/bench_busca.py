@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import random
+from biblioteca import Musica
+from busca_texto import IndiceTexto
+
+NUM_FAIXAS = 100000
+CONSULTAS = ('amor', 'amor noite', 'coracao azul mar', 'artista 42 rock', 'sol lua vento album 7')
+REPETICOES = 50
+
+PALAVRAS = ['amor', 'noite', 'azul', 'mar', 'sol', 'lua', 'rio', 'vento', 'fogo', 'terra',
+            'coração', 'saudade', 'estrada', 'cidade', 'sonho', 'tempo', 'canção', 'luz', 'céu', 'flor']
+GENEROS = ['Rock', 'MPB', 'Samba', 'Jazz', 'Forró', 'Eletrônica']
+
+
+def criar_musicas():
+    random.seed(1)
+    return [Musica(f"{i}.mp3", {'titulo': ' '.join(random.sample(PALAVRAS, 3)),
+                                'artista': f"Artista {i % 2000}", 'album': f"Álbum {i % 8000}",
+                                'genero': GENEROS[i % len(GENEROS)], 'duracao': 0})
+            for i in range(NUM_FAIXAS)]
+
+
+def busca_linear(musicas, termo):
+    """A busca antiga: substring no título, varrendo todas as músicas."""
+    return [m for m in musicas if termo.lower() in m.metadados['titulo'].lower()]
+
+
+def medir(musicas):
+    tempos = {}
+    inicio = time.perf_counter()
+    indice = IndiceTexto(musicas)
+    tempos['construir'] = time.perf_counter() - inicio
+    for termo in CONSULTAS:
+        inicio = time.perf_counter()
+        for _ in range(REPETICOES):
+            resultado = indice.buscar(termo)
+        tempos[f"'{termo}' ({len(resultado)})"] = (time.perf_counter() - inicio) / REPETICOES
+    inicio = time.perf_counter()
+    for _ in range(5):
+        busca_linear(musicas, 'amor')
+    tempos['busca linear antiga (amor)'] = (time.perf_counter() - inicio) / 5
+    return tempos
+
+
+if __name__ == '__main__':
+    print(f"IndiceTexto com {NUM_FAIXAS} faixas")
+    for nome, segundos in medir(criar_musicas()).items():
+        print(f"  {nome:36}: {segundos * 1000:9.2f} ms")
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import time
+import numpy as np
+import pygame
+from motor_buffer import MotorBuffer
+
+TAXA = 44100
+CANAIS = 2
+DURACAO_FAIXA = 30.0
+
+
+def faixa():
+    return (np.random.randn(int(TAXA * DURACAO_FAIXA), CANAIS) * 4000).astype(np.int16)
+
+
+def medir_normal(motor, dados, blocos):
+    motor._dados = dados
+    motor._dados_seguinte = None
+    motor._proximo_quadro = 0
+    inicio = time.perf_counter()
+    for _ in range(blocos):
+        if motor._proximo_bloco() is None:
+            motor._proximo_quadro = 0
+    return (time.perf_counter() - inicio) / blocos
+
+
+def medir_crossfade(motor, atual, seguinte, repeticoes):
+    """Custo médio por bloco durante a sobreposição, incluindo a troca (cálculo das rampas)."""
+    fade = motor._quadros_crossfade()
+    total = 0.0
+    blocos = 0
+    for _ in range(repeticoes):
+        motor._dados = atual
+        motor._dados_seguinte = seguinte
+        motor._proximo_quadro = len(atual) - fade
+        motor._saindo = None
+        inicio = time.perf_counter()
+        motor._proximo_bloco()
+        blocos += 1
+        while motor._saindo is not None:
+            motor._proximo_bloco()
+            blocos += 1
+        total += time.perf_counter() - inicio
+    return total / blocos
+
+
+if __name__ == '__main__':
+    pygame.mixer.init(frequency=TAXA, channels=CANAIS)
+    motor = MotorBuffer()
+    atual, seguinte = faixa(), faixa()
+    duracao_bloco = motor.quadros_por_bloco / motor.frame_rate
+    print(f"MotorBuffer ({motor.frame_rate} Hz, {motor.channels} canais, blocos de {duracao_bloco * 1000:.0f} ms)")
+
+    por_bloco = medir_normal(motor, atual, 500)
+    print(f"  reprodução normal:  {por_bloco * 1e6:8.1f} us/bloco "
+          f"({por_bloco / duracao_bloco * 100:.3f}% de um núcleo em tempo real)")
+    for segundos in (2, 6, 12):
+        motor.duracao_crossfade = segundos
+        por_bloco = medir_crossfade(motor, atual, seguinte, 5)
+        print(f"  crossfade de {segundos:2d} s: {por_bloco * 1e6:8.1f} us/bloco "
+              f"({por_bloco / duracao_bloco * 100:.3f}% de um núcleo em tempo real)")
+    motor.encerrar()
@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import numpy as np
+from equalizador import Equalizador3Bandas
+
+TAXA = 44100
+CANAIS = 2
+
+
+def medir(duracao_bloco, repeticoes=500):
+    quadros = int(TAXA * duracao_bloco)
+    bloco = (np.random.randn(quadros, CANAIS) * 4000).astype(np.int16)
+    eq = Equalizador3Bandas(TAXA, CANAIS)
+    eq.set_ganhos(4.0, -3.0, 6.0)
+
+    eq.processar(bloco)  # aquece o cache do espectro do kernel
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        eq.processar(bloco)
+    por_bloco = (time.perf_counter() - inicio) / repeticoes
+    return por_bloco, por_bloco / duracao_bloco
+
+
+if __name__ == '__main__':
+    print(f"Equalizador 3 bandas ({TAXA} Hz, {CANAIS} canais)")
+    for duracao_bloco in (0.02, 0.05, 0.1, 0.2):
+        por_bloco, fracao = medir(duracao_bloco)
+        print(f"  bloco de {duracao_bloco * 1000:5.0f} ms: {por_bloco * 1e6:8.1f} us/bloco "
+              f"({fracao * 100:.2f}% de um núcleo em tempo real)")
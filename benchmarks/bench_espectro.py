@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import numpy as np
+from espectro import janela_hanning, plano_bandas, plano_multirresolucao, EspectroMultirresolucao
+
+TAXA = 44100
+QUADROS_POR_SEGUNDO = 30
+
+
+def ler(pcm, inicio, fim):
+    """Como as fontes de amostras do player: canal esquerdo do PCM int16 intercalado."""
+    return np.asarray(pcm[inicio:fim, 0], dtype=np.float32)
+
+
+def medir_fft(pcm, num_barras, repeticoes):
+    """Modo 'fft': janela de 4096 amostras lida inteira a cada quadro."""
+    avanco = TAXA // QUADROS_POR_SEGUNDO
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        fim = 4096 + i * avanco
+        fft = np.abs(np.fft.rfft(ler(pcm, fim - 4096, fim) * janela_hanning(4096)))
+        bins, bandas, pesos = plano_bandas(len(fft), TAXA, num_barras)
+        np.bincount(bandas, weights=fft[bins], minlength=num_barras) * pesos
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def medir_multirresolucao(pcm, num_barras, repeticoes):
+    """Modo 'multirresolucao': só as amostras novas de cada quadro são lidas e processadas."""
+    avanco = TAXA // QUADROS_POR_SEGUNDO
+    analisador = EspectroMultirresolucao(TAXA, num_barras)
+    analisador.alimentar(ler(pcm, 0, analisador.historico), analisador.historico)
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        fim = analisador.historico + (i + 1) * avanco
+        analisador.alimentar(ler(pcm, fim - avanco, fim), fim)
+        analisador.bandas()
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def medir_plano(num_barras):
+    plano_multirresolucao.cache_clear()
+    inicio = time.perf_counter()
+    plano_multirresolucao(TAXA, num_barras)
+    return time.perf_counter() - inicio
+
+
+if __name__ == '__main__':
+    repeticoes = 1000
+    quadros = 20000 + repeticoes * TAXA // QUADROS_POR_SEGUNDO
+    pcm = (np.random.randn(quadros, 2) * 4000).astype(np.int16)
+    print(f"Espectro por quadro ({TAXA} Hz, {QUADROS_POR_SEGUNDO} quadros/s)")
+    for num_barras in (40, 80):
+        fft = medir_fft(pcm, num_barras, repeticoes)
+        multi = medir_multirresolucao(pcm, num_barras, repeticoes)
+        print(f"  {num_barras} barras: fft {fft * 1e6:7.1f} us/quadro, "
+              f"multirresolução {multi * 1e6:7.1f} us/quadro "
+              f"(kernels montados em {medir_plano(num_barras) * 1000:.2f} ms)")
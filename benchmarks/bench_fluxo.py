@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import wave
+import shutil
+import tempfile
+import numpy as np
+from saida_audio import SaidaNula
+from cache_pcm import CachePCM
+from audio import AudioPlayer
+
+TAXA = 44100
+CANAIS = 2
+DURACAO = 20 * 60.0  # Faixa longa: 20 min (~200 MB de PCM)
+VELOCIDADE = 50.0
+TRECHO = 60.0  # Segundos de áudio tocados depois de cada início
+
+
+def gerar_faixa(caminho):
+    with wave.open(caminho, 'wb') as wav:
+        wav.setnchannels(CANAIS)
+        wav.setsampwidth(2)
+        wav.setframerate(TAXA)
+        bloco = (np.random.randn(TAXA * 60, CANAIS) * 4000).astype(np.int16)
+        for _ in range(int(DURACAO // 60)):
+            wav.writeframes(bloco.tobytes())
+
+
+def medir(pasta, caminho, motor):
+    saida = SaidaNula(TAXA, CANAIS, velocidade=VELOCIDADE)
+    player = AudioPlayer.reiniciar(saida)
+    player.cache_pcm = CachePCM(pasta=os.path.join(pasta, 'cache_' + motor))
+    player.set_motor_reproducao(motor)
+
+    inicio = time.perf_counter()
+    player.carregar_musica(caminho).result(timeout=300)
+    player.play().result(timeout=5)
+    while saida.posicao() == 0:
+        time.sleep(0.0005)
+    ate_tocar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    player.seek(DURACAO / 2).result(timeout=5)
+    posicao_antes = saida.posicao()
+    while saida.posicao() == posicao_antes:
+        time.sleep(0.0005)
+    ate_tocar_busca = time.perf_counter() - inicio
+
+    time.sleep(TRECHO / VELOCIDADE)
+    fluxo = player.get_estatisticas_fluxo()
+    subexecucoes = player._motor_buffer.subexecucoes
+    player.quit()
+    AudioPlayer._instance = None
+    return ate_tocar, ate_tocar_busca, subexecucoes, fluxo
+
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    try:
+        caminho = os.path.join(pasta, 'longa.wav')
+        gerar_faixa(caminho)
+        print(f"Faixa de {DURACAO / 60:.0f} min ({os.path.getsize(caminho) / 2 ** 20:.0f} MB), saída nula a {VELOCIDADE:.0f}x")
+        for motor in ('buffer', 'fluxo'):
+            ate_tocar, ate_tocar_busca, subexecucoes, fluxo = medir(pasta, caminho, motor)
+            print(f"  {motor:6}: primeiro som em {ate_tocar * 1000:8.1f} ms, depois de busca em "
+                  f"{ate_tocar_busca * 1000:6.1f} ms, {subexecucoes} subexecuções")
+            if fluxo:
+                print(f"          memória máx. {fluxo['memoria_max_bytes'] / 2 ** 20:.2f} MB, {fluxo['paradas']} paradas, "
+                      f"recarga média {fluxo['latencia_recarga_media_ms']:.1f} ms")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
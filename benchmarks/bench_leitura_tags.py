@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import shutil
+import tempfile
+from mutagen import File
+from mutagen.easyid3 import EasyID3
+from biblioteca import ler_metadados, ler_metadados_em_lotes
+
+NUM_ARQUIVOS = 2000
+QUADRO_MP3 = b'\xff\xfb\x90\x64' + b'\x00' * 413  # MPEG-1 camada III, 128 kbps, 44.1 kHz, silêncio
+
+
+def criar_corpus(pasta):
+    caminhos = []
+    for i in range(NUM_ARQUIVOS):
+        caminho = os.path.join(pasta, f"faixa_{i:05d}.mp3")
+        with open(caminho, 'wb') as f:
+            f.write(QUADRO_MP3 * 200)
+        tags = EasyID3()
+        tags['title'] = f"Faixa {i}"
+        tags['artist'] = f"Artista {i % 50}"
+        tags['album'] = f"Álbum {i % 200}"
+        tags['genre'] = 'Rock'
+        tags.save(caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def ler_duas_vezes(caminho):
+    """Leitura anterior: um File(easy=True) para as tags e outro File() para a duração."""
+    audio = File(caminho, easy=True)
+    completo = File(caminho)
+    return audio.get('title'), completo.info.length
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return NUM_ARQUIVOS / (time.perf_counter() - inicio)
+
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    try:
+        caminhos = criar_corpus(pasta)
+        print(f"Leitura de tags de {NUM_ARQUIVOS} MP3 com ID3 ({os.cpu_count()} CPUs)")
+        print(f"  serial, duas aberturas:  {medir(lambda: [ler_duas_vezes(c) for c in caminhos]):8.0f} arquivos/s")
+        print(f"  serial, uma abertura:    {medir(lambda: [ler_metadados(c) for c in caminhos]):8.0f} arquivos/s")
+        for modo in ('threads', 'processos'):
+            taxa = medir(lambda: list(ler_metadados_em_lotes(caminhos, modo=modo)))
+            print(f"  {'pool de ' + modo + ':':24} {taxa:8.0f} arquivos/s")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
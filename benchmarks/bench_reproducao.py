@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import wave
+import shutil
+import tempfile
+import numpy as np
+from saida_audio import SaidaNula
+from cache_pcm import CachePCM
+from audio import AudioPlayer
+
+TAXA = 44100
+CANAIS = 2
+DURACAO = 60.0
+VELOCIDADE = 50.0  # Relógio virtual da saída nula: 60 s de áudio em ~1.2 s
+
+
+def gerar_faixa(caminho):
+    t = np.arange(int(TAXA * DURACAO)) / TAXA
+    sinal = np.sin(2 * np.pi * 220 * t) + 0.3 * np.random.randn(len(t))
+    pcm = (sinal / np.abs(sinal).max() * 16000).astype(np.int16)
+    with wave.open(caminho, 'wb') as wav:
+        wav.setnchannels(CANAIS)
+        wav.setsampwidth(2)
+        wav.setframerate(TAXA)
+        wav.writeframes(np.repeat(pcm, CANAIS).tobytes())
+
+
+def medir(pasta):
+    caminho = os.path.join(pasta, 'faixa.wav')
+    gerar_faixa(caminho)
+    saida = SaidaNula(TAXA, CANAIS, velocidade=VELOCIDADE)
+    player = AudioPlayer.reiniciar(saida)
+    player.cache_pcm = CachePCM(pasta=os.path.join(pasta, 'cache_pcm'))
+    player.set_equalizacao(4.0, -3.0, 6.0).result(timeout=5)
+
+    inicio = time.perf_counter()
+    player.carregar_musica(caminho).result(timeout=60)
+    carga = time.perf_counter() - inicio  # Decodificação para o cache PCM + abertura no motor
+
+    inicio = time.perf_counter()
+    player.play().result(timeout=5)
+    latencia_play = time.perf_counter() - inicio
+
+    espectro = []
+    inicio = time.perf_counter()
+    while player.is_playing():
+        player.check_events()
+        t0 = time.perf_counter()
+        player._calcular_espectro(40)
+        espectro.append(time.perf_counter() - t0)
+        time.sleep(0.01)
+    reproducao = time.perf_counter() - inicio
+    tocado = saida.posicao()
+    player.quit()
+    AudioPlayer._instance = None
+    return carga, latencia_play, reproducao, tocado, espectro
+
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    try:
+        carga, latencia_play, reproducao, tocado, espectro = medir(pasta)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    print(f"Reprodução sem dispositivo ({DURACAO:.0f} s de áudio, saída nula a {VELOCIDADE:.0f}x, EQ ativa)")
+    print(f"  carga (decodificação + motor): {carga * 1000:8.1f} ms")
+    print(f"  latência do comando play:      {latencia_play * 1000:8.2f} ms")
+    print(f"  reprodução:                    {reproducao:8.2f} s para {tocado:.1f} s de áudio "
+          f"({tocado / reproducao:.1f}x tempo real)")
+    print(f"  espectro:                      {np.mean(espectro) * 1e6:8.1f} us/quadro "
+          f"(máx {np.max(espectro) * 1e6:.1f} us, {len(espectro)} quadros)")
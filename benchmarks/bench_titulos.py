@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import random
+from biblioteca import Musica, IndiceTitulos
+
+NUM_TITULOS = 100000
+CONSULTAS = 10000
+
+
+class ArvoreAntiga:
+    """A árvore binária sem balanceamento que o IndiceTitulos substituiu, para comparação."""
+
+    def __init__(self):
+        self.raiz = None
+
+    def inserir(self, musica):
+        def _inserir(no, musica):
+            if no is None:
+                return [musica, None, None]
+            lado = 1 if musica.metadados['titulo'] < no[0].metadados['titulo'] else 2
+            no[lado] = _inserir(no[lado], musica)
+            return no
+        self.raiz = _inserir(self.raiz, musica)
+
+
+def medir(num_titulos):
+    musicas = [Musica(f"{i}.mp3", {'titulo': f"Faixa {i:06d}"}) for i in range(num_titulos)]
+    tempos = {}
+    inicio = time.perf_counter()
+    indice = IndiceTitulos(musicas)
+    tempos['construir (em ordem)'] = time.perf_counter() - inicio
+
+    alvos = [f"Faixa {random.randrange(num_titulos):06d}" for _ in range(CONSULTAS)]
+    inicio = time.perf_counter()
+    for alvo in alvos:
+        indice.buscar(alvo)
+    tempos['busca exata (por consulta)'] = (time.perf_counter() - inicio) / CONSULTAS
+    inicio = time.perf_counter()
+    for alvo in alvos:
+        indice.buscar_prefixo(alvo[:-2])
+    tempos['busca por prefixo (por consulta)'] = (time.perf_counter() - inicio) / CONSULTAS
+    return tempos
+
+
+def medir_arvore_antiga(num_titulos):
+    musicas = [Musica(f"{i}.mp3", {'titulo': f"Faixa {i:06d}"}) for i in range(num_titulos)]
+    arvore = ArvoreAntiga()
+    inicio = time.perf_counter()
+    for musica in musicas:
+        arvore.inserir(musica)
+    return time.perf_counter() - inicio
+
+
+if __name__ == '__main__':
+    print(f"IndiceTitulos com {NUM_TITULOS} títulos")
+    for nome, segundos in medir(NUM_TITULOS).items():
+        print(f"  {nome:36}: {segundos * 1000:9.3f} ms")
+    print(f"  {'árvore antiga, 900 títulos em ordem':36}: {medir_arvore_antiga(900) * 1000:9.3f} ms")
+    print(f"  {'IndiceTitulos, 900 títulos em ordem':36}: {medir(900)['construir (em ordem)'] * 1000:9.3f} ms")
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import shutil
+import tempfile
+from varredura import Varredura, EXTENSOES_MUSICA
+
+ARTISTAS = 100
+ALBUNS_POR_ARTISTA = 10
+FAIXAS_POR_ALBUM = 12
+
+
+def criar_arvore(pasta):
+    for a in range(ARTISTAS):
+        for b in range(ALBUNS_POR_ARTISTA):
+            album = os.path.join(pasta, f"artista_{a:03d}", f"album_{b:02d}")
+            os.makedirs(album)
+            for f in range(FAIXAS_POR_ALBUM):
+                open(os.path.join(album, f"{f:02d}.mp3"), 'wb').close()
+            open(os.path.join(album, 'capa.jpg'), 'wb').close()
+
+
+def walk_com_stat(pasta):
+    """Como era feito antes: os.walk, filtro por extensão e um os.stat por faixa para o índice."""
+    caminhos = []
+    for raiz, dirs, arquivos in os.walk(pasta):
+        dirs.sort()
+        for nome in sorted(arquivos):
+            if os.path.splitext(nome)[1].lower() in EXTENSOES_MUSICA:
+                caminho = os.path.join(raiz, nome)
+                os.stat(caminho)
+                caminhos.append(caminho)
+    return caminhos
+
+
+def medir(pasta):
+    tempos = {}
+    inicio = time.perf_counter()
+    total = len(walk_com_stat(pasta))
+    tempos['os.walk + os.stat'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    varredura = Varredura(pasta)
+    for i, entrada in enumerate(varredura):
+        if i == 0:
+            tempos['Varredura: primeira faixa'] = time.perf_counter() - inicio
+        entrada.stat()
+    tempos['Varredura + DirEntry.stat'] = time.perf_counter() - inicio
+    assert varredura.musicas == total
+    return total, tempos
+
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    try:
+        criar_arvore(pasta)
+        medir(pasta)  # Aquece o cache de diretórios do sistema
+        total, tempos = medir(pasta)
+        print(f"Varredura de {ARTISTAS * ALBUNS_POR_ARTISTA} pastas, {total} faixas")
+        for nome, segundos in tempos.items():
+            print(f"  {nome:28}: {segundos * 1000:9.1f} ms")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
@@ -0,0 +1,143 @@
+# analise_lote.py
+import os
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from sonda import EXTENSOES_AUDIO
+from varredura import varrer
+from utils import processos_em_segundo_plano
+
+
+class AnaliseEmLote:
+    """
+    Base das análises de biblioteca que rodam em um pool de processos e guardam
+    um resultado por arquivo em JSON, invalidado por mtime/tamanho. Os
+    resultados são gravados periodicamente (checkpoint): se a análise for
+    interrompida, a próxima execução continua de onde parou, pulando as faixas
+    já analisadas.
+
+    Subclasses definem `analisar`, uma função de módulo (para ser enviada aos
+    processos) que recebe o caminho e devolve um dict, ou None se a faixa não
+    puder ser analisada.
+    """
+
+    analisar = None
+    nome = 'análise'
+
+    def __init__(self, arquivo, max_processos=None):
+        self.arquivo = arquivo
+        self.max_processos = max_processos or processos_em_segundo_plano()
+        self._entradas = {}
+        self._lock = threading.Lock()
+        self._progresso = (0, 0)
+        self._parar = threading.Event()
+        self.carregar()
+
+    def consultar(self, caminho):
+        """Resultado ainda válido para o arquivo no disco, ou None."""
+        chave = os.path.abspath(caminho)
+        try:
+            st = os.stat(chave)
+        except OSError:
+            return None
+        with self._lock:
+            info = self._entradas.get(chave)
+        if info and info['mtime'] == st.st_mtime_ns and info['tamanho'] == st.st_size:
+            return info
+        return None
+
+    def progresso(self):
+        """(analisadas, total) da análise em lote atual ou da última."""
+        return self._progresso
+
+    def parar(self):
+        """Interrompe a análise em andamento depois das faixas que já estão nos processos."""
+        self._parar.set()
+
+    def analisar_lote(self, caminhos, ao_progredir=None, salvar_a_cada=25):
+        """
+        Analisa os arquivos novos ou alterados de `caminhos`. `ao_progredir(feitos, total, caminho)`
+        é chamado a cada faixa concluída. Retorna o número de faixas analisadas.
+        """
+        pendentes = [os.path.abspath(c) for c in caminhos if self.consultar(c) is None]
+        total = len(pendentes)
+        self._progresso = (0, total)
+        self._parar.clear()
+        if not pendentes:
+            return 0
+
+        feitos = 0
+        processos = min(self.max_processos, total)
+        # Poucas faixas em voo por vez: interromper é rápido e nada se perde além delas
+        proximos = iter(pendentes)
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            em_voo = set()
+            while True:
+                while len(em_voo) < 2 * processos and not self._parar.is_set():
+                    caminho = next(proximos, None)
+                    if caminho is None:
+                        break
+                    em_voo.add(executor.submit(_executar, type(self).analisar, caminho))
+                if not em_voo:
+                    break
+                concluidos, em_voo = wait(em_voo, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    try:
+                        caminho, resultado = futuro.result()
+                        # Faixas que não puderam ser analisadas também são registradas, para não serem refeitas
+                        self._registrar(caminho, resultado or {})
+                    except Exception as e:
+                        print(f"Erro na {self.nome}: {e}")
+                        caminho = None
+                    feitos += 1
+                    self._progresso = (feitos, total)
+                    if ao_progredir is not None:
+                        ao_progredir(feitos, total, caminho)
+                    if feitos % salvar_a_cada == 0:
+                        self.salvar()
+        self.salvar()
+        return feitos
+
+    def analisar_diretorio(self, pasta, recursivo=True, ao_progredir=None):
+        caminhos = [entrada.path for entrada in
+                    varrer(pasta, EXTENSOES_AUDIO, profundidade=None if recursivo else 0)]
+        return self.analisar_lote(caminhos, ao_progredir=ao_progredir)
+
+    def _registrar(self, caminho, resultado):
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return
+        info = dict(resultado, mtime=st.st_mtime_ns, tamanho=st.st_size)
+        with self._lock:
+            self._entradas[caminho] = info
+
+    def carregar(self):
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            self._entradas = dados if isinstance(dados, dict) else {}
+        except FileNotFoundError:
+            self._entradas = {}
+        except Exception as e:
+            print(f"Erro ao carregar {self.nome}: {e}")
+            self._entradas = {}
+
+    def salvar(self):
+        with self._lock:
+            dados = dict(self._entradas)
+        try:
+            os.makedirs(os.path.dirname(self.arquivo), exist_ok=True)
+            temporario = self.arquivo + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar {self.nome}: {e}")
+            return False
+
+
+def _executar(analisar, caminho):
+    """Executa em um processo do pool."""
+    return caminho, analisar(caminho)
@@ -0,0 +1,123 @@
+# andamento.py
+import os
+import numpy as np
+from constants import PASTA_DADOS
+from fonte_amostras import iterar_pcm, sondar_formato
+from espectro import espectrograma, matriz_bandas
+from analise_lote import AnaliseEmLote
+
+ARQUIVO_ANDAMENTO = os.path.join(PASTA_DADOS, 'andamento.json')
+
+TAMANHO_QUADRO = 2048
+SALTO = 512
+NUM_BANDAS = 40
+BPM_MIN = 60
+BPM_MAX = 200
+DURACAO_MINIMA = 5.0  # Faixas mais curtas não têm batidas suficientes para estimar o andamento
+
+
+def envelope_fluxo(caminho, tamanho=TAMANHO_QUADRO, salto=SALTO, num_bandas=NUM_BANDAS):
+    """
+    Fluxo espectral da faixa: para cada quadro da STFT, a soma dos aumentos de
+    energia (log) nas mesmas bandas logarítmicas do espectro da UI. Retorna
+    (envelope, quadros_por_segundo).
+    """
+    taxa, canais, _ = sondar_formato(caminho)
+    matriz = matriz_bandas(tamanho // 2 + 1, taxa, num_bandas)
+    bandas = []
+    resto = np.zeros(0, dtype=np.float32)
+    for bruto in iterar_pcm(caminho, taxa, canais):
+        mono = np.frombuffer(bruto, dtype=np.int16).reshape(-1, canais).mean(axis=1, dtype=np.float32) / 32768.0
+        sinal = np.concatenate((resto, mono))
+        magnitudes = espectrograma(sinal, tamanho, salto)
+        if len(magnitudes):
+            bandas.append(np.log1p(100.0 * (magnitudes @ matriz)))
+        resto = sinal[len(magnitudes) * salto:]
+    if not bandas:
+        return np.zeros(0, dtype=np.float32), taxa / salto
+
+    bandas = np.concatenate(bandas)
+    fluxo = np.maximum(0.0, np.diff(bandas, axis=0)).sum(axis=1)
+    return np.concatenate(([0.0], fluxo)).astype(np.float32), taxa / salto
+
+
+def estimar_bpm(envelope, fps, bpm_min=BPM_MIN, bpm_max=BPM_MAX):
+    """
+    Andamento pela autocorrelação (via FFT) do envelope de fluxo, com uma
+    preferência suave por volta de 120 BPM para desempatar dobros e metades.
+    """
+    x = envelope - envelope.mean()
+    n = len(x)
+    if n < 4:
+        return None
+    espectro = np.fft.rfft(x, 2 * n)
+    autocorrelacao = np.fft.irfft(espectro.real ** 2 + espectro.imag ** 2)[:n]
+
+    lag_min = max(1, int(60 * fps / bpm_max))
+    lag_max = min(n - 2, int(np.ceil(60 * fps / bpm_min)))
+    if lag_max <= lag_min:
+        return None
+    lags = np.arange(lag_min, lag_max + 1)
+    preferencia = np.exp(-0.5 * np.log2(60 * fps / lags / 120.0) ** 2)
+    i = int(np.argmax(autocorrelacao[lags] * preferencia))
+    lag = float(lags[i])
+
+    # Interpolação parabólica em torno do pico, para não ficar preso à grade de quadros
+    if 0 < i < len(lags) - 1:
+        a, b, c = autocorrelacao[lags[i] - 1:lags[i] + 2]
+        denominador = a - 2 * b + c
+        if denominador:
+            lag += 0.5 * (a - c) / denominador
+    return 60 * fps / lag
+
+
+def contar_onsets(envelope, fps, janela=0.5, distancia=0.05, delta=1.0):
+    """
+    Ataques (notas, batidas) da faixa: máximos do fluxo dentro de ±`distancia`
+    segundos que passam da média móvel local por `delta` desvios-padrão.
+    """
+    if len(envelope) < 3:
+        return 0
+    largura = max(1, int(janela * fps))
+    media = np.convolve(envelope, np.full(largura, 1.0 / largura), mode='same')
+    limiar = media + delta * envelope.std()
+    vizinhanca = max(1, int(distancia * fps))
+    maximo_local = np.lib.stride_tricks.sliding_window_view(
+        np.pad(envelope, vizinhanca, mode='edge'), 2 * vizinhanca + 1).max(axis=1)
+    picos = (envelope == maximo_local) & (envelope > limiar)
+    return int(np.count_nonzero(picos))
+
+
+def analisar_andamento(caminho):
+    """BPM e densidade de ataques (onsets por segundo) da faixa, ou None se ela for curta demais."""
+    envelope, fps = envelope_fluxo(caminho)
+    duracao = len(envelope) / fps
+    if duracao < DURACAO_MINIMA:
+        return None
+    bpm = estimar_bpm(envelope, fps)
+    return {
+        'bpm': round(float(bpm), 1) if bpm else None,
+        'densidade_onsets': round(contar_onsets(envelope, fps) / duracao, 3),
+    }
+
+
+class AnalisadorAndamento(AnaliseEmLote):
+    """
+    Andamento (BPM) e densidade de ataques das faixas da biblioteca, calculados
+    em segundo plano e guardados em data/andamento.json. Os valores entram em
+    Musica.metadados pelas chaves de CHAVES.
+    """
+
+    analisar = staticmethod(analisar_andamento)
+    nome = 'análise de andamento'
+    CHAVES = ('bpm', 'densidade_onsets')
+
+    def __init__(self, arquivo=ARQUIVO_ANDAMENTO, max_processos=None):
+        super().__init__(arquivo, max_processos=max_processos)
+
+    def metadados(self, caminho):
+        """Só as chaves de metadados (sem mtime/tamanho); dict vazio se a faixa ainda não foi analisada."""
+        info = self.consultar(caminho)
+        if info is None:
+            return {}
+        return {chave: info[chave] for chave in self.CHAVES if info.get(chave) is not None}
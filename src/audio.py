@@ -1,31 +1,91 @@
-import pygame
 import numpy as np
 import os
 import time
 import math
 import threading
-import queue
-from pydub import AudioSegment
-try:
-    from mutagen.mp3 import MP3
-    from mutagen.wave import WAVE
-    from mutagen.flac import FLAC
-except ImportError:
-    print("Mutagen não encontrado. A duração das músicas pode ser imprecisa para alguns formatos.")
-    MP3 = WAVE = FLAC = None
+from fonte_amostras import FonteAmostrasJanela, localizar_ffmpeg
+from sonda import CacheSondagem
+from cache_pcm import CachePCM
+from motor_buffer import MotorBuffer
+from fluxo_pcm import FluxoPCM
+from saida_audio import SaidaPygame
+from buffer_mixer import AdaptadorBufferMixer
+from equalizador import Equalizador3Bandas
+from barramento_comandos import BarramentoComandos
+from despachante_eventos import DespachanteEventos
+from indice_busca import CacheIndiceBusca
+from espectro import janela_hanning as _janela_hanning, plano_bandas as _plano_bandas, EspectroMultirresolucao
+from sonoridade import AnalisadorSonoridade
+
+# No motor 'buffer', faixas mais longas que isto tocam em fluxo em vez de irem inteiras para o cache PCM
+DURACAO_MINIMA_FLUXO = 20 * 60
+
+class RelogioReproducao:
+    """
+    Posição de reprodução medida com time.monotonic. Ao contrário de
+    pygame.mixer.music.get_pos(), continua correta depois de busca, pausa e retomada.
+    """
+
+    def __init__(self):
+        self._base = 0.0
+        self._inicio = None  # None = parado ou pausado
+
+    def iniciar(self, posicao=0.0):
+        self._base = float(posicao)
+        self._inicio = time.monotonic()
+
+    def pausar(self):
+        if self._inicio is not None:
+            self._base = self.posicao()
+            self._inicio = None
+
+    def retomar(self):
+        if self._inicio is None:
+            self._inicio = time.monotonic()
+
+    def posicionar(self, posicao):
+        """Move a posição sem mudar o estado (correndo ou pausado)."""
+        self._base = float(posicao)
+        if self._inicio is not None:
+            self._inicio = time.monotonic()
+
+    def parar(self):
+        self._base = 0.0
+        self._inicio = None
+
+    def posicao(self):
+        if self._inicio is None:
+            return self._base
+        return self._base + (time.monotonic() - self._inicio)
 
 class AudioPlayer:
     _instance = None
 
-    def __new__(cls):
+    def __new__(cls, saida=None):
         if cls._instance is None:
             cls._instance = super(AudioPlayer, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    @classmethod
+    def reiniciar(cls, saida=None):
+        """Encerra a instância atual (se houver) e cria outra com a saída de áudio dada."""
+        if cls._instance is not None and hasattr(cls._instance, 'inicializado'):
+            cls._instance.quit()
+        cls._instance = None
+        return cls(saida)
+
+    def __init__(self, saida=None):
+        """`saida`: saída de áudio (saida_audio.py); por padrão, o pygame.mixer."""
         if hasattr(self, 'inicializado'):
             return
-        pygame.mixer.init(frequency=44100)
+        self.saida = saida or SaidaPygame()
+        self.buffer_mixer = AdaptadorBufferMixer(frequencia=self.saida.frequencia)
+        if self.saida.tamanho_buffer is None:
+            self.saida.tamanho_buffer = self.buffer_mixer.tamanho
+        else:
+            self.buffer_mixer.tamanho = self.saida.tamanho_buffer
+        self.saida.iniciar()
+        self._music = self.saida.music  # None nas saídas sem pygame.mixer.music: só o MotorBuffer toca
         self.musica_atual = None
         self.pausado = False
         self._espectro_max = 1.0
@@ -33,79 +93,134 @@ class AudioPlayer:
         self.tempo_inicio = 0
         self.duracao = 0
         self.lock = threading.Lock()
-        self.observers = []
+        self.eventos = DespachanteEventos()
         self.equalizacao = {'grave': 0, 'medio': 0, 'agudo': 0}
-        pygame.init()
-        self.EVENTO_FIM_MUSICA = pygame.USEREVENT + 1
-        pygame.mixer.music.set_endevent(self.EVENTO_FIM_MUSICA)
-        pygame.mixer.music.set_volume(self.volume)
+        self.EVENTO_FIM_MUSICA = self.saida.EVENTO_USUARIO + 1
+        self.EVENTO_PROXIMA_FAIXA = self.saida.EVENTO_USUARIO + 2
+        if self._music is not None:
+            self._music.set_endevent(self.EVENTO_FIM_MUSICA)
+            self._music.set_volume(self.volume)
         self.inicializado = True
-        self._audio_segment = None
+        self._fonte_amostras = None
+        self.cache_pcm = CachePCM()
+        self.sonda = CacheSondagem()
+        self.indice_busca = CacheIndiceBusca()
+        self.sonoridade = AnalisadorSonoridade()
+        self.normalizacao = True  # Aplica o ganho por faixa medido pelo AnalisadorSonoridade
+        self.ganho_faixa_db = 0.0
+        self.relogio = RelogioReproducao()  # Posição no motor 'music' (o MotorBuffer tem relógio próprio)
+        self._arquivo_busca = None  # Arquivo aberto a partir de um ponto de busca (MP3)
+        self._posicao_alvo = None  # Busca pedida e ainda não executada pela thread de áudio
+        # 'music' (pygame.mixer.music), 'buffer' (MotorBuffer com a faixa no cache PCM) ou
+        # 'fluxo' (MotorBuffer com a faixa decodificada em fluxo); saídas sem music só têm o buffer
+        self.motor_reproducao = 'music' if self._music is not None else 'buffer'
+        self._motor_buffer = None
+        self._fluxo = None  # FluxoPCM da faixa atual, quando ela toca em fluxo
+        self._fluxo_proximo = None
+        self.equalizador = None  # Equalizador3Bandas do MotorBuffer (a EQ só é aplicada nesse motor)
+        self._usando_buffer = False
+        self._reabrindo_saida = False
+        self._proxima = None  # Faixa preparada para tocar sem intervalo depois da atual
+        self.crossfade = 0.0  # Segundos de sobreposição entre faixas (só no motor 'buffer')
+        self._aguardando_proxima_desde = None
+        self.ultimo_intervalo_ms = None
         self._espectro_anterior = None
         self._espectro_max = 1.0
         self._reset_counter = 0
 
-        self.command_queue = queue.Queue()
-        self._command_thread = threading.Thread(target=self._run_command_processor, daemon=True)
-        self._command_thread.start()
+        self.comandos = BarramentoComandos(self._executar_comando)
+
+        self.taxa_espectro = 30  # quadros de espectro por segundo
+        self._num_barras_espectro = 40
+        # 'multirresolucao' (barras logarítmicas, graves com FFT decimada) ou 'fft' (FFT única de 4096 pontos)
+        self.modo_espectro = 'multirresolucao'
+        self._multirresolucao = None
+        self._multirresolucao_faixa = None
+        self._barras_multirresolucao = None
+        self._espectro_publicado = (0, ())
+        self._parar_espectro = threading.Event()
+        self._espectro_thread = threading.Thread(target=self._run_espectro_producer, daemon=True)
+        self._espectro_thread.start()
+        self.buffer_mixer.iniciar_monitor(self.is_playing)
+
+    @property
+    def observers(self):
+        return self.eventos.observadores
 
     def add_observer(self, obs):
-        self.observers.append(obs)
+        self.eventos.adicionar(obs)
 
     def notify(self, evento):
-        for obs in self.observers:
-            obs.atualizar(evento)
-
-    def _run_command_processor(self):
-        """Loop que processa comandos da fila."""
-        while True:
-            command_item = None
-            try:
-                command, args, kwargs = self.command_queue.get(timeout=0.1)
-                command_item = (command, args, kwargs)
-                
-                if command == 'load':
-                    self._carregar_musica_internal(args[0])
-                elif command == 'play':
-                    self._play_internal()
-                elif command == 'play_pause':
-                    self._play_pause_internal()
-                elif command == 'pause':
-                    self._pause_internal()
-                elif command == 'resume':
-                    self._resume_internal()
-                elif command == 'stop':
-                    self._parar_internal()
-                elif command == 'set_volume':
-                    self._setar_volume_internal(args[0])
-                elif command == 'set_equalizacao':
-                    self._set_equalizacao_internal(args[0], args[1], args[2])
-                elif command == 'quit': # Comando para parar o thread
-                    return # Sai do loop do thread
-            except queue.Empty:
-                pass
-            except Exception as e:
-                print(f"Erro no thread de comando do áudio: {e}")
-            finally:
-                if command_item is not None:
-                    self.command_queue.task_done()
+        # Nunca bloqueia: cada observador recebe o evento na própria thread de entrega
+        self.eventos.publicar(evento)
+
+    def _executar_comando(self, command, args):
+        """Executa um comando do barramento na thread de áudio e devolve o resultado."""
+        if command == 'load':
+            return self._carregar_musica_internal(args[0])
+        elif command == 'preload':
+            return self._preparar_proxima_internal(args[0])
+        elif command == 'play':
+            return self._play_internal()
+        elif command == 'play_pause':
+            return self._play_pause_internal()
+        elif command == 'pause':
+            return self._pause_internal()
+        elif command == 'resume':
+            return self._resume_internal()
+        elif command == 'stop':
+            return self._parar_internal()
+        elif command == 'seek':
+            return self._seek_internal(args[0])
+        elif command == 'set_volume':
+            return self._setar_volume_internal(args[0])
+        elif command == 'set_equalizacao':
+            return self._set_equalizacao_internal(args[0], args[1], args[2])
+        raise ValueError(f"Comando de áudio desconhecido: {command}")
 
     def _carregar_musica_internal(self, caminho):
         if os.path.exists(caminho):
             try:
-                pygame.mixer.music.load(caminho)
+                self._cancelar_proxima()
+                if self._fonte_amostras is not None:
+                    self._fonte_amostras.fechar()
+                self._fonte_amostras = None
+                taxa, canais, duracao = self.sonda.obter(caminho)
+                self._ajustar_buffer_mixer()
+
+                if self.motor_reproducao != 'music' and self._carregar_no_buffer(caminho, duracao):
+                    self._usar_motor_buffer()
+                elif self._music is None:
+                    print(f"A saída de áudio não toca {os.path.basename(caminho)} sem o buffer decodificado.")
+                    return False
+                else:
+                    if self._motor_buffer is not None:
+                        self._motor_buffer.parar()
+                    self._usando_buffer = False
+                    try:
+                        self._music.load(caminho)
+                    except Exception:
+                        # Formato que o pygame.mixer.music não abre (M4A, por exemplo): toca em fluxo pelo ffmpeg
+                        if not self._carregar_no_buffer(caminho, duracao, em_fluxo=True):
+                            raise
+                        self._usar_motor_buffer()
+                    else:
+                        self._fonte_amostras = self._abrir_fonte_amostras(caminho, taxa, canais)
+                        if self.indice_busca.suporta(caminho):
+                            threading.Thread(target=self.indice_busca.obter, args=(caminho,), daemon=True).start()
+                self._fechar_arquivo_busca()
+                self.relogio.parar()
+
                 self.musica_atual = caminho
                 self.tempo_inicio = time.time()
                 self.pausado = False
-                self._get_and_set_duration(caminho)
-                try:
-                    self._audio_segment = AudioSegment.from_file(caminho)
-                except Exception as e:
-                    print("Erro ao carregar AudioSegment (para espectro):", e)
-                    self._audio_segment = None
+                self.duracao = duracao
+                self.ganho_faixa_db = self.sonoridade.ganho_db(caminho)
+                self._aplicar_volume()
                 self._espectro_anterior = None
                 self._espectro_max = 1.0
                 self._reset_counter = 0
+                self._espectro_publicado = (0, ())
                 self.notify('carregar_musica')
                 return True
             except Exception as e:
@@ -114,37 +229,248 @@ class AudioPlayer:
             print("Arquivo não encontrado:", caminho)
         return False
 
-    def _get_and_set_duration(self, caminho):
-        """Tenta obter a duração da música usando mutagen."""
-        self.duracao = 0
+    def _ajustar_buffer_mixer(self):
+        """Entre faixas: reabre a saída se o adaptador escolheu outro tamanho de buffer."""
+        if self.crossfade > 0 and self._usando_buffer and self.is_playing():
+            return  # A nova faixa vai ser sobreposta à atual: reabrir a saída cortaria o crossfade
+        tamanho = self.buffer_mixer.proximo_tamanho()
+        if tamanho == self.saida.tamanho_buffer:
+            return
+        if self._music is not None:
+            self._music.stop()
+        if self._motor_buffer is not None:
+            self._motor_buffer.parar()
+        self._reabrindo_saida = True  # Outras threads consultam _ocupado() enquanto o mixer está fechado
         try:
-            if caminho.lower().endswith('.mp3') and MP3:
-                audio = MP3(caminho)
-                self.duracao = audio.info.length
-            elif caminho.lower().endswith('.wav') and WAVE:
-                audio = WAVE(caminho)
-                self.duracao = audio.info.length
-            elif caminho.lower().endswith('.flac') and FLAC:
-                audio = FLAC(caminho)
-                self.duracao = audio.info.length
-            else:
-                print(f"Formato de áudio para {caminho} não suportado por mutagen ou não especificado. Duração pode ser imprecisa.")
-                if self._audio_segment:
-                    self.duracao = len(self._audio_segment) / 1000.0
-                else:
-                    self.duracao = 0
+            self.saida.reabrir(tamanho)
         except Exception as e:
-            print(f"Erro ao obter duração da música {caminho} com mutagen: {e}")
-            self.duracao = 0
+            print(f"Erro ao reabrir a saída de áudio com buffer de {tamanho} quadros: {e}")
+            return
+        finally:
+            self._reabrindo_saida = False
+        if self._music is not None:
+            self._music.set_endevent(self.EVENTO_FIM_MUSICA)
+        if self._motor_buffer is not None:
+            self._motor_buffer.reabrir_canal()
+        self._aplicar_volume()
+
+    def _usar_motor_buffer(self):
+        if self._music is not None and not self._usando_buffer:
+            self._music.stop()
+            # O stop() avisa o fim da faixa antiga com o mesmo evento do MotorBuffer: não vale para a nova
+            self.saida.descartar_eventos(self.EVENTO_FIM_MUSICA)
+        self._usando_buffer = True
+        self._fonte_amostras = self._motor_buffer
+
+    def _tocar_em_fluxo(self, duracao):
+        return self.motor_reproducao == 'fluxo' or duracao > DURACAO_MINIMA_FLUXO
+
+    def _carregar_no_buffer(self, caminho, duracao=0, em_fluxo=False):
+        """
+        Entrega a faixa ao MotorBuffer no formato do mixer: decodificada uma única
+        vez para o cache PCM ou, no motor 'fluxo' e em faixas longas, em fluxo
+        (FluxoPCM), começando a tocar assim que o primeiro bloco chega. Uma faixa
+        que ainda não está no cache também começa em fluxo, e o motor passa a ler
+        do cache quando a decodificação em segundo plano termina.
+        """
+        if self._motor_buffer is None:
+            self._motor_buffer = MotorBuffer(evento_fim=self.EVENTO_FIM_MUSICA,
+                                             evento_troca=self.EVENTO_PROXIMA_FAIXA,
+                                             saida=self.saida)
+            self._motor_buffer.set_volume(self._volume_efetivo())
+            self._motor_buffer.duracao_crossfade = self.crossfade
+            self._motor_buffer.ao_subexecutar = self.buffer_mixer.registrar_subexecucao
+            self.equalizador = Equalizador3Bandas(self._motor_buffer.frame_rate, self._motor_buffer.channels)
+            self.equalizador.set_ganhos(**self.equalizacao)
+            self._motor_buffer.processadores.append(self.equalizador)
+        motor = self._motor_buffer
+        completar_cache = False
+        if em_fluxo or self._tocar_em_fluxo(duracao):
+            if not self._decodificavel_em_fluxo(caminho):
+                print(f"Não foi possível decodificar {os.path.basename(caminho)} em fluxo: ffmpeg não encontrado.")
+                return False
+            dados = FluxoPCM(caminho, motor.frame_rate, motor.channels)
+        else:
+            dados = self.cache_pcm.abrir_dados(caminho, motor.frame_rate, motor.channels)
+            if dados is None and self._decodificavel_em_fluxo(caminho):
+                # Decodificar a faixa inteira antes de tocar atrasaria o início (e uma troca de motor no meio dela)
+                dados = FluxoPCM(caminho, motor.frame_rate, motor.channels)
+                completar_cache = True
+            elif dados is None and self.cache_pcm.armazenar(caminho, motor.frame_rate, motor.channels):
+                dados = self.cache_pcm.abrir_dados(caminho, motor.frame_rate, motor.channels)
+            if dados is None:
+                print(f"Não foi possível decodificar {os.path.basename(caminho)} para o buffer; usando pygame.mixer.music.")
+                return False
+        # Com crossfade, uma troca manual durante a reprodução também é sobreposta à faixa atual
+        motor.transicionar(dados)
+        with self.lock:
+            anterior = self._fluxo
+            self._fluxo = dados if isinstance(dados, FluxoPCM) else None
+        self._fechar_fluxo(anterior)
+        if completar_cache:
+            threading.Thread(target=self._trocar_fluxo_pelo_cache, args=(caminho, dados), daemon=True).start()
+        return True
+
+    @staticmethod
+    def _decodificavel_em_fluxo(caminho):
+        return caminho.lower().endswith('.wav') or localizar_ffmpeg() is not None
+
+    def _trocar_fluxo_pelo_cache(self, caminho, fluxo):
+        """Preenche o cache PCM da faixa e, se o fluxo ainda estiver tocando, passa a ler dele na mesma posição."""
+        motor = self._motor_buffer
+        if not self.cache_pcm.armazenar(caminho, motor.frame_rate, motor.channels):
+            return
+        dados = self.cache_pcm.abrir_dados(caminho, motor.frame_rate, motor.channels)
+        with self.lock:
+            if dados is None or self._fluxo is not fluxo or not motor.substituir(fluxo, dados):
+                return
+            self._fluxo = None
+        fluxo.fechar()
+
+    def _fechar_fluxo(self, fluxo):
+        """Encerra o decodificador de um FluxoPCM que o motor não vai mais tocar."""
+        if fluxo is not None and not self._motor_buffer.em_uso(fluxo):
+            fluxo.fechar()
+
+    def _preparar_proxima_internal(self, caminho):
+        """
+        Sonda e pré-decodifica a próxima faixa em segundo plano e a deixa na fila do
+        motor, para que ela comece exatamente quando a atual terminar.
+        """
+        self._cancelar_proxima()
+        if not self.musica_atual or not caminho or not os.path.exists(caminho):
+            return False
+        taxa, canais, duracao = self.sonda.obter(caminho)
+        proxima = {'caminho': caminho, 'taxa': taxa, 'canais': canais, 'duracao': duracao}
+        with self.lock:
+            self._proxima = proxima
+        if not self._usando_buffer:
+            self._music.queue(caminho)
+        threading.Thread(target=self._pre_decodificar_proxima, args=(proxima,), daemon=True).start()
+        return True
+
+    def _pre_decodificar_proxima(self, proxima):
+        caminho = proxima['caminho']
+        if self._usando_buffer and self._tocar_em_fluxo(proxima['duracao']):
+            # Em fluxo não há o que pré-decodificar: só enche a fila da próxima faixa
+            motor = self._motor_buffer
+            fluxo = FluxoPCM(caminho, motor.frame_rate, motor.channels)
+            with self.lock:
+                if self._proxima is proxima and self._usando_buffer:
+                    self._fluxo_proximo = fluxo
+                    motor.enfileirar(fluxo)
+                    return
+            fluxo.fechar()
+            return
+        self.cache_pcm.armazenar(caminho, proxima['taxa'], proxima['canais'])
+        if not self._usando_buffer:
+            return
+        motor = self._motor_buffer
+        dados = None
+        if self.cache_pcm.armazenar(caminho, motor.frame_rate, motor.channels):
+            dados = self.cache_pcm.abrir_dados(caminho, motor.frame_rate, motor.channels)
+        with self.lock:
+            if dados is not None and self._proxima is proxima and self._usando_buffer:
+                motor.enfileirar(dados)
+
+    def _cancelar_proxima(self):
+        with self.lock:
+            self._proxima = None
+            fluxo, self._fluxo_proximo = self._fluxo_proximo, None
+            if self._motor_buffer is not None:
+                self._motor_buffer.cancelar_seguinte()
+                self._fechar_fluxo(fluxo)
+
+    def _avancar_para_proxima(self):
+        """A faixa preparada começou a tocar: atualiza o estado sem recarregar nada."""
+        with self.lock:
+            proxima = self._proxima
+            self._proxima = None
+        if proxima is None:
+            return False
+        caminho = proxima['caminho']
+        if self._fonte_amostras is not None and self._fonte_amostras is not self._motor_buffer:
+            self._fonte_amostras.fechar()
+        if self._usando_buffer:
+            self._fonte_amostras = self._motor_buffer
+            self.ultimo_intervalo_ms = self._motor_buffer.ultimo_intervalo_ms
+            with self.lock:
+                anterior, self._fluxo, self._fluxo_proximo = self._fluxo, self._fluxo_proximo, None
+            self._fechar_fluxo(anterior)
+        else:
+            self._fonte_amostras = self._abrir_fonte_amostras(caminho, proxima['taxa'], proxima['canais'])
+            # Se o mixer já trocou de faixa antes de o evento de fim chegar, não há o que medir
+            self.ultimo_intervalo_ms = None
+            if not self._music.get_busy():
+                self._aguardando_proxima_desde = time.perf_counter()
+        self._fechar_arquivo_busca()
+        self.relogio.iniciar(0.0)
+        self.musica_atual = caminho
+        self.tempo_inicio = time.time()
+        self.pausado = False
+        self.duracao = proxima['duracao']
+        self.ganho_faixa_db = self.sonoridade.ganho_db(caminho)
+        self._aplicar_volume()
+        self._espectro_anterior = None
+        self._espectro_max = 1.0
+        self._reset_counter = 0
+        self.notify('proxima_faixa')
+        return True
+
+    def set_motor_reproducao(self, motor):
+        """Escolhe o motor de reprodução ('music', 'buffer' ou 'fluxo'); vale a partir da próxima faixa carregada."""
+        if motor not in ('music', 'buffer', 'fluxo'):
+            raise ValueError(f"Motor de reprodução desconhecido: {motor}")
+        if motor == 'music' and self._music is None:
+            raise ValueError("A saída de áudio atual não tem pygame.mixer.music; use o motor 'buffer'.")
+        self.motor_reproducao = motor
+
+    def set_crossfade(self, segundos):
+        """
+        Define a sobreposição entre faixas (0 a 12 s). O crossfade é mixado pelo
+        MotorBuffer, então um valor maior que zero passa a usar esse motor.
+        """
+        self.crossfade = max(0.0, min(12.0, float(segundos)))
+        if self.crossfade > 0 and self.motor_reproducao == 'music':
+            self.motor_reproducao = 'buffer'
+        if self._motor_buffer is not None:
+            self._motor_buffer.duracao_crossfade = self.crossfade
+
+    def set_perfil_buffer(self, perfil):
+        """'adaptativo', 'low_latency' ou 'low_cpu'; o novo tamanho de buffer vale a partir da próxima faixa."""
+        self.buffer_mixer.set_perfil(perfil)
+
+    def transicao_agendada(self):
+        """True se a próxima faixa já está pronta para entrar sozinha (sem intervalo ou com crossfade)."""
+        if self._usando_buffer:
+            return self._motor_buffer.tem_seguinte()
+        return self._proxima is not None
+
+    def _ocupado(self):
+        if self._reabrindo_saida:
+            return False
+        if self._usando_buffer:
+            return self._motor_buffer.ocupado()
+        return self._music is not None and self._music.get_busy()
+
+    def _abrir_fonte_amostras(self, caminho, taxa, canais):
+        """Usa o PCM já decodificado do cache; na primeira vez, lê em janelas e preenche o cache ao fundo."""
+        fonte = self.cache_pcm.abrir(caminho, taxa, canais)
+        if fonte is not None:
+            return fonte
+        self.cache_pcm.armazenar_em_segundo_plano(caminho, taxa, canais)
+        return FonteAmostrasJanela(caminho, taxa, canais)
 
     def _play_internal(self):
         if self.musica_atual:
             if self.pausado:
-                pygame.mixer.music.unpause()
-                self.pausado = False
-                self.notify('unpause')
-            elif not pygame.mixer.music.get_busy():
-                pygame.mixer.music.play()
+                self._resume_internal()
+            elif not self._ocupado():
+                if self._usando_buffer:
+                    self._motor_buffer.tocar()
+                else:
+                    self._music.play()
+                    self.relogio.iniciar(0.0)
                 self.tempo_inicio = time.time()
                 self.pausado = False
                 self.notify('play')
@@ -153,67 +479,216 @@ class AudioPlayer:
 
     def _play_pause_internal(self):
         if self.musica_atual:
-            if pygame.mixer.music.get_busy() and not self.pausado:
+            if self._ocupado() and not self.pausado:
                 self._pause_internal()
             elif self.pausado:
                 self._resume_internal()
-            elif not pygame.mixer.music.get_busy() and not self.pausado:
+            elif not self._ocupado() and not self.pausado:
                 self._play_internal()
             self.notify('play_pause')
 
     def _pause_internal(self):
-        if pygame.mixer.music.get_busy() and not self.pausado:
-            pygame.mixer.music.pause()
+        if self._ocupado() and not self.pausado:
+            if self._usando_buffer:
+                self._motor_buffer.pausar()
+            else:
+                self._music.pause()
+                self.relogio.pausar()
             self.pausado = True
             self.notify('pause')
 
     def _resume_internal(self):
         if self.pausado:
-            pygame.mixer.music.unpause()
+            if self._usando_buffer:
+                self._motor_buffer.retomar()
+            else:
+                self._music.unpause()
+                self.relogio.retomar()
             self.pausado = False
             self.notify('unpause')
 
     def _parar_internal(self):
-        pygame.mixer.music.stop()
+        self._cancelar_proxima()
+        if self._music is not None:
+            self._music.stop()
+        self.relogio.parar()
+        if self._motor_buffer is not None:
+            self._motor_buffer.parar()
         self.pausado = False
         self._espectro_anterior = None
         self._espectro_max = 1.0
         self._reset_counter = 0
+        self._espectro_publicado = (0, ())
         self.notify('parar')
 
+    def _seek_internal(self, segundos):
+        """Salta para `segundos` mantendo o estado (tocando ou pausado); retorna a posição alcançada."""
+        pedido = segundos
+        try:
+            if not self.musica_atual:
+                return None
+            if self.duracao:
+                segundos = min(segundos, max(0.0, self.duracao - 0.5))
+            segundos = max(0.0, float(segundos))
+
+            if self._usando_buffer:
+                quadro = int(segundos * self._motor_buffer.frame_rate)
+                if self._motor_buffer.ocupado():
+                    self._motor_buffer.buscar(quadro)
+                else:
+                    self._motor_buffer.tocar(quadro)
+                alcancado = segundos
+            else:
+                alcancado = self._buscar_music(segundos)
+                if self.pausado:
+                    self._music.pause()
+                    self.relogio.posicionar(alcancado)
+                else:
+                    self.relogio.iniciar(alcancado)
+                with self.lock:
+                    proxima = self._proxima
+                if proxima is not None:
+                    # play()/load() descartam a fila do mixer; a próxima faixa precisa ser reenfileirada
+                    self._music.queue(proxima['caminho'])
+
+            self._espectro_anterior = None
+            self.notify('seek')
+            return alcancado
+        finally:
+            if self._posicao_alvo == pedido:
+                self._posicao_alvo = None
+
+    def _buscar_music(self, segundos):
+        """
+        MP3: reabre o arquivo no byte do ponto de busca do índice, sem decodificar
+        nada antes dele. Os demais formatos usam a busca do próprio decodificador.
+        """
+        indice = self.indice_busca.obter(self.musica_atual)
+        if indice is None:
+            self._music.play(start=segundos)
+            return segundos
+        alcancado, offset = indice.localizar(segundos)
+        arquivo = open(self.musica_atual, 'rb')
+        arquivo.seek(offset)
+        self._music.load(arquivo, 'mp3')
+        self._music.play()
+        self._fechar_arquivo_busca()
+        self._arquivo_busca = arquivo
+        return alcancado
+
+    def _fechar_arquivo_busca(self):
+        if self._arquivo_busca is not None:
+            self._arquivo_busca.close()
+            self._arquivo_busca = None
+
     def _setar_volume_internal(self, vol):
         self.volume = max(0.0, min(1.0, float(vol)))
-        pygame.mixer.music.set_volume(self.volume)
+        self._aplicar_volume()
         self.notify('volume')
 
+    def _volume_efetivo(self):
+        """
+        Volume global com o ganho de normalização da faixa. O mixer não amplifica
+        acima de 1.0, então ganhos positivos só valem até esse limite.
+        """
+        ganho = self.ganho_faixa_db if self.normalizacao else 0.0
+        return max(0.0, min(1.0, self.volume * 10 ** (ganho / 20)))
+
+    def _aplicar_volume(self):
+        volume = self._volume_efetivo()
+        if self._music is not None:
+            self._music.set_volume(volume)
+        if self._motor_buffer is not None:
+            self._motor_buffer.set_volume(volume)
+
     def _set_equalizacao_internal(self, grave, medio, agudo):
         self.equalizacao = {'grave': grave, 'medio': medio, 'agudo': agudo}
+        if self.equalizador is not None:
+            self.equalizador.set_ganhos(grave, medio, agudo)
         self.notify('equalizacao')
 
 
     def carregar_musica(self, caminho):
-        self.command_queue.put(('load', (caminho,), {}))
+        """Enfileira o carregamento; o Future resolve para True/False. Um load pendente é substituído pelo mais recente."""
+        return self.comandos.enviar('load', caminho)
+
+    def preparar_proxima(self, caminho):
+        """Pré-carrega a faixa que deve tocar em seguida, sem intervalo (gapless)."""
+        return self.comandos.enviar('preload', caminho)
 
     def play(self):
-        self.command_queue.put(('play', (), {}))
+        return self.comandos.enviar('play')
 
     def play_pause(self):
-        self.command_queue.put(('play_pause', (), {}))
+        return self.comandos.enviar('play_pause')
 
     def pause(self):
-        self.command_queue.put(('pause', (), {}))
+        return self.comandos.enviar('pause')
 
     def resume(self):
-        self.command_queue.put(('resume', (), {}))
+        return self.comandos.enviar('resume')
 
     def parar(self):
-        self.command_queue.put(('stop', (), {}))
+        return self.comandos.enviar('stop')
+
+    def seek(self, segundos):
+        """Salta para a posição (em segundos). Buscas seguidas são colapsadas na mais recente."""
+        self._posicao_alvo = max(0.0, float(segundos))
+        return self.comandos.enviar('seek', self._posicao_alvo)
+
+    def avancar(self, delta):
+        """Busca relativa à posição atual (ou à busca ainda pendente), ex.: +10 / -10 segundos."""
+        return self.seek(self.get_progresso() + delta)
 
     def setar_volume(self, vol):
-        self.command_queue.put(('set_volume', (vol,), {}))
+        # O volume pedido vale imediatamente para get_volume(); o mixer é ajustado pela thread de áudio
+        self.volume = max(0.0, min(1.0, float(vol)))
+        return self.comandos.enviar('set_volume', self.volume)
 
     def set_equalizacao(self, grave, medio, agudo):
-        self.command_queue.put(('set_equalizacao', (grave, medio, agudo), {}))
+        return self.comandos.enviar('set_equalizacao', grave, medio, agudo)
+
+    def set_normalizacao(self, ativa):
+        """Liga/desliga o ganho por faixa; o mixer é reajustado pela thread de áudio."""
+        self.normalizacao = bool(ativa)
+        return self.comandos.enviar('set_volume', self.volume)
+
+    def get_estatisticas_comandos(self):
+        return self.comandos.estatisticas()
+
+    def get_estatisticas_buffer(self):
+        """
+        Perfil, tamanho e latência do buffer do mixer, subexecuções, atrasos e
+        ajustes, mais a latência de ponta a ponta dos comandos que o usuário sente
+        (fila + execução do comando + buffer do mixer até ser ouvido).
+        """
+        estatisticas = self.buffer_mixer.estatisticas()
+        comandos = self.comandos.estatisticas()
+        executados = 0
+        total_ms = 0.0
+        for nome in ('play_pause', 'pause', 'resume', 'set_volume', 'seek'):
+            m = comandos.get(nome)
+            if m:
+                executados += m['executados']
+                total_ms += (m['espera_media_ms'] + m['execucao_media_ms']) * m['executados']
+        estatisticas['latencia_comando_ms'] = (total_ms / executados if executados else 0.0) + estatisticas['latencia_buffer_ms']
+        return estatisticas
+
+    def get_estatisticas_fluxo(self):
+        """
+        Métricas do decodificador em fluxo da faixa atual (fila, paradas, latência de
+        recarga depois de busca) mais as subexecuções do motor, ou None se ela não
+        toca em fluxo.
+        """
+        fluxo = self._fluxo
+        if fluxo is None or not self._usando_buffer:
+            return None
+        estatisticas = fluxo.estatisticas()
+        estatisticas['subexecucoes'] = self._motor_buffer.subexecucoes
+        return estatisticas
+
+    def get_metricas_eventos(self):
+        return self.eventos.metricas()
 
     def get_volume(self):
         return self.volume
@@ -221,11 +696,22 @@ class AudioPlayer:
     def get_progresso(self):
         if not self.musica_atual:
             return 0
-        
-        pos_ms = pygame.mixer.music.get_pos()
-        if pos_ms == -1: 
-            return 0
-        return pos_ms / 1000.0 
+
+        alvo = self._posicao_alvo
+        if alvo is not None:
+            return alvo
+
+        if self._usando_buffer:
+            return self._motor_buffer.posicao_segundos()
+
+        posicao = self.relogio.posicao()
+        if self.duracao:
+            posicao = min(posicao, self.duracao)
+        return posicao
+
+    def get_intervalo_ultima_troca(self):
+        """Intervalo medido (ms) entre o fim da faixa anterior e o início da preparada, ou None se não pôde ser medido."""
+        return self.ultimo_intervalo_ms
 
     def get_duracao(self):
         return self.duracao 
@@ -236,47 +722,98 @@ class AudioPlayer:
         return os.path.basename(self.musica_atual)
 
     def get_audio_samples(self, num_samples=2048):
-        if self._audio_segment is None:
+        fonte = self._fonte_amostras
+        if fonte is None:
             return None
-        
-        progresso_segundos = self.get_progresso()
-        ms_pos = int(progresso_segundos * 1000)
-
-        sample_length_ms = int(1000 * num_samples / self._audio_segment.frame_rate)
-        start_ms = max(0, ms_pos - sample_length_ms)
-        end_ms = ms_pos
-        
-        segmento = self._audio_segment[start_ms:end_ms]
-        
-        if len(segmento) == 0:
+
+        arr = fonte.ler(self.get_progresso(), num_samples)
+        if arr is None or len(arr) == 0:
             return None
-        
-        samples = segmento.get_array_of_samples()
-        arr = np.array(samples).astype(np.float32)
-        
-        if self._audio_segment.channels > 1:
-            arr = arr[::self._audio_segment.channels] 
-        
-        if len(arr) > num_samples:
-            arr = arr[-num_samples:] 
-        elif len(arr) < num_samples:
+
+        if len(arr) < num_samples:
             arr = np.pad(arr, (num_samples - len(arr), 0))
             
         return arr
 
+    def _run_espectro_producer(self):
+        """Calcula o espectro fora da thread da UI e publica sempre o quadro mais recente."""
+        while not self._parar_espectro.is_set():
+            inicio = time.perf_counter()
+            num_barras = self._num_barras_espectro
+            if self.musica_atual and self.is_playing():
+                barras = self._calcular_espectro(num_barras)
+                # Troca de referência de uma tupla imutável: a leitura na UI nunca vê um quadro pela metade
+                self._espectro_publicado = (num_barras, tuple(barras))
+            intervalo = 1.0 / max(1, self.taxa_espectro)
+            self._parar_espectro.wait(max(0.0, intervalo - (time.perf_counter() - inicio)))
+
+    def set_taxa_espectro(self, quadros_por_segundo):
+        self.taxa_espectro = max(1, int(quadros_por_segundo))
+
     def espectro(self, num_barras=40):
+        """Retorna o último quadro publicado pela thread de análise, sem calcular nada aqui."""
+        self._num_barras_espectro = num_barras
+        barras_publicadas, quadro = self._espectro_publicado
+        if barras_publicadas != num_barras:
+            return [0] * num_barras
+        return list(quadro)
+
+    def set_modo_espectro(self, modo):
+        if modo not in ('multirresolucao', 'fft'):
+            raise ValueError(f"Modo de espectro desconhecido: {modo}")
+        self.modo_espectro = modo
+        self._espectro_anterior = None
+        self._espectro_max = 1.0
+
+    def _bandas_multirresolucao(self, num_barras):
+        """
+        Alimenta o EspectroMultirresolucao só com as amostras tocadas desde o último
+        quadro; depois de uma busca, troca de faixa ou pausa longa ele é reiniciado
+        com o histórico completo. Retorna None se ainda não há amostras.
+        """
+        fonte = self._fonte_amostras
+        if fonte is None:
+            return None
+        taxa = getattr(fonte, 'frame_rate', 44100)
+        analisador = self._multirresolucao
+        if analisador is None or analisador.taxa != taxa or analisador.num_bandas != num_barras:
+            analisador = self._multirresolucao = EspectroMultirresolucao(taxa, num_barras)
+            self._barras_multirresolucao = None
+
+        progresso = self.get_progresso()
+        fim = int(progresso * taxa)
+        novas = None if analisador.fim is None else fim - analisador.fim
+        if self._multirresolucao_faixa != self.musica_atual or novas is None or novas < 0 or novas > analisador.historico:
+            analisador.reiniciar()
+            self._multirresolucao_faixa = self.musica_atual
+            self._barras_multirresolucao = None
+            novas = analisador.historico
+        if novas == 0 and self._barras_multirresolucao is not None:
+            return self._barras_multirresolucao  # Nada tocou desde o último quadro
+
+        amostras = fonte.ler(progresso, novas)
+        if amostras is None or len(amostras) == 0:
+            return self._barras_multirresolucao
+        analisador.alimentar(amostras, fim)
+        self._barras_multirresolucao = analisador.bandas()
+        return self._barras_multirresolucao
+
+    def _calcular_espectro(self, num_barras=40):
         try:
-            samples = self.get_audio_samples(4096)
-            if samples is not None and len(samples) > 0:
-                window = np.hanning(len(samples))
-                windowed_samples = samples * window
-                
-                fft = np.abs(np.fft.rfft(windowed_samples))
-                
-                freqs = np.fft.rfftfreq(len(samples), 1/44100) 
-                
-                barras = self._get_spectrum_bands(fft, freqs, num_barras)
-                
+            if self.modo_espectro == 'multirresolucao':
+                barras = self._bandas_multirresolucao(num_barras)
+            else:
+                barras = None
+                samples = self.get_audio_samples(4096)
+                if samples is not None and len(samples) > 0:
+                    windowed_samples = samples * _janela_hanning(len(samples))
+
+                    fft = np.abs(np.fft.rfft(windowed_samples))
+
+                    taxa = getattr(self._fonte_amostras, 'frame_rate', 44100)
+                    barras = self._get_spectrum_bands(fft, num_barras, taxa)
+
+            if barras is not None:
                 self._reset_counter += 1
                 if self._reset_counter > 200:  
                     self._espectro_max = 1.0
@@ -313,57 +850,49 @@ class AudioPlayer:
             print(f"Erro no espectro: {e}")
             return [0] * num_barras
 
-    def _get_spectrum_bands(self, fft_data, freqs, num_bands):
+    @staticmethod
+    def _get_spectrum_bands(fft_data, num_bands, taxa=44100):
         if num_bands == 0:
             return np.array([])
 
-        min_freq = 20     
-        max_freq = 20000  
-        
-        freq_indices = np.where((freqs >= min_freq) & (freqs <= max_freq))[0]
-        if len(freq_indices) == 0:
+        bins, bandas, pesos = _plano_bandas(len(fft_data), int(taxa), num_bands)
+        if len(bins) == 0:
             return np.zeros(num_bands)
 
-        log_min_freq = np.log10(min_freq)
-        log_max_freq = np.log10(max_freq)
-        log_steps = np.log10(np.linspace(10**log_min_freq, 10**log_max_freq, num_bands + 1))
-        
-        bands_output = np.zeros(num_bands)
-        
-        for i in range(num_bands):
-            f_low = 10**log_steps[i]
-            f_high = 10**log_steps[i+1]
-            
-            band_freq_indices = np.where((freqs >= f_low) & (freqs < f_high))[0]
-            
-            if len(band_freq_indices) > 0:
-                bands_output[i] = np.sum(fft_data[band_freq_indices])
-            else:
-                bands_output[i] = 0
-        
-        for i in range(num_bands):
-            f_center = 10**((log_steps[i] + log_steps[i+1])/2)
-            if 250 <= f_center <= 4000:
-                bands_output[i] *= 1.5 
-        
-        return bands_output
+        bands_output = np.bincount(bandas, weights=fft_data[bins], minlength=num_bands)
+        return bands_output * pesos
 
     def is_playing(self):
-        return pygame.mixer.music.get_busy() and not self.pausado
+        return self._ocupado() and not self.pausado
 
     def check_events(self):
-        for event in pygame.event.get():
-            if event.type == self.EVENTO_FIM_MUSICA:
-                self.notify('musica_terminada')
-                self.pausado = False
-                
-    def set_equalizacao(self, grave, medio, agudo):
-        self.equalizacao = {'grave': grave, 'medio': medio, 'agudo': agudo}
-        self.notify('equalizacao')
+        if self._aguardando_proxima_desde is not None and self._music.get_busy():
+            self.ultimo_intervalo_ms = (time.perf_counter() - self._aguardando_proxima_desde) * 1000
+            self._aguardando_proxima_desde = None
+
+        for tipo in self.saida.eventos():
+            if tipo == self.EVENTO_FIM_MUSICA:
+                # Com pygame.mixer.music.queue, o fim da faixa já inicia a próxima preparada
+                if self._usando_buffer or not self._avancar_para_proxima():
+                    self.relogio.parar()
+                    self.notify('musica_terminada')
+                    self.pausado = False
+            elif tipo == self.EVENTO_PROXIMA_FAIXA:
+                self._avancar_para_proxima()
+
 
     def quit(self):
-        """Envia um comando para o thread de áudio parar e desinicializa o pygame mixer."""
-        self.command_queue.put(('quit', (), {}))
-        self._command_thread.join(timeout=1)
-        pygame.mixer.quit()
-        pygame.quit()
\ No newline at end of file
+        """Encerra o barramento de comandos e as threads de áudio e fecha a saída de áudio."""
+        self.comandos.encerrar(timeout=1)
+        self.eventos.encerrar(timeout=1)
+        self.sonda.salvar()
+        self._parar_espectro.set()
+        self._espectro_thread.join(timeout=1)
+        self.buffer_mixer.encerrar()
+        if self._motor_buffer is not None:
+            self._motor_buffer.encerrar()
+        for fluxo in (self._fluxo, self._fluxo_proximo):
+            if fluxo is not None:
+                fluxo.fechar()
+        self._fechar_arquivo_busca()
+        self.saida.encerrar()
\ No newline at end of file
@@ -0,0 +1,144 @@
+# barramento_comandos.py
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+# Comandos que alteram o estado do player e não dependem da ordem: só o mais recente importa
+_SEM_BARREIRA = frozenset()
+# Comandos que não podem ser "atravessados" por um load/preload mais recente
+_BARREIRAS_TRANSPORTE = frozenset({'stop', 'pause', 'resume', 'play_pause', 'seek', 'quit'})
+
+COALESCENCIA = {
+    'set_volume': _SEM_BARREIRA,
+    'set_equalizacao': _SEM_BARREIRA,
+    'load': _BARREIRAS_TRANSPORTE,
+    # Um load cancela a faixa preparada: o preload feito depois dele não pode ocupar o lugar de um anterior
+    'preload': _BARREIRAS_TRANSPORTE | {'load', 'play'},
+    # Buscas seguidas: só a última posição importa, mas nunca atravessam uma troca de faixa
+    'seek': frozenset({'load', 'stop', 'play', 'play_pause', 'quit'}),
+}
+
+
+class _Comando:
+    __slots__ = ('nome', 'args', 'futuro', 'enfileirado_em')
+
+    def __init__(self, nome, args):
+        self.nome = nome
+        self.args = args
+        self.futuro = Future()
+        self.enfileirado_em = time.perf_counter()
+
+
+class BarramentoComandos:
+    """
+    Fila de comandos do AudioPlayer processada por uma única thread. Comandos
+    superados são colapsados (o load/volume mais recente vence, ocupando o lugar
+    do pendente) e cada envio devolve um Future com o resultado. Também mede,
+    por comando, o tempo de espera na fila e o tempo de execução.
+    """
+
+    def __init__(self, executar):
+        self._executar = executar
+        self._pendentes = deque()
+        self._condicao = threading.Condition()
+        self._encerrado = False
+        self._estatisticas = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def enviar(self, nome, *args):
+        comando = _Comando(nome, args)
+        with self._condicao:
+            if self._encerrado:
+                comando.futuro.set_result(None)
+                return comando.futuro
+            substituido = self._substituir_pendente(comando)
+            if substituido is None:
+                self._pendentes.append(comando)
+            else:
+                self._estatistica(nome)['colapsados'] += 1
+                substituido.futuro.cancel()
+            self._condicao.notify()
+        return comando.futuro
+
+    def _substituir_pendente(self, comando):
+        """Troca, no mesmo lugar da fila, um comando pendente que o novo torna obsoleto."""
+        barreiras = COALESCENCIA.get(comando.nome)
+        if barreiras is None:
+            return None
+        for i in range(len(self._pendentes) - 1, -1, -1):
+            pendente = self._pendentes[i]
+            if pendente.nome == comando.nome:
+                comando.enfileirado_em = pendente.enfileirado_em
+                self._pendentes[i] = comando
+                return pendente
+            if pendente.nome in barreiras:
+                return None
+        return None
+
+    def _run(self):
+        while True:
+            with self._condicao:
+                while not self._pendentes and not self._encerrado:
+                    self._condicao.wait()
+                if not self._pendentes:
+                    return
+                comando = self._pendentes.popleft()
+
+            if not comando.futuro.set_running_or_notify_cancel():
+                continue
+            inicio = time.perf_counter()
+            try:
+                resultado = self._executar(comando.nome, comando.args)
+                comando.futuro.set_result(resultado)
+            except Exception as e:
+                print(f"Erro no thread de comando do áudio ({comando.nome}): {e}")
+                comando.futuro.set_exception(e)
+            fim = time.perf_counter()
+            self._registrar(comando.nome, inicio - comando.enfileirado_em, fim - inicio)
+
+    def _estatistica(self, nome):
+        estatistica = self._estatisticas.get(nome)
+        if estatistica is None:
+            estatistica = {'executados': 0, 'colapsados': 0,
+                           'espera_total_ms': 0.0, 'espera_max_ms': 0.0,
+                           'execucao_total_ms': 0.0, 'execucao_max_ms': 0.0}
+            self._estatisticas[nome] = estatistica
+        return estatistica
+
+    def _registrar(self, nome, espera, execucao):
+        with self._condicao:
+            estatistica = self._estatistica(nome)
+            estatistica['executados'] += 1
+            estatistica['espera_total_ms'] += espera * 1000
+            estatistica['espera_max_ms'] = max(estatistica['espera_max_ms'], espera * 1000)
+            estatistica['execucao_total_ms'] += execucao * 1000
+            estatistica['execucao_max_ms'] = max(estatistica['execucao_max_ms'], execucao * 1000)
+
+    def estatisticas(self):
+        """Por comando: executados, colapsados e latências médias/máximas (ms) de fila e execução."""
+        with self._condicao:
+            resumo = {}
+            for nome, e in self._estatisticas.items():
+                n = max(1, e['executados'])
+                resumo[nome] = {
+                    'executados': e['executados'],
+                    'colapsados': e['colapsados'],
+                    'espera_media_ms': e['espera_total_ms'] / n,
+                    'espera_max_ms': e['espera_max_ms'],
+                    'execucao_media_ms': e['execucao_total_ms'] / n,
+                    'execucao_max_ms': e['execucao_max_ms'],
+                }
+            return resumo
+
+    def pendentes(self):
+        with self._condicao:
+            return len(self._pendentes)
+
+    def encerrar(self, timeout=1):
+        """Processa o que já está na fila e encerra a thread."""
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify()
+        self._thread.join(timeout=timeout)
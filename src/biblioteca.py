@@ -1,84 +1,231 @@
 import os
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from mutagen import File
+from varredura import varrer
+from busca_texto import IndiceTexto, tokenizar
+
+TAMANHO_LOTE_METADADOS = 64  # Arquivos por tarefa do pool e por lote entregue a quem chamou
+MAX_THREADS_METADADOS = 8
+
+
+def ler_metadados(caminho):
+    """
+    Lê tags e duração abrindo o arquivo uma única vez: o File(easy=True) do
+    mutagen já traz o .info com a duração.
+    """
+    try:
+        audio = File(caminho, easy=True)
+        return {
+            'artista': audio.get('artist', ['Desconhecido'])[0],
+            'album': audio.get('album', ['Desconhecido'])[0],
+            'genero': audio.get('genre', ['Desconhecido'])[0],
+            'titulo': audio.get('title', [os.path.basename(caminho)])[0],
+            'duracao': audio.info.length if audio.info else 0
+        }
+    except Exception:
+        return {
+            'artista': 'Desconhecido',
+            'album': 'Desconhecido',
+            'genero': 'Desconhecido',
+            'titulo': os.path.basename(caminho),
+            'duracao': 0
+        }
+
+
+def _ler_lote(caminhos):
+    """Executa em uma thread ou processo do pool."""
+    return [(caminho, ler_metadados(caminho)) for caminho in caminhos]
+
+
+def ler_metadados_em_lotes(caminhos, modo='threads', max_workers=None, tamanho_lote=TAMANHO_LOTE_METADADOS):
+    """
+    Lê os metadados de `caminhos` em paralelo e os devolve em lotes de
+    [(caminho, metadados)], na ordem em que ficam prontos. 'threads' serve para
+    discos lentos e compartilhamentos de rede (a espera é de E/S); 'processos',
+    para coleções locais grandes, em que o custo é o parsing das tags em Python.
+    """
+    if modo not in ('threads', 'processos'):
+        raise ValueError(f"Modo de leitura desconhecido: {modo}")
+    caminhos = list(caminhos)
+    lotes = [caminhos[i:i + tamanho_lote] for i in range(0, len(caminhos), tamanho_lote)]
+    if len(lotes) <= 1:
+        # Um lote só não compensa subir o pool
+        for lote in lotes:
+            yield _ler_lote(lote)
+        return
+    if modo == 'threads':
+        executor = ThreadPoolExecutor(max_workers=max_workers or MAX_THREADS_METADADOS)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+    with executor:
+        for futuro in as_completed([executor.submit(_ler_lote, lote) for lote in lotes]):
+            yield futuro.result()
+
 
 class Musica:
-    def __init__(self, caminho):
+    def __init__(self, caminho, metadados=None):
         self.caminho = caminho
-        self.metadados = self.extrair_metadados()
+        # Metadados já conhecidos (do IndiceBiblioteca, por exemplo) dispensam abrir o arquivo
+        self.metadados = metadados if metadados is not None else self.extrair_metadados()
 
     def extrair_metadados(self):
-        try:
-            audio = File(self.caminho, easy=True)
-            duracao = 0
-            audio_full = File(self.caminho)
-            if audio_full and audio_full.info:
-                duracao = audio_full.info.length
-            return {
-                'artista': audio.get('artist', ['Desconhecido'])[0],
-                'album': audio.get('album', ['Desconhecido'])[0],
-                'genero': audio.get('genre', ['Desconhecido'])[0],
-                'titulo': audio.get('title', [os.path.basename(self.caminho)])[0],
-                'duracao': duracao
-            }
-        except Exception:
-            return {
-                'artista': 'Desconhecido',
-                'album': 'Desconhecido',
-                'genero': 'Desconhecido',
-                'titulo': os.path.basename(self.caminho),
-                'duracao': 0
-            }
-
-class NodoMusica:
-    def __init__(self, musica):
-        self.musica = musica
-        self.esq = None
-        self.dir = None
-
-class ArvoreMusicas:
-    def __init__(self):
-        self.raiz = None
+        return ler_metadados(self.caminho)
+
+def chave_ordenacao(valor):
+    """Ordena números como números e textos sem diferenciar maiúsculas; valores ausentes vão para o fim."""
+    if isinstance(valor, (int, float)):
+        return (0, valor, '')
+    if valor is None or valor == '':
+        return (2, 0, '')
+    return (1, 0, str(valor).lower())
+
+class IndiceTitulos:
+    """
+    Músicas ordenadas por título em duas listas paralelas (títulos e músicas),
+    consultadas com bisect: busca exata, por prefixo e por intervalo em
+    O(log n) mais o tamanho da resposta. Montar a partir de uma lista custa um
+    sort, O(n log n), e não depende da ordem de entrada (pastas já vêm em ordem
+    alfabética, o pior caso de uma árvore binária sem balanceamento). Títulos
+    iguais ficam na ordem em que foram inseridos.
+    """
+
+    def __init__(self, musicas=()):
+        self.construir(musicas)
+
+    @staticmethod
+    def _titulo(musica):
+        return musica.metadados['titulo']
+
+    def construir(self, musicas):
+        ordenadas = sorted(musicas, key=self._titulo)
+        self._titulos = [self._titulo(m) for m in ordenadas]
+        self._musicas = ordenadas
+
+    def __len__(self):
+        return len(self._musicas)
 
     def inserir(self, musica):
-        def _inserir(no, musica):
-            if no is None:
-                return NodoMusica(musica)
-            if musica.metadados['titulo'] < no.musica.metadados['titulo']:
-                no.esq = _inserir(no.esq, musica)
-            else:
-                no.dir = _inserir(no.dir, musica)
-            return no
-        self.raiz = _inserir(self.raiz, musica)
+        titulo = self._titulo(musica)
+        i = bisect_right(self._titulos, titulo)
+        self._titulos.insert(i, titulo)
+        self._musicas.insert(i, musica)
+
+    def remover(self, musica):
+        """Retira `musica` (a própria instância) do índice; retorna False se ela não estava nele."""
+        titulo = self._titulo(musica)
+        i, fim = bisect_left(self._titulos, titulo), bisect_right(self._titulos, titulo)
+        for j in range(i, fim):
+            if self._musicas[j] is musica:
+                del self._titulos[j]
+                del self._musicas[j]
+                return True
+        return False
 
     def buscar(self, titulo):
-        def _buscar(no, titulo):
-            if no is None:
-                return None
-            if titulo == no.musica.metadados['titulo']:
-                return no.musica
-            elif titulo < no.musica.metadados['titulo']:
-                return _buscar(no.esq, titulo)
-            else:
-                return _buscar(no.dir, titulo)
-        return _buscar(self.raiz, titulo)
+        """Primeira música com exatamente este título, ou None."""
+        i = bisect_left(self._titulos, titulo)
+        if i < len(self._titulos) and self._titulos[i] == titulo:
+            return self._musicas[i]
+        return None
+
+    def buscar_prefixo(self, prefixo):
+        if not prefixo:
+            return list(self._musicas)
+        inicio = bisect_left(self._titulos, prefixo)
+        # Tudo que começa com o prefixo fica antes dele com o último caractere incrementado
+        fim = bisect_left(self._titulos, prefixo[:-1] + chr(ord(prefixo[-1]) + 1), inicio)
+        return self._musicas[inicio:fim]
+
+    def buscar_intervalo(self, minimo=None, maximo=None):
+        """Músicas com título entre minimo e maximo, inclusive; None deixa o lado aberto."""
+        inicio = 0 if minimo is None else bisect_left(self._titulos, minimo)
+        fim = len(self._titulos) if maximo is None else bisect_right(self._titulos, maximo)
+        return self._musicas[inicio:fim]
 
 class Biblioteca:
-    def __init__(self):
+    def __init__(self, indice=None, modo_leitura='threads', max_workers=None):
+        """
+        `indice`: IndiceBiblioteca opcional; com ele, só arquivos novos ou alterados
+        são lidos pelo mutagen. `modo_leitura`: 'threads' ou 'processos' (ver
+        ler_metadados_em_lotes).
+        """
         self.musicas = []
-        self.arvore = ArvoreMusicas()
+        self.titulos = IndiceTitulos()
+        self.busca = IndiceTexto()
+        self.indice = indice
+        self.modo_leitura = modo_leitura
+        self.max_workers = max_workers
+
+    def _ler_em_lotes(self, caminhos):
+        return ler_metadados_em_lotes(caminhos, modo=self.modo_leitura, max_workers=self.max_workers)
 
-    def carregar_diretorio(self, caminho):
-        extensoes = ['.mp3', '.wav', '.flac', '.ogg']
+    def carregar_diretorio(self, caminho, ao_lote=None, ao_encontrar=None, ao_progredir=None,
+                           profundidade=None, seguir_links=False):
+        """
+        Carrega as músicas da pasta e das subpastas (ver Varredura para
+        `profundidade`, `seguir_links` e `ao_progredir`). `ao_encontrar(caminho)`
+        é chamado para cada arquivo assim que a varredura o encontra, antes de
+        qualquer tag ser lida. Os metadados são lidos em paralelo e
+        `self.musicas` cresce a cada lote pronto; `ao_lote(novas, feitas, total)`
+        é chamado a cada lote, para a interface mostrar resultados parciais.
+        """
         try:
-            arquivos = os.listdir(caminho)
-            self.musicas = [Musica(os.path.join(caminho, f))
-                            for f in arquivos if os.path.splitext(f)[1].lower() in extensoes]
-            for musica in self.musicas:
-                self.arvore.inserir(musica)
-            return self.musicas
+            caminhos = []
+            stats = {}
+            for entrada in varrer(caminho, profundidade=profundidade, seguir_links=seguir_links,
+                                  ao_progredir=ao_progredir):
+                caminhos.append(entrada.path)
+                if self.indice is not None:
+                    try:
+                        stats[entrada.path] = entrada.stat()
+                    except OSError:
+                        pass
+                if ao_encontrar is not None:
+                    ao_encontrar(entrada.path)
         except Exception as e:
             print(f"Erro ao carregar diretório: {e}")
             return []
+        return self.carregar_faixas(caminho, caminhos, ao_lote=ao_lote, stats=stats, profundidade=profundidade)
+
+    def carregar_faixas(self, pasta, caminhos, ao_lote=None, stats=None, profundidade=None):
+        """
+        Carrega as músicas de `caminhos`, arquivos já encontrados por uma varredura
+        de `pasta` (por exemplo a da playlist), sem percorrer a árvore de novo.
+        `stats` ({caminho: os.stat_result}) e `profundidade` são os da varredura,
+        para o índice não repetir o os.stat nem podar além do que ela cobriu.
+        `ao_lote` como em carregar_diretorio.
+        """
+        try:
+            caminhos = list(caminhos)
+            self.musicas = []
+            self.busca.construir(())
+
+            def receber(lote):
+                novas = [Musica(c, metadados) for c, metadados in lote]
+                self.musicas.extend(novas)
+                for musica in novas:
+                    self.busca.adicionar(musica)  # Já dá para buscar nas faixas lidas até aqui
+                if ao_lote is not None:
+                    ao_lote(novas, len(self.musicas), len(caminhos))
+
+            if self.indice is not None:
+                self.indice.sincronizar(pasta, caminhos, self._ler_em_lotes, receber,
+                                        stats=stats, profundidade=profundidade)
+            else:
+                for lote in self._ler_em_lotes(caminhos):
+                    receber(lote)
+            ordem = {c: i for i, c in enumerate(caminhos)}
+            ordenadas = sorted(self.musicas, key=lambda m: ordem[m.caminho])
+            if ordenadas != self.musicas:
+                # Lotes chegaram fora de ordem: a busca é refeita na ordem final, que é a dos resultados
+                self.busca.construir(ordenadas)
+            self.musicas = ordenadas
+            self.titulos.construir(self.musicas)
+            return self.musicas
+        except Exception as e:
+            print(f"Erro ao carregar músicas: {e}")
+            return []
 
     def listar_musicas(self):
         return self.musicas
@@ -92,11 +239,63 @@ class Biblioteca:
             grupos.setdefault(valor, []).append(musica)
         return grupos
 
+    def adicionar(self, musica):
+        self.remover(musica.caminho)
+        self.musicas.append(musica)
+        self.titulos.inserir(musica)
+        self.busca.adicionar(musica)
+
+    def remover(self, caminho):
+        """Retira a música da biblioteca e dos índices; retorna False se ela não estava carregada."""
+        for i, musica in enumerate(self.musicas):
+            if musica.caminho == caminho:
+                del self.musicas[i]
+                self.titulos.remover(musica)
+                self.busca.remover(caminho)
+                return True
+        return False
+
     def buscar(self, termo):
-        return [m for m in self.musicas if termo.lower() in m.metadados['titulo'].lower()]
+        """
+        Músicas com todas as palavras de `termo` em titulo/artista/album/genero,
+        sem diferenciar acentos nem maiúsculas; cada palavra vale como prefixo.
+        """
+        if not tokenizar(termo):
+            # Sem nenhuma palavra (só pontuação, por exemplo), vale a busca literal no título
+            return [m for m in self.musicas if termo.lower() in m.metadados['titulo'].lower()]
+        return self.busca.buscar(termo)
 
     def filtrar(self, chave, valor):
-        return [m for m in self.musicas if m.metadados.get(chave, '').lower() == valor.lower()]
+        if isinstance(valor, (int, float)):
+            return [m for m in self.musicas
+                    if isinstance(m.metadados.get(chave), (int, float)) and m.metadados[chave] == valor]
+        valor = str(valor).lower()
+        return [m for m in self.musicas if str(m.metadados.get(chave, '')).lower() == valor]
+
+    def filtrar_intervalo(self, chave, minimo=None, maximo=None):
+        """Músicas cujo metadado numérico (ex.: 'bpm') está entre minimo e maximo, inclusive."""
+        resultado = []
+        for m in self.musicas:
+            valor = m.metadados.get(chave)
+            if not isinstance(valor, (int, float)):
+                continue
+            if (minimo is None or valor >= minimo) and (maximo is None or valor <= maximo):
+                resultado.append(m)
+        return resultado
+
+    def ordenar_por(self, chave, reverso=False):
+        return sorted(self.musicas, key=lambda m: chave_ordenacao(m.metadados.get(chave)), reverse=reverso)
+
+    def aplicar_analise(self, analisador):
+        """Copia para Musica.metadados os valores já calculados por uma análise (ex.: AnalisadorAndamento)."""
+        for musica in self.musicas:
+            musica.metadados.update(analisador.metadados(musica.caminho))
 
     def buscar_arvore(self, titulo):
-        return self.arvore.buscar(titulo)
+        return self.titulos.buscar(titulo)
+
+    def buscar_prefixo(self, prefixo):
+        return self.titulos.buscar_prefixo(prefixo)
+
+    def buscar_intervalo_titulos(self, minimo=None, maximo=None):
+        return self.titulos.buscar_intervalo(minimo, maximo)
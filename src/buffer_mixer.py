@@ -0,0 +1,110 @@
+# buffer_mixer.py
+import time
+import threading
+
+# Tamanho do buffer do mixer (quadros): (inicial, mínimo, máximo) de cada perfil
+PERFIS_BUFFER = {
+    'adaptativo': (1024, 512, 4096),
+    'low_latency': (256, 256, 1024),
+    'low_cpu': (4096, 2048, 8192),
+}
+FAIXAS_PARA_REDUZIR = 3  # Faixas seguidas sem problema antes de tentar um buffer menor
+INTERVALO_MONITOR = 0.02
+
+
+class AdaptadorBufferMixer:
+    """
+    Escolhe o tamanho do buffer do mixer dentro dos limites do perfil. Conta as
+    subexecuções (canal sem áudio no meio da faixa) e os atrasos (a thread de
+    monitoramento acordou mais de um buffer depois do previsto, sinal de máquina
+    sobrecarregada) e decide entre uma faixa e outra: com problemas o buffer
+    dobra; depois de FAIXAS_PARA_REDUZIR faixas limpas ele cai pela metade.
+    """
+
+    def __init__(self, perfil='adaptativo', frequencia=44100):
+        self.frequencia = frequencia
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self.subexecucoes = 0
+        self.atrasos = 0
+        self.ajustes = []  # (de, para, motivo) das últimas mudanças de tamanho
+        self.set_perfil(perfil)
+
+    def set_perfil(self, perfil):
+        if perfil not in PERFIS_BUFFER:
+            raise ValueError(f"Perfil de buffer desconhecido: {perfil}")
+        with self._lock:
+            self.perfil = perfil
+            self.tamanho, self.minimo, self.maximo = PERFIS_BUFFER[perfil]
+            self._problemas_na_faixa = 0
+            self._faixas_limpas = 0
+
+    @property
+    def latencia_ms(self):
+        return self.tamanho / self.frequencia * 1000
+
+    def registrar_subexecucao(self):
+        with self._lock:
+            self.subexecucoes += 1
+            self._problemas_na_faixa += 1
+
+    def registrar_atraso(self):
+        with self._lock:
+            self.atrasos += 1
+            self._problemas_na_faixa += 1
+
+    def proximo_tamanho(self):
+        """Fecha a contagem da faixa que terminou e retorna o tamanho de buffer para a próxima."""
+        with self._lock:
+            anterior = self.tamanho
+            if self._problemas_na_faixa:
+                self.tamanho = min(self.maximo, self.tamanho * 2)
+                self._faixas_limpas = 0
+                motivo = f"{self._problemas_na_faixa} subexecuções/atrasos"
+            else:
+                self._faixas_limpas += 1
+                motivo = f"{self._faixas_limpas} faixas sem problemas"
+                if self._faixas_limpas >= FAIXAS_PARA_REDUZIR:
+                    self.tamanho = max(self.minimo, self.tamanho // 2)
+                    self._faixas_limpas = 0
+            self._problemas_na_faixa = 0
+            if self.tamanho != anterior:
+                self.ajustes = (self.ajustes + [(anterior, self.tamanho, motivo)])[-10:]
+            return self.tamanho
+
+    def iniciar_monitor(self, tocando):
+        """Mede o atraso de uma thread que acorda a cada INTERVALO_MONITOR enquanto `tocando()` for True."""
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._run_monitor, args=(tocando,), daemon=True)
+        self._thread.start()
+
+    def _run_monitor(self, tocando):
+        while not self._parar.is_set():
+            inicio = time.perf_counter()
+            self._parar.wait(INTERVALO_MONITOR)
+            atraso = time.perf_counter() - inicio - INTERVALO_MONITOR
+            if atraso * 1000 > self.latencia_ms and not self._parar.is_set():
+                try:
+                    ativo = tocando()
+                except Exception:
+                    ativo = False
+                if ativo:
+                    self.registrar_atraso()
+
+    def encerrar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'perfil': self.perfil,
+                'tamanho_buffer': self.tamanho,
+                'latencia_buffer_ms': self.latencia_ms,
+                'limites': (self.minimo, self.maximo),
+                'subexecucoes': self.subexecucoes,
+                'atrasos': self.atrasos,
+                'ajustes': list(self.ajustes),
+            }
@@ -0,0 +1,157 @@
+# busca_texto.py
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+import numpy as np
+
+CAMPOS_BUSCA = ('titulo', 'artista', 'album', 'genero')
+PROPORCAO_COMPACTAR = 0.25  # Fração de músicas removidas que faz o índice ser reconstruído sem elas
+_PALAVRA = re.compile(r'\w+')
+# Blocos Unicode de marcas combinantes: o que sobra dos acentos depois da decomposição NFKD
+_MARCAS = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: 'Coração' e 'CORACAO' viram 'coracao'."""
+    texto = str(texto)
+    if texto.isascii():
+        return texto.casefold()
+    return _MARCAS.sub('', unicodedata.normalize('NFKD', texto)).casefold()
+
+
+@lru_cache(maxsize=65536)  # Artistas, álbuns e gêneros se repetem muito numa biblioteca
+def _palavras_do_texto(texto):
+    return tuple(_PALAVRA.findall(normalizar(texto)))
+
+
+def tokenizar(texto):
+    return list(_palavras_do_texto(str(texto)))
+
+
+class IndiceTexto:
+    """
+    Índice invertido das palavras de titulo/artista/album/genero. Cada música
+    recebe um id crescente e cada palavra aponta para um array('i') com os ids
+    das músicas em que aparece; como os ids só crescem, acrescentar mantém as
+    listas ordenadas, e a interseção é feita pelo numpy sobre as próprias
+    listas, sem cópia. Cada palavra da consulta vale como prefixo ('beat'
+    encontra 'Beatles'), via bisect no vocabulário ordenado.
+
+    Remover só marca o id como vago; quando os vagos passam de
+    PROPORCAO_COMPACTAR do total, o índice é reconstruído sem eles.
+    """
+
+    def __init__(self, musicas=(), campos=CAMPOS_BUSCA):
+        self.campos = campos
+        self._lock = threading.Lock()
+        self.construir(musicas)
+
+    def construir(self, musicas):
+        """Refaz o índice com `musicas`, que recebem os ids 0..n-1 nessa ordem."""
+        musicas = list(musicas)
+        listas = defaultdict(list)
+        for id_musica, musica in enumerate(musicas):
+            for palavra in self._palavras(musica):
+                listas[palavra].append(id_musica)
+        with self._lock:
+            self._musicas = musicas  # id -> Musica; None depois de removida
+            self._ids = {musica.caminho: i for i, musica in enumerate(musicas)}  # caminho -> id
+            self._listas = {palavra: array('i', ids) for palavra, ids in listas.items()}  # Ids crescentes
+            self._vocabulario = sorted(self._listas)  # Para a busca por prefixo
+            self._vocabulario_ordenado = True
+            self._removidas = len(musicas) - len(self._ids)
+            if self._removidas:
+                # Caminho repetido: vale a última versão, as anteriores ficam como removidas
+                for i, musica in enumerate(musicas):
+                    if self._ids[musica.caminho] != i:
+                        musicas[i] = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _palavras(self, musica):
+        palavras = set()
+        for campo in self.campos:
+            valor = musica.metadados.get(campo)
+            if valor:
+                palavras.update(_palavras_do_texto(str(valor)))
+        return palavras
+
+    def adicionar(self, musica):
+        """Indexa `musica`; se o caminho já estava no índice, a versão anterior é substituída."""
+        with self._lock:
+            self._remover(musica.caminho)
+            self._adicionar(musica)
+
+    def _adicionar(self, musica):
+        id_musica = len(self._musicas)
+        self._musicas.append(musica)
+        self._ids[musica.caminho] = id_musica
+        for palavra in self._palavras(musica):
+            lista = self._listas.get(palavra)
+            if lista is None:
+                lista = self._listas[palavra] = array('i')
+                self._vocabulario.append(palavra)
+                self._vocabulario_ordenado = False
+            lista.append(id_musica)
+
+    def remover(self, caminho):
+        """Retira a música do índice; retorna False se o caminho não estava nele."""
+        with self._lock:
+            removida = self._remover(caminho)
+            if removida and self._removidas > PROPORCAO_COMPACTAR * len(self._musicas):
+                vivas = [m for m in self._musicas if m is not None]
+                self._musicas, self._ids, self._listas, self._vocabulario, self._removidas = [], {}, {}, [], 0
+                for musica in vivas:
+                    self._adicionar(musica)
+            return removida
+
+    def _remover(self, caminho):
+        id_musica = self._ids.pop(caminho, None)
+        if id_musica is None:
+            return False
+        self._musicas[id_musica] = None
+        self._removidas += 1
+        return True
+
+    def _ids_com_prefixo(self, prefixo):
+        if not self._vocabulario_ordenado:
+            self._vocabulario.sort()
+            self._vocabulario_ordenado = True
+        inicio = bisect_left(self._vocabulario, prefixo)
+        fim = bisect_left(self._vocabulario, prefixo[:-1] + chr(ord(prefixo[-1]) + 1), inicio)
+        listas = [np.frombuffer(self._listas[p], dtype=np.intc) for p in self._vocabulario[inicio:fim]]
+        if not listas:
+            return np.empty(0, dtype=np.intc)
+        if len(listas) == 1:
+            return listas[0]
+        return np.unique(np.concatenate(listas))
+
+    def buscar(self, termo):
+        """
+        Músicas que têm todas as palavras de `termo` (cada uma como prefixo), na
+        ordem em que foram indexadas.
+        """
+        palavras = set(tokenizar(termo))
+        if not palavras:
+            return []
+        with self._lock:
+            # As visões do numpy sobre os array('i') não podem sobreviver ao lock: um append falharia
+            conjuntos = []
+            for palavra in palavras:
+                ids = self._ids_com_prefixo(palavra)
+                if not len(ids):
+                    return []
+                conjuntos.append(ids)
+            conjuntos.sort(key=len)
+            resultado = conjuntos[0]
+            for ids in conjuntos[1:]:
+                resultado = np.intersect1d(resultado, ids, assume_unique=True)
+                if not len(resultado):
+                    return []
+            musicas = self._musicas
+            return [musicas[i] for i in resultado.tolist() if musicas[i] is not None]
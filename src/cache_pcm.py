@@ -0,0 +1,126 @@
+# cache_pcm.py
+import os
+import json
+import hashlib
+import threading
+from constants import PASTA_DADOS
+from fonte_amostras import iterar_pcm, FonteAmostrasMemmap
+from utils import aplicar_cota_lru
+
+PASTA_CACHE_PCM = os.path.join(PASTA_DADOS, 'cache_pcm')
+
+
+class CachePCM:
+    """
+    Cache em disco de faixas decodificadas (PCM int16 intercalado), indexado por
+    caminho + mtime + tamanho. Cada entrada é lida via np.memmap, e o espaço total
+    é limitado por uma cota com descarte das entradas usadas há mais tempo (LRU).
+    """
+
+    def __init__(self, pasta=PASTA_CACHE_PCM, cota_mb=2048):
+        self.pasta = pasta
+        self.cota_bytes = int(cota_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def chave(self, caminho, taxa, canais):
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return None
+        identidade = f"{os.path.abspath(caminho)}|{st.st_mtime_ns}|{st.st_size}|{taxa}|{canais}"
+        return hashlib.sha1(identidade.encode('utf-8')).hexdigest()
+
+    def _arquivos(self, chave):
+        base = os.path.join(self.pasta, chave)
+        return base + '.pcm', base + '.json'
+
+    def abrir(self, caminho, taxa, canais):
+        """Retorna uma FonteAmostrasMemmap para a faixa, ou None se ela não estiver no cache."""
+        meta = self._abrir_meta(caminho, taxa, canais)
+        if meta is None:
+            return None
+        arquivo_pcm, quadros = meta
+        try:
+            return FonteAmostrasMemmap(arquivo_pcm, taxa, canais, quadros)
+        except (OSError, ValueError):
+            return None
+
+    def abrir_dados(self, caminho, taxa, canais):
+        """Retorna o PCM da faixa como np.memmap (quadros, canais), ou None se não estiver no cache."""
+        fonte = self.abrir(caminho, taxa, canais)
+        return None if fonte is None else fonte.dados
+
+    def _abrir_meta(self, caminho, taxa, canais):
+        chave = self.chave(caminho, taxa, canais)
+        if chave is None:
+            return None
+        arquivo_pcm, arquivo_meta = self._arquivos(chave)
+        try:
+            with open(arquivo_meta, 'r', encoding='utf-8') as f:
+                quadros = json.load(f)['quadros']
+            if quadros <= 0:
+                return None
+            os.utime(arquivo_pcm, None)  # Marca como usado recentemente (LRU)
+            return arquivo_pcm, quadros
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def contem(self, caminho, taxa, canais):
+        chave = self.chave(caminho, taxa, canais)
+        return chave is not None and os.path.exists(self._arquivos(chave)[1])
+
+    def armazenar(self, caminho, taxa, canais):
+        """Decodifica a faixa em fluxo direto para o disco. Retorna True se a entrada foi criada."""
+        chave = self.chave(caminho, taxa, canais)
+        if chave is None:
+            return False
+        with self._lock:
+            em_andamento = self._em_andamento.get(chave)
+            if em_andamento is None:
+                self._em_andamento[chave] = threading.Event()
+        if em_andamento is not None:
+            # Outra thread já está decodificando esta faixa: aguarda em vez de repetir o trabalho
+            em_andamento.wait()
+            return self.contem(caminho, taxa, canais)
+
+        arquivo_pcm, arquivo_meta = self._arquivos(chave)
+        temporario = arquivo_pcm + '.tmp'
+        try:
+            if os.path.exists(arquivo_meta):
+                return True
+            total_bytes = 0
+            with open(temporario, 'wb') as f:
+                for bloco in iterar_pcm(caminho, taxa, canais):
+                    f.write(bloco)
+                    total_bytes += len(bloco)
+            quadros = total_bytes // (2 * canais)
+            if quadros == 0:
+                os.remove(temporario)
+                return False
+            os.replace(temporario, arquivo_pcm)
+            with open(arquivo_meta, 'w', encoding='utf-8') as f:
+                json.dump({'caminho': os.path.abspath(caminho), 'taxa': taxa,
+                           'canais': canais, 'quadros': quadros}, f)
+            self._aplicar_cota()
+            return True
+        except Exception as e:
+            print(f"Erro ao gravar cache PCM de {os.path.basename(caminho)}: {e}")
+            if os.path.exists(temporario):
+                try:
+                    os.remove(temporario)
+                except OSError:
+                    pass
+            return False
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave).set()
+
+    def armazenar_em_segundo_plano(self, caminho, taxa, canais):
+        thread = threading.Thread(target=self.armazenar, args=(caminho, taxa, canais), daemon=True)
+        thread.start()
+        return thread
+
+    def _aplicar_cota(self):
+        aplicar_cota_lru(self.pasta, self.cota_bytes)
@@ -0,0 +1,178 @@
+# controle_eq.py
+import threading
+
+MODOS_EQ = ('tempo_real', 'pre_render')
+ESPERA_RENDER = 0.5  # Segundos sem mexer nos controles antes de agendar os renders
+
+
+class ControleEQ:
+    """
+    Liga os ganhos da tela de equalização ao player. Em 'tempo_real', os ganhos
+    vão para o equalizador do MotorBuffer; em 'pre_render', o player toca os WAVs
+    do ServicoRenderEQ e o equalizador ao vivo fica plano, para a EQ não ser
+    aplicada duas vezes. Guarda a faixa original e o arquivo entregue ao player
+    (a atual e a pré-carregada), para que uma mudança de ganhos ou de modo troque
+    o arquivo da faixa que está tocando sem mudar a posição.
+
+    No modo 'pre_render', cada ajuste cancela os renders na fila com os ganhos
+    anteriores, e os novos só são agendados depois de `espera_render` segundos
+    sem outro ajuste; quando o render da faixa atual fica pronto, ela passa a
+    tocar dele na mesma posição.
+    """
+
+    def __init__(self, player, render_eq, modo='tempo_real', espera_render=ESPERA_RENDER):
+        if modo not in MODOS_EQ:
+            raise ValueError(f"Modo de equalização desconhecido: {modo}")
+        self.player = player
+        self.render_eq = render_eq
+        self.modo = modo
+        self.ganhos = {'grave': 0, 'medio': 0, 'agudo': 0}
+        self.faixa_tocando = None  # Caminho original da faixa atual
+        self.arquivo_tocando = None  # Arquivo entregue ao player: o render com EQ, se houver
+        self.faixa_proxima = None
+        self.arquivo_proximo = None
+        self.espera_render = espera_render
+        self._temporizador = None
+        self._lock = threading.Lock()  # Os renders terminam nas threads do pool
+
+    def _ganhos(self):
+        return self.ganhos['grave'], self.ganhos['medio'], self.ganhos['agudo']
+
+    def plana(self):
+        return not any(self.ganhos.values())
+
+    def arquivo_para(self, faixa, agendar=True):
+        """
+        Arquivo que o player deve tocar para `faixa`. No modo 'pre_render', é o render
+        com os ganhos atuais; se ele ainda não estiver no cache, a faixa original, e o
+        render é agendado (se `agendar`).
+        """
+        if self.modo != 'pre_render' or self.plana():
+            return faixa
+        renderizado = self.render_eq.caminho_renderizado(faixa, *self._ganhos())
+        if renderizado:
+            return renderizado
+        if agendar:
+            self.render_eq.renderizar(faixa, *self._ganhos())
+        return faixa
+
+    def tocar(self, faixa):
+        """Registra `faixa` como a atual e devolve o arquivo a carregar no player."""
+        with self._lock:
+            self.faixa_tocando, self.arquivo_tocando = faixa, self.arquivo_para(faixa)
+            self.faixa_proxima = self.arquivo_proximo = None
+            self._marcar_em_uso()
+            return self.arquivo_tocando
+
+    def preparar(self, faixa):
+        """Registra `faixa` como a pré-carregada e devolve o arquivo a entregar ao player."""
+        with self._lock:
+            self.faixa_proxima, self.arquivo_proximo = faixa, self.arquivo_para(faixa)
+            self._marcar_em_uso()
+            return self.arquivo_proximo
+
+    def proxima_iniciou(self):
+        """O player passou sozinho para a faixa pré-carregada."""
+        with self._lock:
+            self.faixa_tocando, self.arquivo_tocando = self.faixa_proxima, self.arquivo_proximo
+            self.faixa_proxima = self.arquivo_proximo = None
+            self._marcar_em_uso()
+
+    def renderizar_a_frente(self, faixas):
+        """
+        No modo 'pre_render', renderiza `faixas` (a atual e as seguintes da fila) no
+        pool de segundo plano; a atual e a pré-carregada passam para o render quando
+        ele fica pronto.
+        """
+        if self.modo != 'pre_render' or self.plana():
+            return
+        ganhos = self._ganhos()
+        faixas = list(faixas)
+        for faixa, futuro in zip(faixas, self.render_eq.renderizar_a_frente(faixas, *ganhos)):
+            futuro.add_done_callback(lambda f, faixa=faixa: self._render_pronto(faixa, ganhos, f))
+
+    def _render_pronto(self, faixa, ganhos, futuro):
+        if futuro.cancelled() or futuro.exception() is not None or not futuro.result():
+            return
+        destino = futuro.result()
+        with self._lock:
+            if self.modo != 'pre_render' or ganhos != self._ganhos():
+                return  # Os ganhos mudaram enquanto o render rodava
+            if faixa == self.faixa_tocando and destino != self.arquivo_tocando:
+                self._recarregar(destino)
+            elif faixa == self.faixa_proxima and destino != self.arquivo_proximo:
+                self.arquivo_proximo = destino
+                self.player.preparar_proxima(destino)
+                self._marcar_em_uso()
+
+    def _agendar_renders(self, proximas):
+        """Renderiza `proximas` depois de espera_render segundos sem outro ajuste dos controles."""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        if self.espera_render <= 0:
+            self.renderizar_a_frente(proximas)
+            return
+        self._temporizador = threading.Timer(self.espera_render, self.renderizar_a_frente, args=(list(proximas),))
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def definir_modo(self, modo, proximas=()):
+        if modo not in MODOS_EQ:
+            raise ValueError(f"Modo de equalização desconhecido: {modo}")
+        self.modo = modo
+        self.aplicar(proximas)
+
+    def aplicar(self, proximas=()):
+        """
+        Aplica os ganhos e o modo atuais, inclusive à faixa que está tocando.
+        `proximas`: a faixa atual e as seguintes da fila, para renderizar adiante.
+        """
+        recarregar = False
+        if self.modo == 'pre_render':
+            # O render já tem a EQ: o equalizador ao vivo aplicaria de novo por cima dele
+            self.player.set_equalizacao(0, 0, 0)
+            self.render_eq.cancelar_pendentes(self._ganhos())
+        else:
+            self.encerrar()
+            self.render_eq.cancelar_pendentes()
+            self.player.set_equalizacao(*self._ganhos())
+            if self.player.motor_reproducao == 'music':
+                # A EQ em tempo real é aplicada pelo motor de buffer
+                self.player.set_motor_reproducao('buffer')
+                recarregar = True
+        with self._lock:
+            if self.faixa_tocando is not None:
+                arquivo = self.arquivo_para(self.faixa_tocando, agendar=False)
+                # Sem o render destes ganhos, segue no arquivo atual até ele ficar pronto
+                aguardando_render = self.modo == 'pre_render' and arquivo == self.faixa_tocando and not self.plana()
+                if not aguardando_render and (recarregar or arquivo != self.arquivo_tocando):
+                    self._recarregar(arquivo)
+        if self.modo == 'pre_render':
+            self._agendar_renders(proximas)
+
+    def _recarregar(self, arquivo):
+        """Troca o arquivo da faixa atual mantendo a posição e o estado (tocando ou pausado)."""
+        if not self.player.is_playing() and not self.player.pausado:
+            return
+        pausado = self.player.pausado
+        posicao = self.player.get_progresso()
+        self.arquivo_tocando = arquivo
+        self.player.carregar_musica(arquivo)
+        self.player.seek(posicao)  # Logo depois do load, a busca já começa a tocar dali
+        if pausado:
+            self.player.pause()
+        if self.faixa_proxima is not None:
+            # O load descarta a faixa pré-carregada
+            self.arquivo_proximo = self.arquivo_para(self.faixa_proxima, agendar=False)
+            self.player.preparar_proxima(self.arquivo_proximo)
+        self._marcar_em_uso()
+
+    def _marcar_em_uso(self):
+        self.render_eq.marcar_em_uso(self.arquivo_tocando, self.arquivo_proximo)
+
+    def encerrar(self):
+        """Desiste dos renders ainda à espera do fim dos ajustes."""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
@@ -0,0 +1,126 @@
+# despachante_eventos.py
+import time
+import threading
+from collections import deque
+
+# Eventos de alta frequência que só informam "algo mudou": um pendente já basta
+EVENTOS_COALESCIVEIS = frozenset({'volume', 'equalizacao', 'seek'})
+
+
+class _Entrega:
+    """Fila e thread de entrega de um observador."""
+
+    def __init__(self, observador, capacidade, coalescer):
+        self.observador = observador
+        self.capacidade = capacidade
+        self.coalescer = coalescer
+        self.pendentes = deque()
+        self.condicao = threading.Condition()
+        self.encerrado = False
+        self.metricas = {'publicados': 0, 'entregues': 0, 'colapsados': 0, 'descartados': 0, 'erros': 0,
+                         'atraso_total_ms': 0.0, 'atraso_max_ms': 0.0, 'execucao_max_ms': 0.0}
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def enfileirar(self, evento, instante):
+        with self.condicao:
+            if self.encerrado:
+                return
+            self.metricas['publicados'] += 1
+            if evento in self.coalescer and any(e == evento for e, _ in self.pendentes):
+                self.metricas['colapsados'] += 1
+                return
+            if len(self.pendentes) >= self.capacidade:
+                # Fila cheia: o evento mais antigo é o que tem menos valor para o observador
+                self.pendentes.popleft()
+                self.metricas['descartados'] += 1
+            self.pendentes.append((evento, instante))
+            self.condicao.notify()
+
+    def _run(self):
+        while True:
+            with self.condicao:
+                while not self.pendentes and not self.encerrado:
+                    self.condicao.wait()
+                if not self.pendentes:
+                    return
+                evento, instante = self.pendentes.popleft()
+
+            inicio = time.perf_counter()
+            try:
+                self.observador.atualizar(evento)
+                erro = False
+            except Exception as e:
+                print(f"Erro no observador {type(self.observador).__name__} ({evento}): {e}")
+                erro = True
+            fim = time.perf_counter()
+
+            with self.condicao:
+                m = self.metricas
+                m['entregues'] += 1
+                m['erros'] += erro
+                atraso = (inicio - instante) * 1000
+                m['atraso_total_ms'] += atraso
+                m['atraso_max_ms'] = max(m['atraso_max_ms'], atraso)
+                m['execucao_max_ms'] = max(m['execucao_max_ms'], (fim - inicio) * 1000)
+
+    def encerrar(self, timeout):
+        with self.condicao:
+            self.encerrado = True
+            self.condicao.notify()
+        self.thread.join(timeout=timeout)
+
+
+class DespachanteEventos:
+    """
+    Entrega os eventos do AudioPlayer aos observadores fora da thread de áudio.
+    Cada observador tem a própria fila (limitada) e a própria thread, então um
+    observador lento atrasa apenas a si mesmo: publicar() nunca bloqueia.
+    Eventos em `coalescer` que já estão pendentes para um observador não são
+    enfileirados de novo; com a fila cheia, o evento mais antigo é descartado.
+    """
+
+    def __init__(self, capacidade=256, coalescer=EVENTOS_COALESCIVEIS):
+        self.capacidade = capacidade
+        self.coalescer = frozenset(coalescer)
+        self._entregas = []
+        self._lock = threading.Lock()
+
+    @property
+    def observadores(self):
+        return [entrega.observador for entrega in self._entregas]
+
+    def adicionar(self, observador):
+        with self._lock:
+            self._entregas = self._entregas + [_Entrega(observador, self.capacidade, self.coalescer)]
+
+    def remover(self, observador):
+        with self._lock:
+            restantes = [e for e in self._entregas if e.observador is not observador]
+            removidas = [e for e in self._entregas if e.observador is observador]
+            self._entregas = restantes
+        for entrega in removidas:
+            entrega.encerrar(timeout=0)
+
+    def publicar(self, evento):
+        instante = time.perf_counter()
+        for entrega in self._entregas:  # Lista substituída por inteiro em adicionar/remover: sem lock aqui
+            entrega.enfileirar(evento, instante)
+
+    def metricas(self):
+        """Por observador: publicados, entregues, colapsados, descartados, erros e atrasos (ms)."""
+        resumo = {}
+        for i, entrega in enumerate(self._entregas):
+            with entrega.condicao:
+                m = dict(entrega.metricas)
+                m['pendentes'] = len(entrega.pendentes)
+            m['atraso_medio_ms'] = m.pop('atraso_total_ms') / max(1, m['entregues'])
+            nome = type(entrega.observador).__name__
+            resumo[nome if nome not in resumo else f"{nome}_{i}"] = m
+        return resumo
+
+    def encerrar(self, timeout=1):
+        with self._lock:
+            entregas, self._entregas = self._entregas, []
+        for entrega in entregas:
+            entrega.encerrar(timeout)
@@ -0,0 +1,143 @@
+# equalizador.py
+import threading
+import numpy as np
+
+# Frequências centrais das três bandas controladas na tela de EQ
+FREQ_GRAVE = 250.0
+FREQ_MEDIO = 1000.0
+FREQ_AGUDO = 4000.0
+
+
+def coeficientes_biquad(tipo, freq, ganho_db, taxa, q=0.707):
+    """
+    Coeficientes (b, a) normalizados de um biquad do "Audio EQ Cookbook" (RBJ).
+    `tipo` é 'grave' (low shelf), 'medio' (peaking) ou 'agudo' (high shelf).
+    """
+    A = 10 ** (ganho_db / 40.0)
+    w0 = 2 * np.pi * freq / taxa
+    cos_w0, sin_w0 = np.cos(w0), np.sin(w0)
+    alpha = sin_w0 / (2 * q)
+
+    if tipo == 'medio':
+        b = [1 + alpha * A, -2 * cos_w0, 1 - alpha * A]
+        a = [1 + alpha / A, -2 * cos_w0, 1 - alpha / A]
+    else:
+        raiz = 2 * np.sqrt(A) * alpha
+        if tipo == 'grave':
+            b = [A * ((A + 1) - (A - 1) * cos_w0 + raiz),
+                 2 * A * ((A - 1) - (A + 1) * cos_w0),
+                 A * ((A + 1) - (A - 1) * cos_w0 - raiz)]
+            a = [(A + 1) + (A - 1) * cos_w0 + raiz,
+                 -2 * ((A - 1) + (A + 1) * cos_w0),
+                 (A + 1) + (A - 1) * cos_w0 - raiz]
+        elif tipo == 'agudo':
+            b = [A * ((A + 1) + (A - 1) * cos_w0 + raiz),
+                 -2 * A * ((A - 1) + (A + 1) * cos_w0),
+                 A * ((A + 1) + (A - 1) * cos_w0 - raiz)]
+            a = [(A + 1) - (A - 1) * cos_w0 + raiz,
+                 2 * ((A - 1) - (A + 1) * cos_w0),
+                 (A + 1) - (A - 1) * cos_w0 - raiz]
+        else:
+            raise ValueError(f"Banda desconhecida: {tipo}")
+
+    b = np.array(b) / a[0]
+    a = np.array(a) / a[0]
+    return b, a
+
+
+def resposta_biquad(b, a, num_pontos):
+    """Resposta em frequência complexa do biquad nos `num_pontos` bins de uma rfft."""
+    z = np.exp(-1j * np.linspace(0, np.pi, num_pontos))
+    return (b[0] + b[1] * z + b[2] * z ** 2) / (a[0] + a[1] * z + a[2] * z ** 2)
+
+
+def resposta_eq(grave, medio, agudo, taxa, num_pontos):
+    """Resposta combinada das três bandas (grave, médio e agudo, em dB)."""
+    resposta = np.ones(num_pontos, dtype=np.complex128)
+    for tipo, freq, ganho in (('grave', FREQ_GRAVE, grave),
+                              ('medio', FREQ_MEDIO, medio),
+                              ('agudo', FREQ_AGUDO, agudo)):
+        if ganho:
+            resposta *= resposta_biquad(*coeficientes_biquad(tipo, freq, ganho, taxa), num_pontos)
+    return resposta
+
+
+def kernel_eq(grave, medio, agudo, taxa, tamanho):
+    """
+    Resposta ao impulso (FIR de `tamanho` coeficientes) equivalente à cascata dos
+    três biquads, com a cauda suavizada para evitar aliasing temporal.
+    """
+    h = np.fft.irfft(resposta_eq(grave, medio, agudo, taxa, tamanho // 2 + 1), tamanho)
+    cauda = tamanho // 4
+    h[-cauda:] *= np.hanning(2 * cauda)[cauda:]
+    return h
+
+
+class Equalizador3Bandas:
+    """
+    Equalizador de 3 bandas em tempo real. Processa o PCM em blocos, por
+    overlap-save na FFT: a cascata de biquads (low shelf, peaking, high shelf)
+    é convertida em um FIR curto, e cada bloco custa uma rfft/irfft vetorizada
+    por canal. Novos ganhos valem a partir do próximo bloco.
+    """
+
+    def __init__(self, taxa, canais, tamanho_fir=1024):
+        self.taxa = taxa
+        self.canais = canais
+        self.tamanho_fir = tamanho_fir
+        self.ganhos = {'grave': 0.0, 'medio': 0.0, 'agudo': 0.0}
+
+        self._lock = threading.Lock()
+        self._kernel = None  # None = EQ plana, o bloco passa direto
+        self._espectros_kernel = {}
+        self._historico = np.zeros((tamanho_fir - 1, canais), dtype=np.float32)
+
+    @property
+    def ativo(self):
+        return self._kernel is not None
+
+    def set_ganhos(self, grave, medio, agudo):
+        ganhos = {'grave': float(grave), 'medio': float(medio), 'agudo': float(agudo)}
+        kernel = None
+        if any(ganhos.values()):
+            kernel = kernel_eq(ganhos['grave'], ganhos['medio'], ganhos['agudo'],
+                               self.taxa, self.tamanho_fir)
+        with self._lock:
+            self.ganhos = ganhos
+            self._kernel = kernel
+            self._espectros_kernel = {}
+
+    def reset(self):
+        """Descarta o histórico do filtro (troca de faixa ou salto de posição)."""
+        self._historico[:] = 0
+
+    def processar(self, bloco):
+        """Recebe e devolve um bloco int16 (quadros, canais)."""
+        with self._lock:
+            kernel = self._kernel
+            espectros = self._espectros_kernel
+
+        entrada = bloco.astype(np.float32)
+        if kernel is None:
+            self._historico = self._atualizar_historico(entrada)
+            return bloco
+
+        quadros = len(entrada)
+        sinal = np.concatenate((self._historico, entrada))
+        self._historico = self._atualizar_historico(entrada)
+
+        n_fft = 1 << int(np.ceil(np.log2(len(sinal))))
+        espectro_kernel = espectros.get(n_fft)
+        if espectro_kernel is None:
+            espectro_kernel = np.fft.rfft(kernel, n_fft)[:, None]
+            espectros[n_fft] = espectro_kernel
+
+        saida = np.fft.irfft(np.fft.rfft(sinal, n_fft, axis=0) * espectro_kernel, n_fft, axis=0)
+        saida = saida[self.tamanho_fir - 1:self.tamanho_fir - 1 + quadros]
+        return np.clip(saida, -32768, 32767).astype(np.int16)
+
+    def _atualizar_historico(self, entrada):
+        n = self.tamanho_fir - 1
+        if len(entrada) >= n:
+            return entrada[-n:].copy()
+        return np.concatenate((self._historico[len(entrada):], entrada))
@@ -0,0 +1,168 @@
+# espectro.py
+import functools
+import numpy as np
+
+
+@functools.lru_cache(maxsize=8)
+def janela_hanning(tamanho):
+    janela = np.hanning(tamanho).astype(np.float32)
+    janela.flags.writeable = False
+    return janela
+
+
+@functools.lru_cache(maxsize=32)
+def plano_bandas(num_bins, taxa, num_bandas, min_freq=20, max_freq=20000):
+    """
+    Pré-calcula o mapeamento bin -> barra usado pelo espectro.
+    Retorna (bins, banda_de_cada_bin, peso_por_banda); o resultado fica em cache
+    por (tamanho da FFT, taxa de amostragem, número de barras).
+    """
+    n_fft = 2 * (num_bins - 1)
+    freqs = np.fft.rfftfreq(n_fft, 1 / taxa)[:num_bins]
+
+    log_steps = np.log10(np.linspace(min_freq, max_freq, num_bandas + 1))
+    limites = 10 ** log_steps
+
+    bandas = np.searchsorted(limites, freqs, side='right') - 1
+    validos = (freqs >= min_freq) & (freqs <= max_freq) & (bandas >= 0) & (bandas < num_bandas)
+    bins = np.nonzero(validos)[0]
+    bandas = bandas[bins]
+
+    f_center = 10 ** ((log_steps[:-1] + log_steps[1:]) / 2)
+    pesos = np.where((f_center >= 250) & (f_center <= 4000), 1.5, 1.0)
+
+    for arr in (bins, bandas, pesos):
+        arr.flags.writeable = False
+    return bins, bandas, pesos
+
+
+@functools.lru_cache(maxsize=8)
+def matriz_bandas(num_bins, taxa, num_bandas):
+    """
+    O mesmo plano de plano_bandas() como matriz (num_bins, num_bandas), para
+    somar as bandas de muitos quadros de uma vez com um produto matricial.
+    """
+    bins, bandas, _ = plano_bandas(num_bins, taxa, num_bandas)
+    matriz = np.zeros((num_bins, num_bandas), dtype=np.float32)
+    matriz[bins, bandas] = 1.0
+    matriz.flags.writeable = False
+    return matriz
+
+
+def espectrograma(sinal, tamanho=2048, salto=512):
+    """Magnitudes da STFT (quadros, bins) de um sinal mono, com janela de Hanning."""
+    if len(sinal) < tamanho:
+        return np.zeros((0, tamanho // 2 + 1), dtype=np.float32)
+    quadros = np.lib.stride_tricks.sliding_window_view(sinal, tamanho)[::salto]
+    return np.abs(np.fft.rfft(quadros * janela_hanning(tamanho), axis=1)).astype(np.float32)
+
+
+# --- Espectro multirresolução -------------------------------------------------
+
+DECIMACAO_GRAVES = 8  # Os graves são analisados a taxa / 8, com a mesma FFT: 8x mais resolução
+FRACAO_GRAVES = 0.05  # Parte da taxa decimada usada pelos graves; perto dos nulos da média por bloco
+
+
+@functools.lru_cache(maxsize=32)
+def plano_multirresolucao(taxa, num_bandas, tamanho=2048, decimacao=DECIMACAO_GRAVES,
+                          min_freq=20, max_freq=20000):
+    """
+    Pré-calcula os kernels do espectro multirresolução para (taxa, número de
+    barras), com barras logarítmicas de verdade. Cada barra soma a potência dos
+    bins da FFT ponderada pela fração do bin que cai dentro dela: as barras com
+    menos de dois bins na FFT da taxa original (os graves) usam a FFT do sinal
+    decimado. Os kernels já dividem pela energia da janela, então as duas FFTs
+    medem a potência da barra na mesma escala.
+    Retorna (kernel_agudos, kernel_graves, pesos); kernels (bins, barras).
+    """
+    limites = np.geomspace(min_freq, min(max_freq, 0.5 * taxa), num_bandas + 1)
+    centros = np.sqrt(limites[:-1] * limites[1:])
+    num_bins = tamanho // 2 + 1
+    normalizacao = tamanho * float(np.sum(janela_hanning(tamanho).astype(np.float64) ** 2))
+    taxa_graves = taxa / decimacao
+    largura_bin = taxa / tamanho
+    graves = ((limites[1:] - limites[:-1]) < 2 * largura_bin) & (limites[1:] <= FRACAO_GRAVES * taxa_graves * decimacao / 2)
+
+    kernels = []
+    for taxa_fft, selecionadas in ((taxa, ~graves), (taxa_graves, graves)):
+        delta = taxa_fft / tamanho
+        inicio_bins = (np.arange(num_bins) - 0.5)[:, None] * delta
+        sobreposicao = (np.minimum(inicio_bins + delta, limites[1:]) - np.maximum(inicio_bins, limites[:-1])) / delta
+        kernel = np.clip(sobreposicao, 0, None) * selecionadas / normalizacao
+        kernel[0] = 0.0  # DC fica de fora
+        kernels.append(kernel.astype(np.float32))
+
+    pesos = np.where((centros >= 250) & (centros <= 4000), 1.5, 1.0).astype(np.float32)
+    for arr in kernels + [pesos]:
+        arr.flags.writeable = False
+    return kernels[0], kernels[1], pesos
+
+
+def _linhas_usadas(kernel):
+    linhas = np.flatnonzero(kernel.any(axis=1))
+    if len(linhas) == 0:
+        return slice(0, 0)
+    return slice(int(linhas[0]), int(linhas[-1]) + 1)
+
+
+class EspectroMultirresolucao:
+    """
+    Barras logarítmicas com duas resoluções: uma FFT da taxa original para médios
+    e agudos e a mesma FFT sobre o sinal decimado por DECIMACAO_GRAVES (média
+    por blocos) para os graves, que ganham bins 8x mais estreitos. O sinal é
+    recebido de forma incremental: a cada quadro só as amostras novas são
+    decimadas, e o custo fica perto do de uma FFT de `tamanho` pontos por quadro.
+    """
+
+    def __init__(self, taxa, num_bandas, tamanho=2048, decimacao=DECIMACAO_GRAVES):
+        self.taxa = taxa
+        self.num_bandas = num_bandas
+        self.tamanho = tamanho
+        self.decimacao = decimacao
+        kernel_agudos, kernel_graves, self.pesos = plano_multirresolucao(taxa, num_bandas, tamanho, decimacao)
+        # Só os bins que caem em alguma barra entram no produto com o kernel
+        self._bins_agudos = _linhas_usadas(kernel_agudos)
+        self._bins_graves = _linhas_usadas(kernel_graves)
+        self._kernel_agudos = kernel_agudos[self._bins_agudos]
+        self._kernel_graves = kernel_graves[self._bins_graves]
+        self.historico = tamanho * decimacao  # Amostras necessárias para preencher os graves do zero
+        self.salto_graves = tamanho // 8  # Amostras decimadas entre duas FFTs dos graves
+        self._media = np.full(decimacao, 1.0 / decimacao, dtype=np.float32)
+        self.reiniciar()
+
+    def reiniciar(self):
+        # Buffers começam com silêncio: nunca é preciso completar a janela
+        self._agudos = np.zeros(self.tamanho, dtype=np.float32)
+        self._graves = np.zeros(self.tamanho, dtype=np.float32)
+        self._resto = np.zeros(0, dtype=np.float32)
+        self._potencia_graves = None
+        self._graves_novas = 0
+        self.fim = None  # Quadro (taxa original) logo após a última amostra recebida
+
+    def alimentar(self, amostras, fim):
+        """Acrescenta as amostras mono que terminam no quadro `fim`."""
+        amostras = np.asarray(amostras, dtype=np.float32)
+        self._agudos = np.concatenate((self._agudos, amostras[-self.tamanho:]))[-self.tamanho:]
+        sinal = np.concatenate((self._resto, amostras))
+        completos = len(sinal) // self.decimacao * self.decimacao
+        if completos:
+            decimadas = sinal[:completos].reshape(-1, self.decimacao) @ self._media
+            self._graves = np.concatenate((self._graves, decimadas[-self.tamanho:]))[-self.tamanho:]
+            self._graves_novas += len(decimadas)
+        self._resto = sinal[completos:]
+        self.fim = fim
+
+    def bandas(self):
+        """
+        Magnitude de cada barra (raiz da potência na barra), já com os pesos. A FFT
+        dos graves cobre uma janela 8x mais longa e só é refeita a cada
+        `salto_graves` amostras decimadas; entre uma e outra, reaproveita a potência.
+        """
+        janela = janela_hanning(self.tamanho)
+        if self._potencia_graves is None or self._graves_novas >= self.salto_graves:
+            graves = np.fft.rfft(self._graves * janela)[self._bins_graves]
+            self._potencia_graves = (graves.real ** 2 + graves.imag ** 2).astype(np.float32) @ self._kernel_graves
+            self._graves_novas = 0
+        agudos = np.fft.rfft(self._agudos * janela)[self._bins_agudos]
+        potencia = (agudos.real ** 2 + agudos.imag ** 2).astype(np.float32) @ self._kernel_agudos
+        return np.sqrt(potencia + self._potencia_graves) * self.pesos
@@ -0,0 +1,222 @@
+# fluxo_pcm.py
+import os
+import sys
+import time
+import queue
+import threading
+from collections import deque
+import numpy as np
+from fonte_amostras import iterar_pcm
+
+QUADROS_POR_BLOCO_FLUXO = 8192  # ~190 ms a 44.1 kHz por leitura do decodificador
+BLOCOS_NA_FILA = 16  # ~3 s decodificados à frente do que está tocando
+QUADROS_DE_HISTORICO = 32768  # Guardados atrás do ponto lido: espectro e início do crossfade
+
+
+class FluxoPCM:
+    """
+    Faixa decodificada em fluxo: uma thread lê o PCM int16 do ffmpeg (ou do WAV)
+    em blocos de tamanho fixo para uma fila limitada, e o MotorBuffer consome
+    esses blocos como se fossem um array (quadros, canais) já decodificado. A
+    reprodução começa com o primeiro bloco, sem decodificar a faixa inteira, e a
+    memória fica limitada à fila mais QUADROS_DE_HISTORICO quadros.
+
+    Busca para fora do trecho guardado reinicia o decodificador no ponto pedido.
+    Enquanto o fim não é conhecido, len() é sys.maxsize: quem lê descobre o fim
+    quando pronto() passa a responder True e len() vira o total real.
+    """
+
+    def __init__(self, caminho, taxa, canais, quadros_por_bloco=QUADROS_POR_BLOCO_FLUXO,
+                 max_blocos=BLOCOS_NA_FILA, historico=QUADROS_DE_HISTORICO):
+        self.caminho = caminho
+        self.taxa = taxa
+        self.canais = canais
+        self.quadros_por_bloco = quadros_por_bloco
+        self.max_blocos = max_blocos
+        self.historico = historico
+        self._lock = threading.Lock()
+        self._blocos = deque()  # Blocos já retirados da fila, em ordem
+        self._inicio = 0  # Primeiro quadro guardado em _blocos
+        self._recebidos = 0  # Quadro logo após o último guardado
+        self._total = None  # Quadros da faixa; conhecido quando o decodificador termina
+        self._fila = None
+        self._parar = None
+        self._produtor = None
+        self._fechado = False
+        self.paradas = 0  # Vezes em que o leitor pediu um bloco que o decodificador ainda não tinha entregado
+        self.tempo_parado = 0.0
+        self._parado_desde = None
+        self._primeiro_bloco = False
+        self.reinicios = 0
+        self.latencias_recarga = deque(maxlen=20)  # Segundos entre (re)iniciar e o primeiro bloco chegar
+        self.iniciar(0)
+
+    # --- Decodificador ------------------------------------------------------
+
+    def iniciar(self, quadro=0):
+        """(Re)inicia a decodificação em `quadro`, descartando o que estava guardado."""
+        self._encerrar_produtor(esperar=False)  # O anterior sai sozinho: cada decodificador tem a própria fila
+        fila = queue.Queue(maxsize=self.max_blocos)
+        parar = threading.Event()
+        with self._lock:
+            if self._fechado:
+                return
+            if self._produtor is not None:
+                self.reinicios += 1
+            self._fila, self._parar = fila, parar
+            self._blocos.clear()
+            self._inicio = self._recebidos = max(0, int(quadro))
+            self._total = None
+            self._primeiro_bloco = False
+            self._parado_desde = None
+            self._produtor = threading.Thread(target=self._produzir,
+                                              args=(self._inicio, fila, parar, time.perf_counter()), daemon=True)
+            self._produtor.start()
+
+    def _produzir(self, quadro, fila, parar, pedido_em):
+        gerador = iterar_pcm(self.caminho, self.taxa, self.canais, inicio=quadro / self.taxa,
+                             quadros_por_bloco=self.quadros_por_bloco)
+        primeiro = True
+        try:
+            for bruto in gerador:
+                amostras = np.frombuffer(bruto, dtype=np.int16)
+                bloco = amostras[:len(amostras) // self.canais * self.canais].reshape(-1, self.canais)
+                if not self._colocar(fila, parar, bloco):
+                    return
+                if primeiro:
+                    self.latencias_recarga.append(time.perf_counter() - pedido_em)
+                    primeiro = False
+        except Exception as e:
+            print(f"Erro ao decodificar {os.path.basename(self.caminho)} em fluxo: {e}")
+        finally:
+            gerador.close()  # Encerra o ffmpeg se a leitura foi interrompida
+        self._colocar(fila, parar, None)  # Marca de fim da faixa
+
+    @staticmethod
+    def _colocar(fila, parar, item):
+        """put() que desiste quando o decodificador é parado; retorna False nesse caso."""
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _encerrar_produtor(self, esperar=True):
+        with self._lock:
+            parar, produtor = self._parar, self._produtor
+        if parar is not None:
+            parar.set()
+        if esperar and produtor is not None:
+            produtor.join(timeout=1)
+
+    def fechar(self):
+        """Para o decodificador e libera os blocos; a faixa passa a terminar no que já foi lido."""
+        with self._lock:
+            self._fechado = True
+            if self._total is None:
+                self._total = self._recebidos
+        self._encerrar_produtor()
+        with self._lock:
+            self._blocos.clear()
+            self._inicio = self._recebidos
+
+    # --- Leitura (com self._lock) -------------------------------------------------
+
+    def _drenar(self, ate):
+        """Move da fila para os blocos guardados o necessário para chegar ao quadro `ate`."""
+        while self._total is None and self._recebidos < ate:
+            try:
+                bloco = self._fila.get_nowait()
+            except queue.Empty:
+                return
+            if bloco is None:
+                self._total = self._recebidos
+                return
+            self._primeiro_bloco = True
+            self._blocos.append(bloco)
+            self._recebidos += len(bloco)
+
+    def _descartar_antes(self, quadro):
+        """Descarta os blocos que terminam mais de `historico` quadros antes de `quadro`."""
+        while self._blocos and self._inicio + len(self._blocos[0]) <= quadro - self.historico:
+            self._inicio += len(self._blocos.popleft())
+
+    def _recortar(self, inicio, fim):
+        inicio, fim = max(inicio, self._inicio), min(fim, self._recebidos)
+        if fim <= inicio:
+            return np.zeros((0, self.canais), dtype=np.int16)
+        partes = []
+        posicao = self._inicio
+        for bloco in self._blocos:
+            a, b = max(inicio, posicao), min(fim, posicao + len(bloco))
+            if a < b:
+                partes.append(bloco[a - posicao:b - posicao])
+            posicao += len(bloco)
+            if posicao >= fim:
+                break
+        return partes[0] if len(partes) == 1 else np.concatenate(partes)
+
+    def pronto(self, inicio, fim):
+        """
+        True se [inicio, fim) já pode ser lido sem esperar (ou se a faixa acabou
+        antes de `fim`). Fora do trecho guardado e da fila, reinicia o decodificador
+        em `inicio` e retorna False. Nunca bloqueia.
+        """
+        with self._lock:
+            if self._fechado:
+                return True
+            alcance = self._recebidos + self._fila.qsize() * self.quadros_por_bloco
+            reiniciar = inicio < self._inicio or (self._total is None and inicio > alcance + self.quadros_por_bloco)
+            if not reiniciar:
+                self._descartar_antes(inicio)
+                self._drenar(fim)
+                disponivel = self._recebidos >= fim or self._total is not None
+                agora = time.perf_counter()
+                if disponivel and self._parado_desde is not None:
+                    self.tempo_parado += agora - self._parado_desde
+                    self._parado_desde = None
+                elif not disponivel and self._primeiro_bloco and self._parado_desde is None:
+                    self.paradas += 1
+                    self._parado_desde = agora
+                return disponivel
+        self.iniciar(inicio)
+        return False
+
+    def __len__(self):
+        total = self._total
+        return sys.maxsize if total is None else total
+
+    def __getitem__(self, chave):
+        colunas = slice(None)
+        if isinstance(chave, tuple):
+            chave, colunas = chave
+        inicio, fim, _ = chave.indices(len(self))
+        with self._lock:
+            if chave.stop is None:
+                self._drenar(sys.maxsize)
+                fim = self._recebidos
+            else:
+                self._drenar(fim)
+            return self._recortar(inicio, fim)[:, colunas]
+
+    def estatisticas(self):
+        with self._lock:
+            fila = self._fila.qsize() if self._fila is not None else 0
+            guardados = self._recebidos - self._inicio
+            parado = self.tempo_parado
+            if self._parado_desde is not None:
+                parado += time.perf_counter() - self._parado_desde
+            latencias = list(self.latencias_recarga)
+        bytes_por_bloco = self.quadros_por_bloco * self.canais * 2
+        return {
+            'blocos_na_fila': fila,
+            'quadros_guardados': guardados,
+            'memoria_max_bytes': (self.max_blocos + 1) * bytes_por_bloco + (self.historico + 2 * self.quadros_por_bloco) * self.canais * 2,
+            'paradas': self.paradas,
+            'tempo_parado_ms': parado * 1000,
+            'reinicios': self.reinicios,
+            'latencia_recarga_ms': latencias[-1] * 1000 if latencias else None,
+            'latencia_recarga_media_ms': sum(latencias) / len(latencias) * 1000 if latencias else None,
+        }
@@ -0,0 +1,240 @@
+# fonte_amostras.py
+import os
+import wave
+import threading
+import subprocess
+import numpy as np
+from pydub.utils import which
+
+try:
+    from mutagen import File as MutagenFile
+except ImportError:
+    MutagenFile = None
+
+TAXA_PADRAO = 44100
+CANAIS_PADRAO = 2
+
+
+def localizar_ffmpeg():
+    """Retorna o executável do ffmpeg (ou avconv) disponível no PATH, ou None."""
+    return which('ffmpeg') or which('avconv')
+
+
+def sondar_formato(caminho):
+    """Lê taxa de amostragem, número de canais e duração pelo cabeçalho, sem decodificar o áudio."""
+    taxa, canais, duracao = TAXA_PADRAO, CANAIS_PADRAO, 0
+    if MutagenFile is None:
+        return taxa, canais, duracao
+    try:
+        audio = MutagenFile(caminho)
+        if audio is not None and audio.info:
+            taxa = int(getattr(audio.info, 'sample_rate', 0) or TAXA_PADRAO)
+            canais = int(getattr(audio.info, 'channels', 0) or CANAIS_PADRAO)
+            duracao = float(getattr(audio.info, 'length', 0) or 0)
+    except Exception:
+        pass
+    return taxa, canais, duracao
+
+
+def decodificar_trecho(caminho, inicio, duracao, taxa, canais):
+    """
+    Decodifica apenas o trecho [inicio, inicio + duracao) em segundos.
+    Retorna um array int16 com formato (quadros, canais), ou None em caso de erro.
+    """
+    if caminho.lower().endswith('.wav'):
+        dados = _ler_trecho_wav(caminho, inicio, duracao)
+        if dados is not None:
+            return dados
+
+    ffmpeg = localizar_ffmpeg()
+    if ffmpeg is None:
+        return None
+
+    comando = [
+        ffmpeg, '-v', 'quiet', '-nostdin',
+        '-ss', f'{max(0.0, inicio):.3f}', '-t', f'{duracao:.3f}',
+        '-i', caminho,
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', str(canais), '-ar', str(taxa), '-'
+    ]
+    try:
+        resultado = subprocess.run(comando, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False)
+    except (OSError, ValueError):
+        return None
+
+    bruto = resultado.stdout
+    quadros = len(bruto) // (2 * canais)
+    if quadros == 0:
+        return None
+    return np.frombuffer(bruto[:quadros * 2 * canais], dtype=np.int16).reshape(-1, canais)
+
+
+def iterar_pcm(caminho, taxa, canais, inicio=0.0, quadros_por_bloco=65536):
+    """
+    Decodifica a faixa inteira em fluxo, devolvendo blocos de bytes PCM int16
+    intercalados. Nunca mantém mais de um bloco na memória.
+    """
+    bytes_por_bloco = quadros_por_bloco * 2 * canais
+
+    if caminho.lower().endswith('.wav'):
+        try:
+            with wave.open(caminho, 'rb') as wav:
+                if (wav.getsampwidth() == 2 and wav.getframerate() == taxa
+                        and wav.getnchannels() == canais):
+                    wav.setpos(min(int(inicio * taxa), wav.getnframes()))
+                    while True:
+                        bloco = wav.readframes(quadros_por_bloco)
+                        if not bloco:
+                            return
+                        yield bloco
+                    return
+        except (wave.Error, EOFError, OSError):
+            pass
+
+    ffmpeg = localizar_ffmpeg()
+    if ffmpeg is None:
+        return
+
+    comando = [
+        ffmpeg, '-v', 'quiet', '-nostdin',
+        '-ss', f'{max(0.0, inicio):.3f}', '-i', caminho,
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', str(canais), '-ar', str(taxa), '-'
+    ]
+    try:
+        processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except (OSError, ValueError):
+        return
+    try:
+        while True:
+            bloco = processo.stdout.read(bytes_por_bloco)
+            if not bloco:
+                break
+            yield bloco
+    finally:
+        processo.stdout.close()
+        if processo.poll() is None:
+            processo.kill()
+        processo.wait()
+
+
+def _ler_trecho_wav(caminho, inicio, duracao):
+    """Leitura direta de WAV PCM 16 bits com seek, sem passar pelo ffmpeg."""
+    try:
+        with wave.open(caminho, 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            taxa = wav.getframerate()
+            canais = wav.getnchannels()
+            primeiro = min(int(max(0.0, inicio) * taxa), wav.getnframes())
+            wav.setpos(primeiro)
+            bruto = wav.readframes(int(duracao * taxa))
+    except (wave.Error, EOFError, OSError):
+        return None
+    return np.frombuffer(bruto, dtype=np.int16).reshape(-1, canais)
+
+
+class FonteAmostrasJanela:
+    """
+    Fonte de amostras para o espectro que mantém na memória apenas uma janela
+    curta de PCM ao redor da posição de reprodução. Quando a posição sai da
+    janela, o próximo trecho é decodificado em segundo plano, de modo que o
+    consumo de memória não depende da duração da faixa.
+    """
+
+    def __init__(self, caminho, taxa=TAXA_PADRAO, canais=CANAIS_PADRAO,
+                 duracao_janela=8.0, antecedencia=1.0):
+        self.caminho = caminho
+        self.frame_rate = taxa
+        self.channels = canais
+        self.duracao_janela = duracao_janela
+        self.antecedencia = antecedencia
+
+        self._lock = threading.Lock()
+        self._inicio = 0.0
+        self._dados = None
+        self._chegou_ao_fim = False
+        self._carregando = False
+        self._fechada = False
+
+        self._agendar_recarga(0.0)
+
+    def ler(self, posicao, num_amostras):
+        """
+        Retorna até `num_amostras` amostras mono (float32) terminando em `posicao`
+        segundos, ou None se a janela correspondente ainda não foi decodificada.
+        """
+        with self._lock:
+            inicio, dados, chegou_ao_fim = self._inicio, self._dados, self._chegou_ao_fim
+
+        if dados is None:
+            return None
+
+        fim_quadro = int((posicao - inicio) * self.frame_rate)
+        inicio_quadro = fim_quadro - num_amostras
+        margem = int(self.antecedencia * self.frame_rate)
+
+        voltou = inicio_quadro < 0 and inicio > 0
+        avancou = fim_quadro > len(dados) - margem and not chegou_ao_fim
+        if voltou or avancou:
+            self._agendar_recarga(posicao)
+
+        if fim_quadro <= 0 or fim_quadro > len(dados):
+            return None
+        return dados[max(0, inicio_quadro):fim_quadro, 0].astype(np.float32)
+
+    def _agendar_recarga(self, posicao):
+        with self._lock:
+            if self._carregando or self._fechada:
+                return
+            self._carregando = True
+        inicio = max(0.0, posicao - self.antecedencia)
+        threading.Thread(target=self._recarregar, args=(inicio,), daemon=True).start()
+
+    def _recarregar(self, inicio):
+        try:
+            dados = decodificar_trecho(self.caminho, inicio, self.duracao_janela,
+                                       self.frame_rate, self.channels)
+            if dados is None:
+                return
+            with self._lock:
+                if not self._fechada:
+                    self._inicio = inicio
+                    self._dados = dados
+                    self._chegou_ao_fim = len(dados) < int(self.duracao_janela * self.frame_rate)
+        except Exception as e:
+            print(f"Erro ao decodificar trecho de {os.path.basename(self.caminho)}: {e}")
+        finally:
+            with self._lock:
+                self._carregando = False
+
+    def fechar(self):
+        with self._lock:
+            self._fechada = True
+            self._dados = None
+
+
+class FonteAmostrasMemmap:
+    """
+    Fonte de amostras sobre um arquivo PCM já decodificado (ver cache_pcm.py).
+    O arquivo é mapeado com np.memmap, então a leitura de uma janela não copia
+    a faixa para a memória e não exige nova decodificação.
+    """
+
+    def __init__(self, arquivo_pcm, taxa, canais, quadros):
+        self.caminho = arquivo_pcm
+        self.frame_rate = taxa
+        self.channels = canais
+        self.dados = np.memmap(arquivo_pcm, dtype=np.int16, mode='r', shape=(quadros, canais))
+
+    def ler(self, posicao, num_amostras):
+        dados = self.dados
+        if dados is None:
+            return None
+        fim_quadro = min(int(posicao * self.frame_rate), len(dados))
+        if fim_quadro <= 0:
+            return None
+        return np.asarray(dados[max(0, fim_quadro - num_amostras):fim_quadro, 0], dtype=np.float32)
+
+    def fechar(self):
+        self.dados = None
@@ -0,0 +1,246 @@
+# forma_onda.py
+import os
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from constants import PASTA_DADOS
+from fonte_amostras import iterar_pcm, sondar_formato
+from utils import processos_em_segundo_plano
+
+PASTA_FORMA_ONDA = os.path.join(PASTA_DADOS, 'cache_onda')
+
+# Cabeçalho do arquivo lateral: assinatura, versão, número de baldes, duração (s)
+_CABECALHO = struct.Struct('<4sHId')
+_ASSINATURA = b'MSGO'
+_VERSAO = 1
+
+NUM_BALDES = 2048
+QUADROS_POR_BALDE_SEM_DURACAO = 512  # Baldes provisórios quando a sondagem não informa a duração
+NIVEIS = ' ▁▂▃▄▅▆▇█'
+
+
+def calcular_forma_onda(caminho, num_baldes=NUM_BALDES):
+    """
+    Percorre a faixa uma única vez (em blocos, sem carregá-la inteira) e devolve
+    (minimos, maximos, rms, duracao): três arrays int16 com um valor por balde,
+    calculados do sinal mono. Se a duração sondada estiver errada ou faltar, os
+    baldes a mais são agrupados no fim, pelo número real de quadros decodificados.
+    """
+    taxa, canais, duracao = sondar_formato(caminho)
+    total_estimado = int(duracao * taxa)
+    if total_estimado > 0:
+        quadros_por_balde = max(1, -(-total_estimado // num_baldes))
+    else:
+        quadros_por_balde = QUADROS_POR_BALDE_SEM_DURACAO
+
+    minimos, maximos, quadrados = [], [], []
+    resto = np.zeros(0, dtype=np.float32)
+    quadros = 0
+    for bruto in iterar_pcm(caminho, taxa, canais):
+        mono = np.frombuffer(bruto, dtype=np.int16).reshape(-1, canais).mean(axis=1, dtype=np.float32)
+        quadros += len(mono)
+        sinal = np.concatenate((resto, mono))
+        completos = len(sinal) // quadros_por_balde * quadros_por_balde
+        baldes = sinal[:completos].reshape(-1, quadros_por_balde)
+        resto = sinal[completos:]
+        if len(baldes):
+            minimos.append(baldes.min(axis=1))
+            maximos.append(baldes.max(axis=1))
+            quadrados.append(np.mean(baldes * baldes, axis=1))
+    if len(resto):
+        minimos.append(resto[None].min(axis=1))
+        maximos.append(resto[None].max(axis=1))
+        quadrados.append(np.mean(resto * resto)[None])
+    if not quadros:
+        return None
+
+    minimos = np.concatenate(minimos)
+    maximos = np.concatenate(maximos)
+    quadrados = np.concatenate(quadrados)
+    if len(minimos) > num_baldes:
+        # Peso de cada balde na média dos quadrados: todos completos, menos o último
+        pesos = np.full(len(quadrados), quadros_por_balde, dtype=np.float64)
+        pesos[-1] = quadros - quadros_por_balde * (len(quadrados) - 1)
+        bordas = np.arange(num_baldes) * len(minimos) // num_baldes
+        minimos = np.minimum.reduceat(minimos, bordas)
+        maximos = np.maximum.reduceat(maximos, bordas)
+        quadrados = np.add.reduceat(quadrados * pesos, bordas) / np.add.reduceat(pesos, bordas)
+    rms = np.sqrt(quadrados)
+    return (minimos.astype(np.int16), maximos.astype(np.int16),
+            np.minimum(rms, 32767).astype(np.int16), quadros / taxa)
+
+
+def gravar_forma_onda(destino, minimos, maximos, rms, duracao):
+    temporario = destino + '.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(_CABECALHO.pack(_ASSINATURA, _VERSAO, len(minimos), duracao))
+        for array in (minimos, maximos, rms):
+            f.write(array.astype('<i2').tobytes())
+    os.replace(temporario, destino)
+
+
+def ler_forma_onda(arquivo):
+    """Lê um arquivo lateral; retorna FormaOnda ou None se estiver ausente ou inválido."""
+    try:
+        with open(arquivo, 'rb') as f:
+            assinatura, versao, n, duracao = _CABECALHO.unpack(f.read(_CABECALHO.size))
+            if assinatura != _ASSINATURA or versao != _VERSAO:
+                return None
+            dados = np.frombuffer(f.read(n * 6), dtype='<i2')
+    except (OSError, struct.error):
+        return None
+    if len(dados) != n * 3:
+        return None
+    return FormaOnda(dados[:n], dados[n:2 * n], dados[2 * n:], duracao)
+
+
+def _gerar(caminho, destino, num_baldes):
+    """Executa em um processo do pool."""
+    resultado = calcular_forma_onda(caminho, num_baldes)
+    if resultado is None:
+        return None
+    gravar_forma_onda(destino, *resultado)
+    return destino
+
+
+class FormaOnda:
+    """Visão geral de uma faixa (mínimo, máximo e RMS por balde), pronta para desenhar."""
+
+    def __init__(self, minimos, maximos, rms, duracao):
+        self.minimos = minimos
+        self.maximos = maximos
+        self.rms = rms
+        self.duracao = duracao
+        self._linhas = {}
+
+    def reduzir(self, largura):
+        """Agrupa os baldes em `largura` colunas: (mínimo, máximo, rms) por coluna."""
+        n = len(self.minimos)
+        bordas = np.minimum(np.arange(largura) * n // largura, n - 1)
+        minimos = np.minimum.reduceat(self.minimos, bordas)
+        maximos = np.maximum.reduceat(self.maximos, bordas)
+        rms = np.maximum.reduceat(self.rms, bordas)
+        return minimos, maximos, rms
+
+    def linha(self, largura):
+        """Texto de `largura` caracteres com o pico de cada coluna; calculado uma vez por largura."""
+        texto = self._linhas.get(largura)
+        if texto is None:
+            if largura <= 0 or not len(self.minimos):
+                return ''
+            minimos, maximos, _ = self.reduzir(largura)
+            pico = np.maximum(np.abs(minimos.astype(np.int32)), maximos)
+            escala = max(1, int(pico.max()))
+            indices = np.ceil(pico / escala * (len(NIVEIS) - 1)).astype(int)
+            texto = ''.join(NIVEIS[i] for i in indices)
+            self._linhas[largura] = texto
+        return texto
+
+    def coluna_para_segundos(self, coluna, largura):
+        """Posição na faixa correspondente a uma coluna da mini forma de onda."""
+        if largura <= 0:
+            return 0.0
+        return max(0.0, min(1.0, coluna / largura)) * self.duracao
+
+
+class ServicoFormaOnda:
+    """
+    Gera e guarda a visão geral de forma de onda de cada faixa em um arquivo
+    lateral binário (data/cache_onda), indexado por caminho + mtime + tamanho.
+    A geração roda em um pool de processos (metade dos núcleos, ver
+    processos_em_segundo_plano), então uma playlist inteira pode ser processada em lote.
+    """
+
+    def __init__(self, pasta=PASTA_FORMA_ONDA, num_baldes=NUM_BALDES, max_processos=None, max_em_memoria=16):
+        self.pasta = pasta
+        self.num_baldes = num_baldes
+        self.max_processos = max_processos or processos_em_segundo_plano()
+        self._executor = None
+        self._pendentes = {}
+        self.max_em_memoria = max_em_memoria
+        self._carregadas = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def arquivo_lateral(self, caminho):
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return None
+        identidade = f"{os.path.abspath(caminho)}|{st.st_mtime_ns}|{st.st_size}|{self.num_baldes}"
+        return os.path.join(self.pasta, hashlib.sha1(identidade.encode('utf-8')).hexdigest() + '.onda')
+
+    def obter(self, caminho):
+        """
+        FormaOnda da faixa, ou None enquanto ela ainda não foi gerada (nesse caso a
+        geração é agendada). O arquivo lateral é lido do disco uma única vez.
+        """
+        with self._lock:
+            if caminho in self._carregadas:
+                self._carregadas.move_to_end(caminho)
+                return self._carregadas[caminho]
+            if caminho in self._pendentes:
+                return None
+        arquivo = self.arquivo_lateral(caminho)
+        forma = ler_forma_onda(arquivo) if arquivo else None
+        if forma is not None:
+            with self._lock:
+                self._guardar(caminho, forma)
+            return forma
+        if arquivo:
+            self.gerar(caminho)
+        else:
+            with self._lock:
+                self._guardar(caminho, None)
+        return None
+
+    def gerar(self, caminho):
+        """Agenda a geração no pool de processos (se ainda não existir) e retorna um Future."""
+        arquivo = self.arquivo_lateral(caminho)
+        with self._lock:
+            futuro = self._pendentes.get(caminho)
+            if futuro is not None or arquivo is None:
+                return futuro
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_processos)
+            futuro = self._executor.submit(_gerar, caminho, arquivo, self.num_baldes)
+            self._pendentes[caminho] = futuro
+        futuro.add_done_callback(lambda f, caminho=caminho: self._concluido(caminho, f))
+        return futuro
+
+    def gerar_lote(self, caminhos):
+        """Gera as formas de onda que ainda não existem no disco. Retorna a lista de Futures."""
+        futuros = []
+        for caminho in caminhos:
+            arquivo = self.arquivo_lateral(caminho)
+            if arquivo and not os.path.exists(arquivo):
+                futuros.append(self.gerar(caminho))
+        return futuros
+
+    def _concluido(self, caminho, futuro):
+        # A forma gerada é lida do disco no próximo obter(); só as falhas ficam em memória
+        falhou = futuro.cancelled()
+        if not falhou:
+            try:
+                falhou = futuro.result() is None
+            except Exception as e:
+                print(f"Erro ao gerar forma de onda de {os.path.basename(caminho)}: {e}")
+                falhou = True
+        with self._lock:
+            self._pendentes.pop(caminho, None)
+            if falhou:
+                self._guardar(caminho, None)
+
+    def _guardar(self, caminho, forma):
+        self._carregadas[caminho] = forma
+        self._carregadas.move_to_end(caminho)
+        while len(self._carregadas) > self.max_em_memoria:
+            self._carregadas.popitem(last=False)
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,132 @@
+# indice_biblioteca.py
+import os
+import json
+import sqlite3
+import threading
+from constants import PASTA_DADOS
+
+ARQUIVO_INDICE_BIBLIOTECA = os.path.join(PASTA_DADOS, 'biblioteca.sqlite3')
+CAMPOS_INDICE = ('titulo', 'artista', 'album', 'genero', 'duracao')  # Colunas próprias; os demais metadados vão em 'extras'
+
+
+def _nivel(pasta, subpasta):
+    """Quantos níveis `subpasta` está abaixo de `pasta` (0 para a própria pasta)."""
+    if subpasta == pasta:
+        return 0
+    return os.path.relpath(subpasta, pasta).count(os.sep) + 1
+
+
+class IndiceBiblioteca:
+    """
+    Índice persistente da biblioteca em SQLite: caminho, pasta, tamanho, mtime e
+    os metadados de cada faixa. Ao reabrir uma pasta, só os arquivos cujo tamanho
+    ou mtime mudou voltam a ser lidos pelo mutagen, e os que sumiram do disco são
+    apagados do índice.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_INDICE_BIBLIOTECA):
+        self.arquivo = arquivo
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.arquivo) or '.', exist_ok=True)
+        self._conexao = sqlite3.connect(self.arquivo, check_same_thread=False)
+        with self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS musicas (
+                    caminho TEXT PRIMARY KEY,
+                    pasta TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    titulo TEXT,
+                    artista TEXT,
+                    album TEXT,
+                    genero TEXT,
+                    duracao REAL,
+                    extras TEXT
+                )""")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS musicas_pasta ON musicas (pasta)")
+
+    def sincronizar(self, pasta, caminhos, extrair_lotes, ao_lote=None, stats=None, profundidade=0):
+        """
+        Retorna [(caminho, metadados)] na ordem de `caminhos`. Arquivos novos ou
+        alterados são lidos por `extrair_lotes(pendentes)`, que devolve lotes de
+        [(caminho, metadados)], e cada lote é gravado assim que chega; os do índice
+        que estavam em `pasta` e não aparecem mais em `caminhos` são removidos.
+        `ao_lote(lote)` recebe primeiro tudo o que veio do índice e depois cada lote lido.
+
+        `stats`: {caminho: os.stat_result} já obtidos pela varredura, para não
+        repetir o os.stat. `profundidade`: quantos níveis de subpastas de `pasta`
+        a varredura cobriu (None = todos); só esse trecho da árvore é podado.
+        """
+        pasta = os.path.abspath(pasta)
+        prefixo = os.path.join(pasta, '')
+        with self._lock:
+            # O intervalo [prefixo, prefixo com o separador seguinte) cobre a subárvore e usa o índice de 'pasta'
+            linhas = self._conexao.execute(
+                "SELECT caminho, tamanho, mtime, titulo, artista, album, genero, duracao, extras, pasta "
+                "FROM musicas WHERE pasta = ? OR (pasta >= ? AND pasta < ?)",
+                (pasta, prefixo, prefixo[:-1] + chr(ord(prefixo[-1]) + 1))).fetchall()
+        conhecidas = {linha[0]: linha for linha in linhas
+                      if _nivel(pasta, linha[9]) <= (float('inf') if profundidade is None else profundidade)}
+        stats = stats or {}
+
+        resultado = {}
+        pendentes = {}  # caminho -> (chave, tamanho, mtime) dos arquivos a ler
+        presentes = set()
+        for caminho in caminhos:
+            chave = caminho if os.path.isabs(caminho) else os.path.abspath(caminho)
+            st = stats.get(caminho)
+            if st is None:
+                try:
+                    st = os.stat(chave)
+                except OSError:
+                    continue
+            presentes.add(chave)
+            linha = conhecidas.get(chave)
+            if linha is not None and linha[1] == st.st_size and linha[2] == st.st_mtime_ns:
+                metadados = dict(zip(CAMPOS_INDICE, linha[3:8]))
+                if linha[8]:
+                    metadados.update(json.loads(linha[8]))
+                resultado[caminho] = metadados
+            else:
+                pendentes[caminho] = (chave, st.st_size, st.st_mtime_ns)
+        if ao_lote is not None and resultado:
+            ao_lote(list(resultado.items()))
+
+        if pendentes:
+            for lote in extrair_lotes(list(pendentes)):
+                alteradas = []
+                for caminho, metadados in lote:
+                    chave, tamanho, mtime = pendentes[caminho]
+                    alteradas.append((chave, os.path.dirname(chave), tamanho, mtime, metadados))
+                    resultado[caminho] = metadados
+                self._gravar(alteradas, [])
+                if ao_lote is not None:
+                    ao_lote(lote)
+
+        removidas = [(caminho,) for caminho in conhecidas if caminho not in presentes]
+        if removidas:
+            self._gravar([], removidas)
+        return [(caminho, resultado[caminho]) for caminho in caminhos if caminho in resultado]
+
+    def _gravar(self, alteradas, removidas):
+        registros = []
+        for chave, pasta, tamanho, mtime, metadados in alteradas:
+            extras = {k: v for k, v in metadados.items() if k not in CAMPOS_INDICE}
+            registros.append((chave, pasta, tamanho, mtime,
+                              *(metadados.get(campo) for campo in CAMPOS_INDICE),
+                              json.dumps(extras, ensure_ascii=False) if extras else None))
+        try:
+            with self._lock, self._conexao:
+                self._conexao.executemany(
+                    "INSERT OR REPLACE INTO musicas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", registros)
+                self._conexao.executemany("DELETE FROM musicas WHERE caminho = ?", removidas)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar índice da biblioteca: {e}")
+
+    def total(self):
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM musicas").fetchone()[0]
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,202 @@
+# indice_busca.py
+import os
+import mmap
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from constants import PASTA_DADOS
+
+PASTA_INDICE_BUSCA = os.path.join(PASTA_DADOS, 'indice_busca')
+
+# Taxas de bits (kbps) por índice do cabeçalho MPEG, para (versão 1?, camada)
+_TAXAS_BITS = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Taxas de amostragem por versão MPEG (bits do cabeçalho: 3 = 1, 2 = 2, 0 = 2.5)
+_TAXAS_AMOSTRAGEM = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _cabecalho_mp3(dados, pos):
+    """
+    Decodifica o cabeçalho de quadro MPEG em `pos`.
+    Retorna (tamanho_bytes, amostras, taxa, assinatura) ou None se não for um cabeçalho válido.
+    """
+    if pos + 4 > len(dados) or dados[pos] != 0xFF or (dados[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2 = dados[pos + 1], dados[pos + 2]
+    versao = (b1 >> 3) & 3
+    camada = 4 - ((b1 >> 1) & 3)
+    indice_bits = b2 >> 4
+    indice_taxa = (b2 >> 2) & 3
+    if versao == 1 or camada == 4 or indice_bits in (0, 15) or indice_taxa == 3:
+        return None
+    v1 = versao == 3
+    taxa = _TAXAS_AMOSTRAGEM[versao][indice_taxa]
+    kbps = _TAXAS_BITS[(v1, camada)][indice_bits]
+    preenchimento = (b2 >> 1) & 1
+    if camada == 1:
+        return (12 * kbps * 1000 // taxa + preenchimento) * 4, 384, taxa, (versao, camada, taxa)
+    amostras = 1152 if (camada == 2 or v1) else 576
+    tamanho = (amostras // 8) * kbps * 1000 // taxa + preenchimento
+    return tamanho, amostras, taxa, (versao, camada, taxa)
+
+
+def _pular_id3(dados):
+    if len(dados) >= 10 and dados[:3] == b'ID3':
+        tamanho = (dados[6] << 21) | (dados[7] << 14) | (dados[8] << 7) | dados[9]
+        return 10 + tamanho + (10 if dados[5] & 0x10 else 0)
+    return 0
+
+
+def indexar_mp3(caminho, intervalo=0.25):
+    """
+    Percorre os cabeçalhos dos quadros (sem decodificar áudio) e registra um
+    ponto de busca (amostra, byte) a cada `intervalo` segundos. Funciona também
+    em arquivos VBR sem tabela Xing.
+    """
+    with open(caminho, 'rb') as f:
+        try:
+            dados = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # Arquivo vazio
+        try:
+            pos = _pular_id3(dados)
+            fim = len(dados)
+            taxa = None
+            assinatura = None
+            amostra = 0
+            proximo_ponto = 0
+            amostras, offsets = [], []
+            while pos < fim - 4:
+                cabecalho = _cabecalho_mp3(dados, pos)
+                if cabecalho is not None and assinatura is None:
+                    # Primeiro quadro: confirma com o seguinte para não aceitar um falso sincronismo
+                    seguinte = _cabecalho_mp3(dados, pos + cabecalho[0])
+                    if seguinte is None or seguinte[3] != cabecalho[3]:
+                        cabecalho = None
+                if cabecalho is None or (assinatura is not None and cabecalho[3] != assinatura):
+                    proximo_ff = dados.find(b'\xff', pos + 1)
+                    if proximo_ff < 0:
+                        break
+                    pos = proximo_ff
+                    continue
+                tamanho, amostras_quadro, taxa, assinatura = cabecalho
+                if amostra >= proximo_ponto:
+                    amostras.append(amostra)
+                    offsets.append(pos)
+                    proximo_ponto = amostra + int(intervalo * taxa)
+                amostra += amostras_quadro
+                pos += tamanho
+        finally:
+            dados.close()
+    if taxa is None:
+        return None
+    return IndiceBusca(taxa, amostras, offsets, amostra)
+
+
+class IndiceBusca:
+    """Pontos de busca de um arquivo: amostra inicial de cada ponto e o byte onde o quadro começa."""
+
+    def __init__(self, taxa, amostras, offsets, total_amostras=0):
+        self.taxa = int(taxa)
+        self.amostras = np.asarray(amostras, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.total_amostras = int(total_amostras)
+
+    @property
+    def duracao(self):
+        return self.total_amostras / self.taxa if self.taxa else 0.0
+
+    def localizar(self, segundos):
+        """Último ponto em ou antes de `segundos`: retorna (segundos_do_ponto, byte)."""
+        alvo = int(max(0.0, segundos) * self.taxa)
+        i = max(0, int(np.searchsorted(self.amostras, alvo, side='right')) - 1)
+        return float(self.amostras[i]) / self.taxa, int(self.offsets[i])
+
+
+class CacheIndiceBusca:
+    """
+    Constrói o índice de busca de cada faixa MP3 uma única vez e o guarda em
+    data/indice_busca (chave: caminho + mtime + tamanho). Os índices das faixas
+    usadas recentemente também ficam em memória.
+    """
+
+    # FLAC (SEEKTABLE), OGG e WAV já têm busca direta no decodificador do SDL_mixer
+    EXTENSOES = {'.mp3': indexar_mp3}
+
+    def __init__(self, pasta=PASTA_INDICE_BUSCA, max_em_memoria=8):
+        self.pasta = pasta
+        self.max_em_memoria = max_em_memoria
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()  # Protege só _memoria e _construindo
+        self._construindo = {}  # arquivo -> Lock de quem está lendo ou construindo aquele índice
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def suporta(self, caminho):
+        return os.path.splitext(caminho)[1].lower() in self.EXTENSOES
+
+    def _arquivo(self, caminho):
+        st = os.stat(caminho)
+        identidade = f"{os.path.abspath(caminho)}|{st.st_mtime_ns}|{st.st_size}"
+        return os.path.join(self.pasta, hashlib.sha1(identidade.encode('utf-8')).hexdigest() + '.npz')
+
+    def obter(self, caminho):
+        """IndiceBusca da faixa (construído e gravado na primeira vez), ou None se o formato não tiver índice."""
+        if not self.suporta(caminho):
+            return None
+        try:
+            arquivo = self._arquivo(caminho)
+        except OSError:
+            return None
+        with self._lock:
+            if arquivo in self._memoria:
+                self._memoria.move_to_end(arquivo)
+                return self._memoria[arquivo]
+            lock_arquivo = self._construindo.setdefault(arquivo, threading.Lock())
+        # Ler ou construir pode levar segundos: só quem pede a mesma faixa espera, e por este lock
+        with lock_arquivo:
+            with self._lock:
+                indice = self._memoria.get(arquivo)
+            if indice is None:
+                indice = self._ler(arquivo)
+                if indice is None:
+                    indice = self._construir(caminho, arquivo)
+            with self._lock:
+                if indice is not None:
+                    self._memoria[arquivo] = indice
+                    self._memoria.move_to_end(arquivo)
+                    while len(self._memoria) > self.max_em_memoria:
+                        self._memoria.popitem(last=False)
+                self._construindo.pop(arquivo, None)
+            return indice
+
+    def _ler(self, arquivo):
+        try:
+            with np.load(arquivo) as dados:
+                return IndiceBusca(int(dados['taxa']), dados['amostras'], dados['offsets'], int(dados['total']))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _construir(self, caminho, arquivo):
+        indexar = self.EXTENSOES[os.path.splitext(caminho)[1].lower()]
+        try:
+            indice = indexar(caminho)
+        except OSError as e:
+            print(f"Erro ao indexar {os.path.basename(caminho)} para busca: {e}")
+            return None
+        if indice is None:
+            return None
+        try:
+            temporario = arquivo + '.tmp.npz'
+            np.savez(temporario, taxa=indice.taxa, amostras=indice.amostras,
+                     offsets=indice.offsets, total=indice.total_amostras)
+            os.replace(temporario, arquivo)
+        except OSError as e:
+            print(f"Erro ao salvar índice de busca: {e}")
+        return indice
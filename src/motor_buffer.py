@@ -0,0 +1,339 @@
+# motor_buffer.py
+import time
+import threading
+import numpy as np
+from saida_audio import SaidaPygame
+
+
+class MotorBuffer:
+    """
+    Motor de reprodução alternativo ao pygame.mixer.music: toca a faixa a partir
+    de um buffer numpy já decodificado (int16, formato do mixer), entregando-o
+    em blocos curtos ao canal da saída de áudio (saida_audio.py). O espectro lê o mesmo buffer
+    que está sendo ouvido, então a faixa é decodificada uma única vez.
+
+    A faixa também pode ser um FluxoPCM (fluxo_pcm.py), decodificado em fluxo
+    enquanto toca; nesse caso o bloco só é lido quando o decodificador já o entregou.
+
+    Com `duracao_crossfade` > 0, a troca para a faixa seguinte começa esse
+    tempo antes do fim da atual: o final de uma e o início da outra são somados
+    bloco a bloco com rampas de ganho de potência constante.
+    """
+
+    def __init__(self, evento_fim=None, evento_troca=None, duracao_bloco=0.1, saida=None):
+        self.saida = saida or SaidaPygame()
+        frequencia, canais = self.saida.formato()
+        self.frame_rate = frequencia
+        self.channels = canais
+        self.evento_fim = evento_fim
+        self.evento_troca = evento_troca
+        self.quadros_por_bloco = max(256, int(duracao_bloco * frequencia))
+
+        self._canal = self.saida.abrir_canal()
+        self._lock = threading.Lock()
+        self._dados = None
+        self._dados_seguinte = None
+        self._troca_em = None
+        self.ultimo_intervalo_ms = None
+        self._proximo_quadro = 0
+        self._quadro_base = 0
+        self._instante_base = None
+        self._tocando = False
+        self._pausado = False
+        self.volume = 1.0
+        self.processadores = []  # Objetos com processar(bloco) aplicados a cada bloco antes do canal
+        self.duracao_crossfade = 0.0
+        self.subexecucoes = 0
+        self.ao_subexecutar = None  # Chamado (na thread do alimentador) quando o canal fica sem áudio no meio da faixa
+        self._aguardando_inicio = False  # Canal vazio esperado: ainda não recebeu o primeiro bloco
+        self._saindo = None  # Faixa anterior durante o crossfade: [dados, posicao, feito, rampa_entrada, rampa_saida]
+
+        self._acordar = threading.Event()
+        self._encerrar = False
+        self._thread = threading.Thread(target=self._run_alimentador, daemon=True)
+        self._thread.start()
+
+    # --- Controle -----------------------------------------------------------
+
+    def carregar(self, dados):
+        """Recebe um array (quadros, canais) int16 no formato do mixer."""
+        self.parar()
+        with self._lock:
+            self._dados = dados
+            self._dados_seguinte = None
+            self._troca_em = None
+            self._proximo_quadro = 0
+            self._quadro_base = 0
+
+    def transicionar(self, dados):
+        """
+        Troca de faixa com crossfade a partir do ponto atual (troca manual). Sem
+        crossfade configurado, ou se nada estiver tocando, equivale a carregar().
+        Retorna True se a nova faixa já está tocando.
+        """
+        with self._lock:
+            if (self.duracao_crossfade > 0 and self._tocando and not self._pausado
+                    and self._dados is not None and self._proximo_quadro < len(self._dados)):
+                self._dados_seguinte = dados
+                self._trocar_para_seguinte(canal_ocupado=self._canal.ocupado(),
+                                           fade=min(self._quadros_crossfade(), len(self._dados) - self._proximo_quadro))
+                self._troca_em = None  # Troca pedida por quem chamou: não gera evento de troca
+                return True
+        self.carregar(dados)
+        return False
+
+    def tem_seguinte(self):
+        return self._dados_seguinte is not None
+
+    def _quadros_crossfade(self):
+        return int(self.duracao_crossfade * self.frame_rate)
+
+    def tocar(self, quadro_inicial=0):
+        with self._lock:
+            if self._dados is None:
+                return False
+            self._canal.parar()
+            for processador in self.processadores:
+                processador.reset()
+            self._proximo_quadro = max(0, min(quadro_inicial, len(self._dados)))
+            self._quadro_base = self._proximo_quadro
+            self._instante_base = self.saida.agora()
+            self._saindo = None
+            self._aguardando_inicio = True
+            self._tocando = True
+            self._pausado = False
+        self._acordar.set()
+        return True
+
+    def enfileirar(self, dados):
+        """Prepara a próxima faixa: o primeiro bloco dela segue o último da atual, sem intervalo."""
+        with self._lock:
+            self._dados_seguinte = dados
+
+    def buscar(self, quadro):
+        """Salta para `quadro` mantendo o estado atual (tocando ou pausado)."""
+        with self._lock:
+            if self._dados is None:
+                return False
+            quadro = max(0, min(int(quadro), len(self._dados)))
+            self._canal.parar()
+            for processador in self.processadores:
+                processador.reset()
+            self._proximo_quadro = quadro
+            self._quadro_base = quadro
+            self._instante_base = self.saida.agora()
+            self._troca_em = None
+            self._saindo = None
+            self._aguardando_inicio = True
+        self._acordar.set()
+        return True
+
+    def substituir(self, antigos, novos):
+        """
+        Troca a fonte da faixa atual por outra com o mesmo áudio (o fluxo pelo PCM
+        do cache) sem mexer na posição. Retorna False se `antigos` não é mais a faixa atual.
+        """
+        with self._lock:
+            if self._dados is not antigos:
+                return False
+            self._dados = novos
+            return True
+
+    def em_uso(self, dados):
+        """True se `dados` é a faixa atual ou a preparada para tocar em seguida."""
+        return dados is self._dados or dados is self._dados_seguinte
+
+    def cancelar_seguinte(self):
+        with self._lock:
+            self._dados_seguinte = None
+
+    def pausar(self):
+        with self._lock:
+            if not self._tocando or self._pausado:
+                return
+            self._quadro_base = self._posicao_sem_lock()
+            self._pausado = True
+            self._canal.pausar()
+
+    def retomar(self):
+        with self._lock:
+            if not self._pausado:
+                return
+            self._instante_base = self.saida.agora()
+            self._pausado = False
+            self._canal.retomar()
+        self._acordar.set()
+
+    def parar(self):
+        with self._lock:
+            self._tocando = False
+            self._pausado = False
+            self._canal.parar()
+            self._quadro_base = 0
+            self._proximo_quadro = 0
+            self._dados_seguinte = None
+            self._troca_em = None
+            self._saindo = None
+
+    def reabrir_canal(self):
+        """Abre de novo o canal depois que a saída de áudio foi reaberta (o anterior deixou de existir)."""
+        with self._lock:
+            self._canal = self.saida.abrir_canal()
+            self._canal.set_volume(self.volume)
+
+    def set_volume(self, volume):
+        self.volume = volume
+        self._canal.set_volume(volume)
+
+    def ocupado(self):
+        return self._tocando
+
+    def posicao_segundos(self):
+        with self._lock:
+            return self._posicao_sem_lock() / self.frame_rate
+
+    def _posicao_sem_lock(self):
+        if not self._tocando or self._pausado or self._instante_base is None:
+            return self._quadro_base
+        decorrido = int((self.saida.agora() - self._instante_base) * self.frame_rate)
+        return max(0, min(self._quadro_base + decorrido, self._proximo_quadro))
+
+    # --- Fonte de amostras para o espectro ------------------------------------
+
+    def ler(self, posicao, num_amostras):
+        """Mesma interface das fontes de fonte_amostras.py, lendo o buffer que está tocando."""
+        dados = self._dados
+        if dados is None:
+            return None
+        fim_quadro = min(int(posicao * self.frame_rate), len(dados))
+        if fim_quadro <= 0:
+            return None
+        return np.asarray(dados[max(0, fim_quadro - num_amostras):fim_quadro, 0], dtype=np.float32)
+
+    def fechar(self):
+        # O motor continua vivo entre faixas; apenas a referência do espectro é descartada
+        pass
+
+    def encerrar(self):
+        self._encerrar = True
+        self.parar()
+        self._acordar.set()
+        self._thread.join(timeout=1)
+
+    # --- Alimentação do canal ---------------------------------------------------
+
+    def _proximo_bloco(self, canal_ocupado=True):
+        """
+        Retorna o próximo bloco a enfileirar, None se a faixa acabou ou um bloco
+        vazio se a faixa é um FluxoPCM que ainda não decodificou o trecho.
+        """
+        dados = self._dados
+        inicio = self._proximo_quadro
+        if dados is not None and self._dados_seguinte is not None and self._saindo is None:
+            restante = len(dados) - inicio
+            if restante <= self._quadros_crossfade():
+                self._trocar_para_seguinte(canal_ocupado, fade=restante)
+                dados, inicio = self._dados, 0
+        if dados is None:
+            return None
+        pronto = getattr(dados, 'pronto', None)
+        if pronto is not None and not pronto(inicio, inicio + self.quadros_por_bloco):
+            return np.zeros((0, self.channels), dtype=np.int16)
+        if inicio >= len(dados):
+            return None
+        bloco = dados[inicio:min(inicio + self.quadros_por_bloco, len(dados))]
+        self._proximo_quadro = inicio + len(bloco)
+        if self._saindo is not None:
+            bloco = self._mixar_saida(bloco)
+        for processador in self.processadores:
+            bloco = processador.processar(bloco)
+        return np.ascontiguousarray(bloco)
+
+    def _mixar_saida(self, bloco):
+        """Soma ao bloco da nova faixa o trecho correspondente da anterior, com as rampas do crossfade."""
+        dados, posicao, feito, rampa_entrada, rampa_saida = self._saindo
+        n = len(bloco)
+        total = len(rampa_entrada)
+        m = min(n, total - feito, len(dados) - posicao)  # Em fluxo, o trecho da anterior pode ser mais curto que a rampa
+        saida = bloco.astype(np.float32)
+        saida[:m] *= rampa_entrada[feito:feito + m, None]
+        saida[:m] += dados[posicao:posicao + m] * rampa_saida[feito:feito + m, None]
+        feito += m
+        if feito >= total or posicao + m >= len(dados):
+            self._saindo = None
+        else:
+            self._saindo[1:3] = [posicao + m, feito]
+        return np.clip(saida, -32768, 32767).astype(np.int16)
+
+    def _trocar_para_seguinte(self, canal_ocupado, fade=0):
+        """
+        Passa para a faixa preparada. O relógio é reposicionado para que a posição
+        zero coincida com o ponto em que a nova faixa começa a ser ouvida: o fim
+        real da anterior ou, com crossfade, o início da sobreposição de `fade` quadros.
+        """
+        agora = self.saida.agora()
+        restante = self._proximo_quadro - self._posicao_sem_lock()
+        if canal_ocupado:
+            # O bloco entra na fila do canal atrás do último bloco já enfileirado
+            self.ultimo_intervalo_ms = 0.0
+            self._troca_em = agora + restante / self.frame_rate
+        else:
+            self.ultimo_intervalo_ms = max(0.0, (agora - (self._instante_base or agora)
+                                                 - (self._proximo_quadro - self._quadro_base) / self.frame_rate) * 1000)
+            self._troca_em = agora
+            restante = 0
+        self._saindo = None
+        if fade > 0:
+            fase = np.linspace(0.0, np.pi / 2, fade, endpoint=False, dtype=np.float32)
+            self._saindo = [self._dados[self._proximo_quadro:], 0, 0, np.sin(fase), np.cos(fase)]
+        self._dados = self._dados_seguinte
+        self._dados_seguinte = None
+        self._quadro_base = -restante
+        self._instante_base = agora
+        self._proximo_quadro = 0
+
+    def _run_alimentador(self):
+        intervalo = self.quadros_por_bloco / self.frame_rate / 4 / self.saida.velocidade
+        while not self._encerrar:
+            if not self._tocando or self._pausado:
+                self._acordar.wait(0.1)
+                self._acordar.clear()
+                continue
+
+            terminou = False
+            trocou = False
+            subexecutou = False
+            with self._lock:
+                if self._troca_em is not None and self.saida.agora() >= self._troca_em:
+                    self._troca_em = None
+                    trocou = True
+                if self._tocando and not self._pausado:
+                    if not self._canal.ocupado():
+                        bloco = self._proximo_bloco(canal_ocupado=False)
+                        if bloco is None:
+                            self._tocando = False
+                            self._quadro_base = self._proximo_quadro
+                            terminou = True
+                        elif len(bloco):
+                            if not self._aguardando_inicio:
+                                # O canal esvaziou antes do próximo bloco chegar: houve silêncio audível.
+                                # O relógio volta a contar do início deste bloco, que só agora começa a tocar.
+                                self.subexecucoes += 1
+                                subexecutou = True
+                                self._quadro_base = self._proximo_quadro - len(bloco)
+                                self._instante_base = self.saida.agora()
+                            self._aguardando_inicio = False
+                            self._canal.tocar(bloco)
+                            self._canal.set_volume(self.volume)
+                    elif not self._canal.tem_fila():
+                        bloco = self._proximo_bloco()
+                        if bloco is not None and len(bloco):
+                            self._canal.enfileirar(bloco)
+
+            if subexecutou and self.ao_subexecutar is not None:
+                self.ao_subexecutar()
+            if trocou and self.evento_troca is not None:
+                self.saida.postar_evento(self.evento_troca)
+            if terminou and self.evento_fim is not None:
+                self.saida.postar_evento(self.evento_fim)
+            time.sleep(intervalo)
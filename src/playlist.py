@@ -2,6 +2,7 @@
 import os
 import json
 from constants import PASTA_DADOS # Importa PASTA_DADOS do arquivo centralizado
+from varredura import varrer
 
 # Os caminhos agora usam a PASTA_DADOS centralizada
 ESTADO_PLAYER = os.path.join(PASTA_DADOS, 'estado_player.json')
@@ -14,13 +15,33 @@ class PlaylistManager:
         self.indice_atual = 0
         self.carregar_estado()
 
-    def carregar_diretorio(self, caminho):
-        extensoes = ['.mp3', '.wav', '.flac', '.ogg']
+    def carregar_diretorio(self, caminho, ao_encontrar=None, ao_progredir=None, profundidade=None, seguir_links=False,
+                           stats=None):
+        """
+        Monta a playlist com as faixas da pasta e das subpastas. A lista cresce
+        enquanto a varredura anda, então a interface já pode mostrar e tocar as
+        primeiras faixas antes de o carregamento terminar; `ao_encontrar(caminho)`
+        é chamado (na thread da varredura) logo depois de cada faixa entrar na lista.
+        Se `stats` for um dict, recebe {caminho: os.stat_result} de cada faixa, para
+        a Biblioteca.carregar_faixas aproveitar a mesma varredura.
+        """
         try:
-            arquivos = os.listdir(caminho)
-            self.playlist_atual = sorted(
-                [os.path.join(caminho, f) for f in arquivos if os.path.splitext(f)[1].lower() in extensoes]
-            )
+            faixas = []
+            for entrada in varrer(caminho, profundidade=profundidade, seguir_links=seguir_links,
+                                  ao_progredir=ao_progredir):
+                if not faixas:
+                    # Só troca a playlist quando a pasta se mostrou legível
+                    self.playlist_atual = faixas
+                    self.indice_atual = 0
+                faixas.append(entrada.path)
+                if stats is not None:
+                    try:
+                        stats[entrada.path] = entrada.stat()
+                    except OSError:
+                        pass
+                if ao_encontrar is not None:
+                    ao_encontrar(entrada.path)
+            self.playlist_atual = faixas
             self.indice_atual = 0
             return self.playlist_atual
         except Exception as e:
@@ -0,0 +1,171 @@
+# render_eq.py
+import os
+import wave
+import hashlib
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, Future
+from constants import PASTA_DADOS
+from fonte_amostras import iterar_pcm, sondar_formato
+from equalizador import Equalizador3Bandas
+from utils import aplicar_cota_lru, processos_em_segundo_plano
+
+PASTA_RENDER_EQ = os.path.join(PASTA_DADOS, 'cache_eq')
+
+
+def hash_arquivo(caminho, amostra_bytes=256 * 1024):
+    """
+    Impressão digital do conteúdo: tamanho + início + fim do arquivo. Evita ler
+    faixas inteiras e continua estável se o arquivo for movido ou renomeado.
+    """
+    tamanho = os.path.getsize(caminho)
+    h = hashlib.sha1(str(tamanho).encode('ascii'))
+    with open(caminho, 'rb') as f:
+        h.update(f.read(amostra_bytes))
+        if tamanho > amostra_bytes:
+            f.seek(max(amostra_bytes, tamanho - amostra_bytes))
+            h.update(f.read(amostra_bytes))
+    return h.hexdigest()
+
+
+def _renderizar(caminho, destino, grave, medio, agudo):
+    """Executa em um processo do pool: decodifica em fluxo, aplica a EQ e grava um WAV."""
+    taxa, canais, _ = sondar_formato(caminho)
+    eq = Equalizador3Bandas(taxa, canais)
+    eq.set_ganhos(grave, medio, agudo)
+
+    temporario = destino + '.tmp'
+    quadros = 0
+    with wave.open(temporario, 'wb') as saida:
+        saida.setnchannels(canais)
+        saida.setsampwidth(2)
+        saida.setframerate(taxa)
+        for bruto in iterar_pcm(caminho, taxa, canais):
+            bloco = np.frombuffer(bruto, dtype=np.int16).reshape(-1, canais)
+            saida.writeframes(eq.processar(bloco).tobytes())
+            quadros += len(bloco)
+    if quadros == 0:
+        os.remove(temporario)
+        return None
+    os.replace(temporario, destino)
+    return destino
+
+
+class ServicoRenderEQ:
+    """
+    Pré-renderiza faixas com a EQ aplicada, para máquinas em que a EQ em tempo
+    real pesa demais. Os renders rodam em um pool de processos e ficam em cache
+    no disco, indexados por (hash do arquivo, grave, medio, agudo), com cota de
+    espaço e descarte LRU.
+    """
+
+    def __init__(self, pasta=PASTA_RENDER_EQ, cota_mb=1024, max_processos=None):
+        self.pasta = pasta
+        self.cota_bytes = int(cota_mb * 1024 * 1024)
+        self.max_processos = max_processos or processos_em_segundo_plano()
+        self._executor = None
+        self._pendentes = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self.em_uso = set()  # Renders tocando ou preparados para tocar: a cota nunca os apaga
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def _chave(self, caminho, grave, medio, agudo):
+        st = os.stat(caminho)
+        identidade = (os.path.abspath(caminho), st.st_mtime_ns, st.st_size)
+        hash_conteudo = self._hashes.get(identidade)
+        if hash_conteudo is None:
+            hash_conteudo = hash_arquivo(caminho)
+            self._hashes[identidade] = hash_conteudo
+        return hash_conteudo + self._sufixo(grave, medio, agudo)
+
+    @staticmethod
+    def _sufixo(grave, medio, agudo):
+        return f"_{float(grave):+.1f}_{float(medio):+.1f}_{float(agudo):+.1f}"
+
+    def _destino(self, caminho, chave):
+        # Um diretório por entrada, mantendo o nome original para exibição na UI
+        nome = os.path.splitext(os.path.basename(caminho))[0] + '.wav'
+        return os.path.join(self.pasta, chave, nome)
+
+    def caminho_renderizado(self, caminho, grave, medio, agudo):
+        """Retorna o arquivo já renderizado para estes ganhos, ou None se ainda não existe."""
+        try:
+            destino = self._destino(caminho, self._chave(caminho, grave, medio, agudo))
+        except OSError:
+            return None
+        if os.path.exists(destino):
+            os.utime(destino, None)  # Marca como usado recentemente (LRU)
+            return destino
+        return None
+
+    def renderizar(self, caminho, grave, medio, agudo):
+        """Agenda o render (se ainda não existir) e retorna um Future com o caminho do WAV."""
+        try:
+            chave = self._chave(caminho, grave, medio, agudo)
+        except OSError:
+            futuro = Future()
+            futuro.set_result(None)
+            return futuro
+
+        destino = self._destino(caminho, chave)
+        with self._lock:
+            futuro = self._pendentes.get(chave)
+            if futuro is not None:
+                return futuro
+            if os.path.exists(destino):
+                futuro = Future()
+                futuro.set_result(destino)
+                return futuro
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_processos)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            futuro = self._executor.submit(_renderizar, caminho, destino, grave, medio, agudo)
+            self._pendentes[chave] = futuro
+        futuro.add_done_callback(lambda f, chave=chave, destino=destino: self._concluido(chave, destino, f))
+        return futuro
+
+    def renderizar_a_frente(self, caminhos, grave, medio, agudo):
+        """Renderiza as próximas faixas da fila no pool de segundo plano."""
+        return [self.renderizar(c, grave, medio, agudo) for c in caminhos]
+
+    def cancelar_pendentes(self, ganhos=None):
+        """
+        Cancela os renders que ainda esperam na fila do pool, menos os dos `ganhos`
+        (grave, medio, agudo) dados; sem `ganhos`, todos. Os que já começaram terminam.
+        """
+        sufixo = None if ganhos is None else self._sufixo(*ganhos)
+        with self._lock:
+            futuros = [f for chave, f in self._pendentes.items() if sufixo is None or not chave.endswith(sufixo)]
+        return sum(1 for futuro in futuros if futuro.cancel())
+
+    def obter(self, caminho, grave, medio, agudo, timeout=None):
+        """Bloqueia até o render ficar pronto. Em caso de falha, devolve o arquivo original."""
+        try:
+            destino = self.renderizar(caminho, grave, medio, agudo).result(timeout=timeout)
+        except Exception as e:
+            print(f"Erro ao renderizar EQ de {os.path.basename(caminho)}: {e}")
+            destino = None
+        return destino or caminho
+
+    def marcar_em_uso(self, *caminhos):
+        """Informa os arquivos que o player está usando (a faixa atual e a próxima); None é ignorado."""
+        with self._lock:
+            self.em_uso = {os.path.abspath(c) for c in caminhos if c}
+
+    def _concluido(self, chave, destino, futuro):
+        with self._lock:
+            self._pendentes.pop(chave, None)
+            em_uso = set(self.em_uso)
+            if futuro.cancelled():
+                try:
+                    os.rmdir(os.path.dirname(destino))  # Criado vazio ao agendar
+                except OSError:
+                    pass
+                return
+        aplicar_cota_lru(self.pasta, self.cota_bytes, em_uso=em_uso)
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,267 @@
+# saida_audio.py
+import time
+import threading
+from collections import deque
+import numpy as np
+import pygame
+
+
+class SaidaPygame:
+    """
+    Saída pelo dispositivo de som, via pygame.mixer. É a única que oferece
+    pygame.mixer.music (`music`); as demais só tocam pelo MotorBuffer.
+    """
+
+    EVENTO_USUARIO = pygame.USEREVENT
+    music = pygame.mixer.music
+    velocidade = 1.0
+
+    def __init__(self, frequencia=44100, tamanho_buffer=None):
+        self.frequencia = frequencia
+        self.tamanho_buffer = tamanho_buffer  # Quadros do buffer do SDL; None = padrão do pygame
+
+    def iniciar(self):
+        self._abrir_mixer()
+        pygame.init()
+
+    def _abrir_mixer(self):
+        if self.tamanho_buffer:
+            pygame.mixer.init(frequency=self.frequencia, buffer=self.tamanho_buffer)
+        else:
+            pygame.mixer.init(frequency=self.frequencia)
+
+    def reabrir(self, tamanho_buffer):
+        """
+        Reabre o mixer com outro tamanho de buffer. Interrompe o que estiver tocando
+        e invalida os canais abertos: quem os usa precisa chamar abrir_canal() de novo.
+        """
+        self.tamanho_buffer = tamanho_buffer
+        pygame.mixer.quit()
+        self._abrir_mixer()
+
+    def formato(self):
+        """(frequência, canais) em que o mixer foi de fato aberto."""
+        frequencia, _, canais = pygame.mixer.get_init()
+        return frequencia, canais
+
+    def abrir_canal(self):
+        return _CanalPygame()
+
+    def agora(self):
+        return time.perf_counter()
+
+    def postar_evento(self, tipo):
+        pygame.event.post(pygame.event.Event(tipo))
+
+    def eventos(self):
+        return [evento.type for evento in pygame.event.get()]
+
+    def descartar_eventos(self, tipo):
+        pygame.event.clear(tipo)
+
+    def encerrar(self):
+        pygame.mixer.quit()
+        pygame.quit()
+
+
+class _CanalPygame:
+    """Canal reservado do mixer, recebendo blocos int16 (quadros, canais)."""
+
+    def __init__(self):
+        self._canal = pygame.mixer.Channel(0)
+        pygame.mixer.set_reserved(1)  # Impede que Sound.play() use o canal do motor
+
+    def tocar(self, bloco):
+        self._canal.play(pygame.mixer.Sound(buffer=bloco.tobytes()))
+
+    def enfileirar(self, bloco):
+        self._canal.queue(pygame.mixer.Sound(buffer=bloco.tobytes()))
+
+    def ocupado(self):
+        return self._canal.get_busy()
+
+    def tem_fila(self):
+        return self._canal.get_queue() is not None
+
+    def parar(self):
+        self._canal.stop()
+
+    def pausar(self):
+        self._canal.pause()
+
+    def retomar(self):
+        self._canal.unpause()
+
+    def set_volume(self, volume):
+        self._canal.set_volume(volume)
+
+
+class SaidaNula:
+    """
+    Saída sem dispositivo de som, para testes e benchmarks em CI. Consome os
+    blocos no ritmo de um relógio virtual que anda `velocidade` vezes mais rápido
+    que o real (1.0 = tempo real) e conta os quadros tocados. Com `gravar`, guarda
+    também cópias dos blocos recebidos, que audio_gravado() devolve em ordem.
+    """
+
+    EVENTO_USUARIO = 1000
+    music = None
+
+    def __init__(self, frequencia=44100, canais=2, velocidade=1.0, tamanho_buffer=None, gravar=False):
+        self.frequencia = frequencia
+        self.canais = canais
+        self.velocidade = float(velocidade)
+        self.gravar = gravar
+        self.tamanho_buffer = tamanho_buffer  # Só registrado: a saída nula não tem buffer de dispositivo
+        self._inicio = time.perf_counter()
+        self._eventos = deque()
+        self.canal = None
+
+    def iniciar(self):
+        self._inicio = time.perf_counter()
+
+    def formato(self):
+        return self.frequencia, self.canais
+
+    def reabrir(self, tamanho_buffer):
+        self.tamanho_buffer = tamanho_buffer
+        if self.canal is not None:
+            self.canal.parar()
+
+    def abrir_canal(self):
+        self.canal = _CanalNulo(self)
+        return self.canal
+
+    def agora(self):
+        return (time.perf_counter() - self._inicio) * self.velocidade
+
+    def postar_evento(self, tipo):
+        self._eventos.append(tipo)
+
+    def eventos(self):
+        tipos = []
+        while self._eventos:
+            tipos.append(self._eventos.popleft())
+        return tipos
+
+    def descartar_eventos(self, tipo):
+        self._eventos = deque(t for t in self._eventos if t != tipo)
+
+    def posicao(self):
+        """Segundos de áudio já consumidos pelo canal."""
+        if self.canal is None:
+            return 0.0
+        return self.canal.quadros_consumidos() / self.frequencia
+
+    def audio_gravado(self):
+        """Blocos recebidos pelo canal (com `gravar`), concatenados: array (quadros, canais) int16."""
+        if self.canal is None or not self.canal.gravados:
+            return np.zeros((0, self.canais), dtype=np.int16)
+        return np.concatenate(self.canal.gravados)
+
+    def encerrar(self):
+        if self.canal is not None:
+            self.canal.parar()
+
+
+class _CanalNulo:
+    """Mesma interface de _CanalPygame: um bloco tocando e no máximo um na fila."""
+
+    def __init__(self, saida):
+        self._saida = saida
+        self._lock = threading.Lock()
+        self._atual = 0  # Quadros do bloco tocando
+        self._fim_atual = 0.0  # Instante (relógio virtual) em que ele termina
+        self._fila = None
+        self._pausado_em = None
+        self._quadros_concluidos = 0
+        self.blocos = 0
+        self.volume = 1.0
+        self.gravados = []  # Cópias dos blocos recebidos, se a saída foi criada com gravar=True
+
+    def _atualizar(self, agora):
+        if self._pausado_em is not None or not self._atual:
+            return
+        if agora >= self._fim_atual:
+            self._quadros_concluidos += self._atual
+            self._atual = 0
+            if self._fila is not None:
+                # O bloco da fila começa exatamente quando o anterior acaba
+                self._iniciar(self._fila, self._fim_atual)
+                self._fila = None
+                self._atualizar(agora)
+
+    def _iniciar(self, quadros, instante):
+        self._atual = quadros
+        self._fim_atual = instante + quadros / self._saida.frequencia
+        self.blocos += 1
+
+    def _gravar(self, bloco):
+        if self._saida.gravar:
+            self.gravados.append(np.array(bloco, dtype=np.int16))
+
+    def tocar(self, bloco):
+        with self._lock:
+            self._gravar(bloco)
+            self._fila = None
+            self._pausado_em = None
+            self._iniciar(len(bloco), self._saida.agora())
+
+    def enfileirar(self, bloco):
+        with self._lock:
+            self._gravar(bloco)
+            agora = self._saida.agora()
+            self._atualizar(agora)
+            if self._atual:
+                self._fila = len(bloco)
+            else:
+                self._iniciar(len(bloco), agora)
+
+    def ocupado(self):
+        with self._lock:
+            self._atualizar(self._saida.agora())
+            return self._atual > 0
+
+    def tem_fila(self):
+        with self._lock:
+            self._atualizar(self._saida.agora())
+            return self._fila is not None
+
+    def parar(self):
+        with self._lock:
+            agora = self._saida.agora()
+            self._atualizar(agora)
+            if self._atual:
+                # Conta a parte do bloco que chegou a tocar
+                instante = self._pausado_em if self._pausado_em is not None else agora
+                restante = max(0.0, self._fim_atual - instante) * self._saida.frequencia
+                self._quadros_concluidos += max(0, self._atual - int(restante))
+            self._atual = 0
+            self._fila = None
+            self._pausado_em = None
+
+    def pausar(self):
+        with self._lock:
+            agora = self._saida.agora()
+            self._atualizar(agora)
+            if self._pausado_em is None:
+                self._pausado_em = agora
+
+    def retomar(self):
+        with self._lock:
+            if self._pausado_em is not None:
+                self._fim_atual += self._saida.agora() - self._pausado_em
+                self._pausado_em = None
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def quadros_consumidos(self):
+        with self._lock:
+            agora = self._saida.agora()
+            self._atualizar(agora)
+            if not self._atual:
+                return self._quadros_concluidos
+            instante = self._pausado_em if self._pausado_em is not None else agora
+            restante = max(0.0, self._fim_atual - instante) * self._saida.frequencia
+            return self._quadros_concluidos + max(0, self._atual - int(restante))
@@ -0,0 +1,105 @@
+# sonda.py
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from constants import PASTA_DADOS
+from fonte_amostras import sondar_formato
+from varredura import varrer
+
+ARQUIVO_SONDAGEM = os.path.join(PASTA_DADOS, 'sondagem.json')
+EXTENSOES_AUDIO = ('.mp3', '.wav', '.flac', '.ogg', '.m4a', '.opus')
+
+
+class CacheSondagem:
+    """
+    Cache persistente de duração, taxa de amostragem e número de canais por
+    arquivo, invalidado por mtime/tamanho. Com o cache preenchido (por exemplo
+    pela sondagem em lote de um diretório), trocar de faixa custa apenas um
+    os.stat, sem abrir as tags do arquivo.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_SONDAGEM):
+        self.arquivo = arquivo
+        self._entradas = {}
+        self._alterado = False
+        self._lock = threading.Lock()
+        self.carregar()
+
+    def obter(self, caminho):
+        """Retorna (taxa, canais, duracao) do arquivo, sondando-o apenas se mudou desde a última vez."""
+        info = self.consultar(caminho)
+        if info is None:
+            info = self._sondar(caminho)
+        if info is None:
+            return sondar_formato(caminho)
+        return info['taxa'], info['canais'], info['duracao']
+
+    def consultar(self, caminho):
+        """Entrada do cache, se ainda for válida para o arquivo no disco; nunca lê o arquivo."""
+        chave = os.path.abspath(caminho)
+        try:
+            st = os.stat(chave)
+        except OSError:
+            return None
+        with self._lock:
+            info = self._entradas.get(chave)
+        if info and info['mtime'] == st.st_mtime_ns and info['tamanho'] == st.st_size:
+            return info
+        return None
+
+    def _sondar(self, caminho):
+        chave = os.path.abspath(caminho)
+        try:
+            st = os.stat(chave)
+        except OSError:
+            return None
+        taxa, canais, duracao = sondar_formato(chave)
+        info = {'mtime': st.st_mtime_ns, 'tamanho': st.st_size,
+                'taxa': taxa, 'canais': canais, 'duracao': duracao}
+        with self._lock:
+            self._entradas[chave] = info
+            self._alterado = True
+        return info
+
+    def sondar_lote(self, caminhos, max_threads=8):
+        """Sonda em paralelo os arquivos novos ou alterados. Retorna quantos foram lidos."""
+        pendentes = [c for c in caminhos if self.consultar(c) is None]
+        if pendentes:
+            with ThreadPoolExecutor(max_workers=max_threads) as executor:
+                list(executor.map(self._sondar, pendentes))
+            self.salvar()
+        return len(pendentes)
+
+    def sondar_diretorio(self, pasta, recursivo=True, max_threads=8):
+        caminhos = [entrada.path for entrada in
+                    varrer(pasta, EXTENSOES_AUDIO, profundidade=None if recursivo else 0)]
+        return self.sondar_lote(caminhos, max_threads=max_threads)
+
+    def carregar(self):
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            self._entradas = dados if isinstance(dados, dict) else {}
+        except FileNotFoundError:
+            self._entradas = {}
+        except Exception as e:
+            print(f"Erro ao carregar cache de sondagem: {e}")
+            self._entradas = {}
+
+    def salvar(self):
+        with self._lock:
+            if not self._alterado:
+                return True
+            dados = dict(self._entradas)
+            self._alterado = False
+        try:
+            os.makedirs(os.path.dirname(self.arquivo), exist_ok=True)
+            temporario = self.arquivo + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar cache de sondagem: {e}")
+            return False
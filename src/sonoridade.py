@@ -0,0 +1,124 @@
+# sonoridade.py
+import os
+import numpy as np
+from constants import PASTA_DADOS
+from fonte_amostras import iterar_pcm, sondar_formato
+from analise_lote import AnaliseEmLote
+
+ARQUIVO_SONORIDADE = os.path.join(PASTA_DADOS, 'sonoridade.json')
+
+ALVO_LUFS = -14.0  # Nível de referência usado pelos principais serviços de streaming
+PICO_MAXIMO_DB = -1.0  # Margem para o ganho positivo não causar clipping
+LIMITE_ABSOLUTO_LUFS = -70.0
+LIMITE_RELATIVO_LU = -10.0
+
+
+def _biquad_k(taxa):
+    """Os dois estágios da ponderação K da ITU-R BS.1770 (shelf de agudos + passa-altas), para qualquer taxa."""
+    K = np.tan(np.pi * 1681.974450955533 / taxa)
+    Vh = 10 ** (3.999843853973347 / 20)
+    Vb = Vh ** 0.4996667741545416
+    Q = 0.7071752369554196
+    a0 = 1 + K / Q + K * K
+    shelf = (np.array([Vh + Vb * K / Q + K * K, 2 * (K * K - Vh), Vh - Vb * K / Q + K * K]) / a0,
+             np.array([1.0, 2 * (K * K - 1) / a0, (1 - K / Q + K * K) / a0]))
+
+    K = np.tan(np.pi * 38.13547087602444 / taxa)
+    Q = 0.5003270373238773
+    a0 = 1 + K / Q + K * K
+    passa_altas = (np.array([1.0, -2.0, 1.0]),
+                   np.array([1.0, 2 * (K * K - 1) / a0, (1 - K / Q + K * K) / a0]))
+    return shelf, passa_altas
+
+
+def pesos_k(taxa, tamanho):
+    """
+    |H(f)|² da ponderação K nos bins de uma rfft de `tamanho` pontos, já com os
+    fatores de Parseval: a energia ponderada de um bloco é sum(|X|² * pesos).
+    """
+    num_bins = tamanho // 2 + 1
+    z = np.exp(-1j * np.linspace(0, np.pi, num_bins))
+    resposta = np.ones(num_bins)
+    for b, a in _biquad_k(taxa):
+        h = (b[0] + b[1] * z + b[2] * z ** 2) / (a[0] + a[1] * z + a[2] * z ** 2)
+        resposta *= np.abs(h) ** 2
+    parseval = np.full(num_bins, 2.0)
+    parseval[0] = 1.0
+    parseval[-1] = 1.0
+    return resposta * parseval / (tamanho * tamanho)
+
+
+def medir_sonoridade(caminho):
+    """
+    Sonoridade integrada (LUFS, no estilo EBU R128), pico amostral e RMS (dBFS)
+    da faixa, em uma passada. O áudio é tratado em sub-blocos de 100 ms: a
+    ponderação K é aplicada no domínio da frequência de todos os sub-blocos de
+    uma vez, e os blocos de 400 ms com 75% de sobreposição saem da média de
+    quatro sub-blocos consecutivos, seguidos dos limiares absoluto e relativo.
+    """
+    taxa, canais, _ = sondar_formato(caminho)
+    passo = int(0.1 * taxa) // 2 * 2
+    pesos = pesos_k(taxa, passo)
+
+    energias = []  # Média quadrática ponderada por sub-bloco, somada entre canais
+    resto = np.zeros((0, canais), dtype=np.float32)
+    pico = 0.0
+    soma_quadrados = 0.0
+    quadros = 0
+    for bruto in iterar_pcm(caminho, taxa, canais):
+        bloco = np.frombuffer(bruto, dtype=np.int16).reshape(-1, canais).astype(np.float32) / 32768.0
+        quadros += len(bloco)
+        pico = max(pico, float(np.abs(bloco).max()))
+        soma_quadrados += float(np.einsum('ij,ij->', bloco, bloco, dtype=np.float64))
+
+        sinal = np.concatenate((resto, bloco))
+        completos = len(sinal) // passo * passo
+        resto = sinal[completos:]
+        if completos:
+            sub_blocos = sinal[:completos].reshape(-1, passo, canais)
+            espectro = np.fft.rfft(sub_blocos, axis=1)
+            energia = np.einsum('nkc,k->n', espectro.real ** 2 + espectro.imag ** 2, pesos)
+            energias.append(energia)
+    if not quadros:
+        return None
+
+    rms = np.sqrt(soma_quadrados / (quadros * canais))
+    resultado = {
+        'pico_db': 20 * np.log10(pico) if pico > 0 else -120.0,
+        'rms_db': 20 * np.log10(rms) if rms > 0 else -120.0,
+        'lufs': None,
+    }
+
+    energias = np.concatenate(energias) if energias else np.zeros(0)
+    if len(energias) >= 4:
+        blocos = np.convolve(energias, np.full(4, 0.25), mode='valid')
+        sonoridade_blocos = -0.691 + 10 * np.log10(np.maximum(blocos, 1e-12))
+        validos = blocos[sonoridade_blocos > LIMITE_ABSOLUTO_LUFS]
+        if len(validos):
+            relativo = -0.691 + 10 * np.log10(validos.mean()) + LIMITE_RELATIVO_LU
+            validos = validos[-0.691 + 10 * np.log10(validos) > relativo]
+            resultado['lufs'] = float(-0.691 + 10 * np.log10(validos.mean()))
+    resultado['pico_db'] = float(resultado['pico_db'])
+    resultado['rms_db'] = float(resultado['rms_db'])
+    return resultado
+
+
+class AnalisadorSonoridade(AnaliseEmLote):
+    """
+    Mede a sonoridade das faixas em lote e guarda o resultado por arquivo em
+    data/sonoridade.json. O AudioPlayer consulta ganho_db() ao carregar cada faixa.
+    """
+
+    analisar = staticmethod(medir_sonoridade)
+    nome = 'análise de sonoridade'
+
+    def __init__(self, arquivo=ARQUIVO_SONORIDADE, alvo_lufs=ALVO_LUFS, max_processos=None):
+        self.alvo_lufs = alvo_lufs
+        super().__init__(arquivo, max_processos=max_processos)
+
+    def ganho_db(self, caminho):
+        """Ganho para levar a faixa ao alvo sem passar do pico máximo; 0 se ela ainda não foi analisada."""
+        info = self.consultar(caminho)
+        if info is None or info.get('lufs') is None:
+            return 0.0
+        return min(self.alvo_lufs - info['lufs'], PICO_MAXIMO_DB - info['pico_db'])
@@ -9,6 +9,7 @@ import pathlib
 class UIComponents:
     def __init__(self, stdscr):
         self.stdscr = stdscr
+        self.area_forma_onda = None  # (linha, coluna inicial, largura) da mini forma de onda desenhada
 
     def desenhar_borda(self):
         self.stdscr.border()
@@ -227,11 +228,12 @@ class UIComponents:
             except curses.error:
                 pass 
             
-    def desenhar_status(self, nome_musica, progresso, duracao, y, x):
+    def desenhar_status(self, nome_musica, progresso, duracao, y, x, forma_onda=None):
         # A importação de formatar_tempo deve vir do ui_utils
         from ui_utils import formatar_tempo
 
         largura_disponivel = curses.COLS - x * 2
+        self.area_forma_onda = None
 
         # Linha do nome da música
         texto_musica = f"Tocando: {nome_musica if nome_musica else 'Nenhuma música'}"
@@ -255,6 +257,17 @@ class UIComponents:
 
             self.stdscr.addstr(y + 1, x, tempo_str)
             self.stdscr.clrtoeol() # Limpa o resto da linha
+
+            # Mini forma de onda ao lado do tempo: a parte já tocada fica destacada
+            largura_onda = largura_disponivel - len(tempo_str) - 2
+            if forma_onda is not None and largura_onda >= 10 and isinstance(progresso, (int, float)):
+                linha = forma_onda.linha(largura_onda)
+                total = duracao if isinstance(duracao, (int, float)) and duracao > 0 else forma_onda.duracao
+                tocado = int(largura_onda * min(1.0, progresso / total)) if total else 0
+                x_onda = x + len(tempo_str) + 2
+                self.stdscr.addstr(y + 1, x_onda, linha[:tocado], curses.color_pair(5))
+                self.stdscr.addstr(y + 1, x_onda + tocado, linha[tocado:], curses.A_DIM)
+                self.area_forma_onda = (y + 1, x_onda, largura_onda)
         except curses.error:
             pass
 
@@ -271,8 +284,8 @@ class UIComponents:
             pass
 
     def desenhar_menu_inferior(self, y, x):
-        menu_line1_base = "[1]Abrir [2]Play/Pause [3]Ant [4]Próx [+/-]Vol [C]Criar [A]Add [D]Rem [F]Fav"
-        menu_line2_base = "[S]Saltar [O]Ordenar [H]Histórico [L]Listar [B]Buscar [T]Filtrar [E]EQ [X]Stats [Q]Sair [R]Rádio [Y]YouTube [I]Navegar" # Adicionado [Y]YouTube
+        menu_line1_base = "[1]Abrir [2]Play/Pause [3]Ant [4]Próx [</>]±10s [+/-]Vol [C]Criar [A]Add [D]Rem [F]Fav"
+        menu_line2_base = "[S]Saltar [O]Ordenar [H]Histórico [L]Listar [B]Buscar [T]Filtrar [E]EQ [X]Stats [N]Normalizar [W]Crossfade [P]Perfil [G]Espectro [Q]Sair [R]Rádio [Y]YouTube [I]Navegar" # Adicionado [Y]YouTube
         
         largura_disponivel = curses.COLS - x - 2 
 
@@ -11,14 +11,20 @@ from ui_components import UIComponents
 from constants import PASTA_DADOS
 
 from audio import AudioPlayer
+from buffer_mixer import PERFIS_BUFFER
 from playlist import PlaylistManager
 from historico import Historico
 from biblioteca import Biblioteca
+from indice_biblioteca import IndiceBiblioteca
 from config_manager import ConfigManager
 from radio_terminal.radio import RadioPlayer
-from biblioteca import Musica
+from biblioteca import Musica, chave_ordenacao
 
 from youtube_integration import YouTubeIntegration
+from render_eq import ServicoRenderEQ
+from controle_eq import ControleEQ
+from forma_onda import ServicoFormaOnda
+from andamento import AnalisadorAndamento
 
 class UIPlayer:
     def __init__(self, stdscr):
@@ -26,21 +32,48 @@ class UIPlayer:
         self.player = AudioPlayer()
         self.playlist = PlaylistManager()
         self.historico = Historico()
-        self.biblioteca = Biblioteca()
+        self.biblioteca = Biblioteca(IndiceBiblioteca())
         self.config_manager = ConfigManager()
+        self.render_eq = ServicoRenderEQ()
+        try:
+            self.controle_eq = ControleEQ(self.player, self.render_eq, self.config_manager.get('modo_eq', 'tempo_real'))
+        except ValueError as e:
+            print(e)
+            self.controle_eq = ControleEQ(self.player, self.render_eq)
+        self.forma_onda = ServicoFormaOnda()
+        self.andamento = AnalisadorAndamento()
         self.radio_player_instance = None
 
         self.ui_components = UIComponents(stdscr)
 
         self.volume = self.player.get_volume()
+        self.player.set_normalizacao(self.config_manager.get('normalizar_volume', True))
+        try:
+            self.player.set_motor_reproducao(self.config_manager.get('motor_reproducao', self.player.motor_reproducao))
+        except ValueError as e:
+            print(e)
+        self.player.set_crossfade(self.config_manager.get('crossfade', 0))
+        try:
+            self.player.set_perfil_buffer(self.config_manager.get('perfil_audio', 'adaptativo'))
+        except ValueError as e:
+            print(e)
+        try:
+            self.player.set_modo_espectro(self.config_manager.get('modo_espectro', 'multirresolucao'))
+        except ValueError as e:
+            print(e)
+        self._transicao_iniciada_para = None  # Faixa cujo crossfade a UI já disparou
         self.playlist_selecionada = 0
         self.playlist_offset = 0
         self.executando = True
+        self.progresso_biblioteca = (0, 0)  # (faixas com metadados lidos, total) do último carregamento
+        self.progresso_varredura = None  # Último Varredura.progresso() do diretório sendo aberto
+        self._indice_tocando = None  # Posição na playlist da faixa entregue ao player
+        self._proxima_preparada = None  # (posição, caminho) da faixa pré-carregada depois dela
         self.espectro_atual = [0] * 20
         self.radio_ativo = False
         self.youtube_ativo = False
         self.youtube_carregando = False # Esta flag não será mais usada para exibir o loading na UI Curses
-        self.equalizacao = {'grave': 0, 'medio': 0, 'agudo': 0}
+        self.equalizacao = self.controle_eq.ganhos  # O mesmo dict: a tela de EQ altera, o controle aplica
         self.modo_visualizacao = 'lista'
         self.filtro_atual = None
         self.termo_busca_atual = ""
@@ -54,9 +87,13 @@ class UIPlayer:
         self.stdscr.nodelay(True)
         self.stdscr.keypad(True)
         curses.curs_set(0)
+        curses.mousemask(curses.BUTTON1_CLICKED | curses.BUTTON1_PRESSED)  # Clique na forma de onda busca
 
         self.playlist.playlist_atual = []
 
+        # Eventos do player chegam nas threads do despachante (e os do carregamento de pasta, na
+        # thread dele); a UI os trata no próprio loop
+        self.eventos_player = queue.Queue()
         self.player.add_observer(self)
 
         self.ui_message_queue = queue.Queue()
@@ -64,17 +101,35 @@ class UIPlayer:
 
 
     def atualizar(self, evento):
-        if evento == 'carregar_musica':
-            pass
-        elif evento == 'play_pause':
-            pass
-        elif evento == 'volume':
-            self.volume = self.player.get_volume()
-        elif evento == 'equalizacao':
-            pass
-        elif evento == 'musica_terminada':
-            if not self.radio_ativo and not self.youtube_ativo:
-                self.proxima()
+        """
+        Observador do AudioPlayer. Roda na thread de entrega do despachante, então
+        só enfileira o evento: quem mexe na playlist e dá comandos ao player é o
+        loop da UI, em _tratar_eventos_player.
+        """
+        self.eventos_player.put(evento)
+
+    def _tratar_eventos_player(self):
+        while True:
+            try:
+                evento = self.eventos_player.get_nowait()
+            except queue.Empty:
+                return
+            if evento == 'volume':
+                self.volume = self.player.get_volume()
+            elif evento == 'musica_terminada':
+                if not self.radio_ativo and not self.youtube_ativo:
+                    self.proxima()
+            elif evento == 'proxima_faixa':
+                self._faixa_preparada_iniciou()
+            elif evento == 'primeira_faixa_encontrada':
+                # Enfileirado por _load_directory_and_play_first_threaded, não pelo player
+                self.playlist_selecionada = 0
+                self.playlist_offset = 0
+                self._tocar_selecionada()
+            elif evento == 'diretorio_varrido':
+                self._preparar_proxima()
+            elif evento == 'biblioteca_carregada':
+                self._analisar_playlist_em_segundo_plano()
 
     def _display_ui_message(self, message):
         """Enfileira uma mensagem para ser mostrada na UI. Lida com mensagens longas."""
@@ -103,7 +158,7 @@ class UIPlayer:
         self.stdscr.clear()
 
         max_linhas_opcoes = curses.LINES - 5
-        opcoes = ["1 - Artista", "2 - Álbum", "3 - Gênero", "4 - Limpar filtro"]
+        opcoes = ["1 - Artista", "2 - Álbum", "3 - Gênero", "4 - BPM (faixa)", "5 - Limpar filtro"]
 
         try:
             self.stdscr.addstr(0, 2, "Filtrar por:", curses.color_pair(1) | curses.A_BOLD)
@@ -122,6 +177,8 @@ class UIPlayer:
             elif key == ord('3'):
                 self._filtrar_por('genero')
             elif key == ord('4'):
+                self._filtrar_por_bpm()
+            elif key == ord('5'):
                 self.filtro_atual = None
                 self.playlist.playlist_atual = [m.caminho for m in self.biblioteca.musicas]
                 self.playlist_selecionada = 0
@@ -134,6 +191,24 @@ class UIPlayer:
 
         self.stdscr.nodelay(True)
 
+    def _filtrar_por_bpm(self):
+        entrada = self.ui_components.solicitar_entrada_em_janela("BPM mínimo-máximo (ex.: 120-130):")
+        try:
+            minimo, _, maximo = entrada.partition('-')
+            minimo = float(minimo) if minimo.strip() else None
+            maximo = float(maximo) if maximo.strip() else minimo
+        except ValueError:
+            self._display_ui_message("Faixa de BPM inválida! Pressione qualquer tecla...")
+            return
+        resultados = self.biblioteca.filtrar_intervalo('bpm', minimo, maximo)
+        if not resultados:
+            self._display_ui_message("Nenhuma música nessa faixa de BPM (a análise pode estar em andamento).")
+            return
+        self.filtro_atual = ('bpm', entrada)
+        self.playlist.playlist_atual = [m.caminho for m in sorted(resultados, key=lambda m: m.metadados['bpm'])]
+        self.playlist_selecionada = 0
+        self.playlist_offset = 0
+
     def _filtrar_por(self, categoria):
         grupos = self.biblioteca.listar_por(categoria)
         opcoes = list(grupos.keys())
@@ -186,32 +261,13 @@ class UIPlayer:
                 self.playlist_offset = 0
                 break
 
-    def _pre_processar_audio_com_eq(self, caminho_original):
-        import tempfile
-        from pydub import AudioSegment
-        import numpy as np
-
-        try:
-            audio = AudioSegment.from_file(caminho_original)
-            samples = audio.get_array_of_samples()
-            arr = np.array(samples).astype(np.float32)
-
-            if audio.channels == 2:
-                left = arr[0::2]
-                right = arr[1::2]
-                arr_eq = arr
-            else:
-                arr_eq = arr
-
-            arr_eq = np.clip(arr_eq, -32768, 32767).astype(np.int16)
-            audio_eq = audio._spawn(arr_eq.tobytes())
-
-            temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            audio_eq.export(temp_file.name, format='wav')
-
-            return temp_file.name
-        except Exception as e:
-            return caminho_original
+    def _proximas_faixas(self, quantidade=3):
+        """A faixa que está tocando e as `quantidade` seguintes da playlist, para renderizar a EQ adiante."""
+        if not self.playlist.playlist_atual:
+            return []
+        total = len(self.playlist.playlist_atual)
+        inicio = self._indice_tocando if self._indice_tocando is not None else self.playlist_selecionada
+        return [self.playlist.playlist_atual[(inicio + i) % total] for i in range(min(quantidade + 1, total))]
 
     def controlar_equalizacao(self):
         self.stdscr.clear()
@@ -220,7 +276,9 @@ class UIPlayer:
         while True:
             self.stdscr.clear()
             try:
-                self.stdscr.addstr(0, 2, "Equalização (↑↓ para navegar, ←→ para ajustar, Q para sair)", curses.color_pair(1) | curses.A_BOLD)
+                self.stdscr.addstr(0, 2, "Equalização (↑↓ para navegar, ←→ para ajustar, M para modo, Q para sair)", curses.color_pair(1) | curses.A_BOLD)
+                modo = "pré-renderizada" if self.controle_eq.modo == 'pre_render' else "tempo real"
+                self.stdscr.addstr(1, 2, f"Modo: {modo}")
                 for i, controle in enumerate(controles):
                     valor = self.equalizacao[controle]
                     barra = self.ui_components.criar_barra_eq(valor)
@@ -243,6 +301,10 @@ class UIPlayer:
             key = self.stdscr.getch()
             if key in (ord('q'), ord('Q')):
                 break
+            elif key in (ord('m'), ord('M')):
+                novo_modo = 'tempo_real' if self.controle_eq.modo == 'pre_render' else 'pre_render'
+                self.config_manager.set('modo_eq', novo_modo)
+                self.controle_eq.definir_modo(novo_modo, self._proximas_faixas())
             elif key == curses.KEY_UP and idx > 0:
                 idx -= 1
             elif key == curses.KEY_DOWN and idx < len(controles) - 1:
@@ -250,19 +312,14 @@ class UIPlayer:
             elif key == curses.KEY_LEFT:
                 controle = controles[idx]
                 self.equalizacao[controle] = max(-10, self.equalizacao[controle] - 0.5)
-                self.player.set_equalizacao(
-                    self.equalizacao['grave'],
-                    self.equalizacao['medio'],
-                    self.equalizacao['agudo']
-                )
+                self._aplicar_equalizacao()
             elif key == curses.KEY_RIGHT:
                 controle = controles[idx]
                 self.equalizacao[controle] = min(10, self.equalizacao[controle] + 0.5)
-                self.player.set_equalizacao(
-                    self.equalizacao['grave'],
-                    self.equalizacao['medio'],
-                    self.equalizacao['agudo']
-                )
+                self._aplicar_equalizacao()
+
+    def _aplicar_equalizacao(self):
+        self.controle_eq.aplicar(self._proximas_faixas())
 
     def mostrar_estatisticas(self):
         self.stdscr.nodelay(False)
@@ -310,13 +367,44 @@ class UIPlayer:
                     if y_offset < curses.LINES - 2:
                         self.stdscr.addstr(y_offset, 4, f"Playlists: {len(self.playlist.playlists)}")
                         y_offset += 1
+                    analisadas, total = self.player.sonoridade.progresso()
+                    if total and y_offset < curses.LINES - 2:
+                        self.stdscr.addstr(y_offset, 4, f"Análise de volume: {analisadas}/{total} faixas")
+                        y_offset += 1
+                    if self.player.musica_atual and y_offset < curses.LINES - 2:
+                        self.stdscr.addstr(y_offset, 4, f"Ganho da faixa atual: {self.player.ganho_faixa_db:+.1f} dB")
+                        y_offset += 1
+                    for nome, m in self.player.get_metricas_eventos().items():
+                        if y_offset >= curses.LINES - 2:
+                            break
+                        self.stdscr.addstr(y_offset, 4, f"Eventos ({nome}): {m['entregues']} entregues, "
+                                                        f"{m['descartados']} descartados, atraso máx {m['atraso_max_ms']:.0f} ms")
+                        y_offset += 1
+                    buffer = self.player.get_estatisticas_buffer()
+                    if y_offset < curses.LINES - 2:
+                        self.stdscr.addstr(y_offset, 4, f"Buffer do mixer ({buffer['perfil']}): {buffer['tamanho_buffer']} quadros "
+                                                        f"({buffer['latencia_buffer_ms']:.0f} ms), {buffer['subexecucoes']} subexecuções, "
+                                                        f"{buffer['atrasos']} atrasos")
+                        y_offset += 1
+                    if y_offset < curses.LINES - 2:
+                        self.stdscr.addstr(y_offset, 4, f"Latência de comandos (fila + buffer): {buffer['latencia_comando_ms']:.0f} ms")
+                        y_offset += 1
+                    fluxo = self.player.get_estatisticas_fluxo()
+                    if fluxo and y_offset < curses.LINES - 2:
+                        recarga = fluxo['latencia_recarga_media_ms']
+                        self.stdscr.addstr(y_offset, 4, f"Fluxo: {fluxo['blocos_na_fila']} blocos na fila, {fluxo['paradas']} paradas "
+                                                        f"({fluxo['tempo_parado_ms']:.0f} ms), recarga média "
+                                                        f"{'-' if recarga is None else f'{recarga:.0f} ms'}")
+                        y_offset += 1
 
                     if self.biblioteca.musicas and y_offset < curses.LINES - 2:
                         y_offset += 2
                         self.stdscr.addstr(y_offset, 2, "Biblioteca:", curses.color_pair(3) | curses.A_BOLD)
                         y_offset += 1
                         if y_offset < curses.LINES - 2:
-                            self.stdscr.addstr(y_offset, 4, f"Total de músicas: {len(self.biblioteca.musicas)}")
+                            feitas, total = self.progresso_biblioteca
+                            lendo = f" (lendo tags: {feitas}/{total})" if feitas < total else ""
+                            self.stdscr.addstr(y_offset, 4, f"Total de músicas: {len(self.biblioteca.musicas)}{lendo}")
                             y_offset += 1
 
                         generos = self.biblioteca.listar_por('genero')
@@ -379,15 +467,48 @@ class UIPlayer:
             )
 
     def _load_directory_and_play_first_threaded(self, caminho):
-        self.biblioteca.carregar_diretorio(caminho)
-        self.playlist.carregar_diretorio(caminho)
-        if self.playlist.playlist_atual:
-            self.playlist_selecionada = 0
-            self.playlist_offset = 0
-            self._tocar_selecionada()
-
-        self._display_ui_message(f"Diretório '{caminho}' carregado! Pressione qualquer tecla...")
-
+        def ao_encontrar(faixa):
+            if faixa == self.playlist.playlist_atual[0]:
+                # Quem toca é o loop da UI; a varredura e a leitura das tags continuam nesta thread
+                self.eventos_player.put('primeira_faixa_encontrada')
+
+        self.progresso_varredura = None
+        stats = {}
+        faixas = self.playlist.carregar_diretorio(caminho, ao_encontrar=ao_encontrar,
+                                                  ao_progredir=self._ao_progredir_varredura, stats=stats)
+        if faixas:
+            self.eventos_player.put('diretorio_varrido')
+            # A biblioteca lê as tags das faixas que a playlist já encontrou, sem varrer a pasta de novo
+            self.biblioteca.carregar_faixas(caminho, faixas, ao_lote=self._ao_lote_biblioteca, stats=stats)
+            # As análises aplicam seus valores às músicas da biblioteca: só depois de ela estar carregada
+            self.eventos_player.put('biblioteca_carregada')
+
+        progresso = self.progresso_varredura or {}
+        self._display_ui_message(f"Diretório '{caminho}' carregado: {len(faixas)} faixas em "
+                                 f"{progresso.get('pastas', 0)} pastas. Pressione qualquer tecla...")
+
+    def _ao_progredir_varredura(self, progresso):
+        self.progresso_varredura = progresso
+
+    def _ao_lote_biblioteca(self, novas, feitas, total):
+        # A biblioteca já expõe as músicas lidas até aqui; só o progresso é guardado para a tela
+        self.progresso_biblioteca = (feitas, total)
+
+    def _analisar_playlist_em_segundo_plano(self):
+        """Sonda as faixas da playlist (trocas sem ler tags) e roda as análises e formas de onda que faltam."""
+        caminhos = list(self.playlist.playlist_atual)
+        threading.Thread(target=self.player.sonda.sondar_lote, args=(caminhos,), daemon=True).start()
+        # Sonoridade e andamento em sequência, cada um com o próprio pool: junto com o das
+        # formas de onda, no máximo dois pools de meia CPU rodam ao mesmo tempo
+        threading.Thread(target=self._analisar_sonoridade_e_andamento, args=(caminhos,), daemon=True).start()
+        self.forma_onda.gerar_lote(caminhos)
+
+    def _analisar_sonoridade_e_andamento(self, caminhos):
+        # Valores de andamento já calculados em sessões anteriores entram de imediato; o resto quando a análise terminar
+        self.biblioteca.aplicar_analise(self.andamento)
+        self.player.sonoridade.analisar_lote(caminhos)
+        if self.andamento.analisar_lote(caminhos):
+            self.biblioteca.aplicar_analise(self.andamento)
 
     def abrir_navegador_arquivos(self):
         self.stdscr.nodelay(False)
@@ -536,6 +657,7 @@ class UIPlayer:
             self.playlist_selecionada = 0
             self.playlist_offset = 0
             self._tocar_selecionada()
+            self._analisar_playlist_em_segundo_plano()
 
         self._display_ui_message(f"Tocando: {os.path.basename(selected_file_path)}")
 
@@ -682,7 +804,8 @@ class UIPlayer:
             "4 - Álbum",
             "5 - Título",
             "6 - Gênero",
-            "7 - Data de adição"
+            "7 - Data de adição",
+            "8 - BPM"
         ]
 
         max_opcoes_visiveis = curses.LINES - 5
@@ -711,6 +834,8 @@ class UIPlayer:
                 self._ordenar_por_metadado('genero')
             elif key == ord('7'):
                 pass
+            elif key == ord('8'):
+                self._ordenar_por_metadado('bpm')
             else:
                 self._display_ui_message("Opção inválida! Pressione qualquer tecla...")
                 self.stdscr.nodelay(True)
@@ -725,9 +850,16 @@ class UIPlayer:
         self.stdscr.nodelay(True)
 
     def _ordenar_por_metadado(self, metadado):
-        self.playlist.playlist_atual.sort(
-            key=lambda x: Musica(x).metadados.get(metadado, '').lower()
-        )
+        por_caminho = {m.caminho: m for m in self.biblioteca.musicas}
+
+        def valor(caminho):
+            musica = por_caminho.get(caminho)
+            if musica is None:
+                musica = Musica(caminho)
+                musica.metadados.update(self.andamento.metadados(caminho))
+            return chave_ordenacao(musica.metadados.get(metadado))
+
+        self.playlist.playlist_atual.sort(key=valor)
         self.playlist.salvar_estado()
 
     def _ordenar_por_duracao(self):
@@ -760,19 +892,57 @@ class UIPlayer:
     def _tocar_selecionada(self):
         if self.playlist.playlist_atual:
             musica = self.playlist.playlist_atual[self.playlist_selecionada]
-            self.player.carregar_musica(musica)
+            self._indice_tocando = self.playlist_selecionada
+            self._proxima_preparada = None
+            self.player.carregar_musica(self.controle_eq.tocar(musica))
             self.player.play()
             self.historico.adicionar(musica)
+            self._preparar_proxima()
+            self.controle_eq.renderizar_a_frente(self._proximas_faixas())
 
-            itens_por_coluna_real = self.ui_components.calcular_itens_por_coluna_playlist()
-            if itens_por_coluna_real > 0:
-                self.playlist_offset = self.playlist_selecionada // itens_por_coluna_real
-            else:
-                self.playlist_offset = 0
+            self._ajustar_offset_playlist()
             self._display_ui_message(f"Tocando: {os.path.basename(musica)}")
         else:
             self._display_ui_message("Nenhuma música na playlist para tocar.")
 
+    def _ajustar_offset_playlist(self):
+        itens_por_coluna_real = self.ui_components.calcular_itens_por_coluna_playlist()
+        if itens_por_coluna_real > 0:
+            self.playlist_offset = self.playlist_selecionada // itens_por_coluna_real
+        else:
+            self.playlist_offset = 0
+
+    def _preparar_proxima(self):
+        """Pede ao player para pré-carregar a próxima faixa da playlist (troca sem intervalo)."""
+        if len(self.playlist.playlist_atual) > 1 and self._indice_tocando is not None:
+            # A seguinte é a da faixa que está tocando, não a do cursor, que o usuário pode ter movido
+            indice = (self._indice_tocando + 1) % len(self.playlist.playlist_atual)
+            musica = self.playlist.playlist_atual[indice]
+            self._proxima_preparada = (indice, musica)
+            self.player.preparar_proxima(self.controle_eq.preparar(musica))
+
+    def _faixa_preparada_iniciou(self):
+        """O player já passou sozinho para a faixa pré-carregada; só sincroniza a UI com ela."""
+        if not self.playlist.playlist_atual or self._proxima_preparada is None:
+            return
+        indice, musica = self._proxima_preparada
+        self._proxima_preparada = None
+        faixas = self.playlist.playlist_atual
+        if indice >= len(faixas) or faixas[indice] != musica:
+            # A playlist mudou depois do pré-carregamento (ordenada, faixa removida...)
+            indice = faixas.index(musica) if musica in faixas else None
+        if indice is not None:
+            self._indice_tocando = self.playlist_selecionada = indice
+        self.controle_eq.proxima_iniciou()
+        self.historico.adicionar(musica)
+        self._preparar_proxima()
+        self._ajustar_offset_playlist()
+        intervalo = self.player.get_intervalo_ultima_troca()
+        if intervalo is not None:
+            self._display_ui_message(f"Tocando: {os.path.basename(musica)} (troca em {intervalo:.0f} ms)")
+        else:
+            self._display_ui_message(f"Tocando: {os.path.basename(musica)}")
+
     def aumentar_volume(self):
         vol_novo = min(1.0, self.player.get_volume() + 0.05)
         self.player.setar_volume(vol_novo)
@@ -781,6 +951,61 @@ class UIPlayer:
         vol_novo = max(0.0, self.player.get_volume() - 0.05)
         self.player.setar_volume(vol_novo)
 
+    def adiantar(self, segundos=10):
+        if self.player.musica_atual:
+            self.player.avancar(segundos)
+
+    def retroceder(self, segundos=10):
+        if self.player.musica_atual:
+            self.player.avancar(-segundos)
+
+    def alternar_normalizacao(self):
+        ativa = not self.player.normalizacao
+        self.player.set_normalizacao(ativa)
+        self.config_manager.set('normalizar_volume', ativa)
+        self._display_ui_message(f"Normalização de volume {'ligada' if ativa else 'desligada'}")
+
+    def alternar_crossfade(self):
+        """Percorre 0, 2, 4, ..., 12 segundos de crossfade."""
+        segundos = (int(self.player.crossfade) // 2 * 2 + 2) % 14
+        self.player.set_crossfade(segundos)
+        self.config_manager.set('crossfade', segundos)
+        if segundos:
+            self._display_ui_message(f"Crossfade: {segundos} s")
+        else:
+            self._display_ui_message("Crossfade desligado")
+
+    def alternar_perfil_buffer(self):
+        """Percorre os perfis do buffer do mixer: adaptativo, low_latency, low_cpu."""
+        perfis = list(PERFIS_BUFFER)
+        perfil = perfis[(perfis.index(self.player.buffer_mixer.perfil) + 1) % len(perfis)]
+        self.player.set_perfil_buffer(perfil)
+        self.config_manager.set('perfil_audio', perfil)
+        self._display_ui_message(f"Perfil de áudio: {perfil} (vale a partir da próxima música)")
+
+    def alternar_modo_espectro(self):
+        """Alterna o espectro entre barras multirresolução (logarítmicas) e a FFT única."""
+        modo = 'fft' if self.player.modo_espectro == 'multirresolucao' else 'multirresolucao'
+        self.player.set_modo_espectro(modo)
+        self.config_manager.set('modo_espectro', modo)
+        self._display_ui_message(f"Espectro: {modo}")
+
+    def _crossfade_pendente(self):
+        """
+        Perto do fim da faixa e sem a próxima já na fila do motor (pré-decodificação
+        ainda em andamento, por exemplo): a troca tem de começar agora para que a
+        sobreposição aconteça antes do fim, e não depois dele.
+        """
+        crossfade = self.player.crossfade
+        duracao = self.player.get_duracao()
+        atual = self.player.musica_atual
+        return (crossfade > 0 and duracao > crossfade and
+                self.player.is_playing() and
+                not self.player.pausado and
+                self._transicao_iniciada_para != atual and
+                self.player.get_progresso() >= duracao - crossfade and
+                not self.player.transicao_agendada())
+
     def mostrar_historico(self):
         self.stdscr.clear()
 
@@ -1070,14 +1295,19 @@ class UIPlayer:
             self.player.get_nome(),
             self.player.get_progresso(),
             self.player.get_duracao(),
-            y=status_y, x=2
+            y=status_y, x=2,
+            forma_onda=self.forma_onda.obter(self.player.musica_atual) if self.player.musica_atual else None
         )
 
         try:
             message = self.ui_message_queue.get_nowait()
             self.ui_components.mostrar_mensagem(message, curses.LINES - 3)
         except queue.Empty:
-            pass
+            varredura = self.progresso_varredura
+            if varredura and not varredura['concluida']:
+                self.ui_components.mostrar_mensagem(
+                    f"Varrendo: {varredura['pastas']} pastas, {varredura['musicas']} faixas "
+                    f"({varredura['arquivos_por_segundo']:.0f} arquivos/s)", curses.LINES - 3)
 
         self.ui_components.desenhar_menu_inferior(menu_y, 2)
         self.stdscr.refresh()
@@ -1085,6 +1315,7 @@ class UIPlayer:
     def loop(self):
         while self.executando:
             self.player.check_events()
+            self._tratar_eventos_player()
 
             # A reprodução automática da próxima música só deve ocorrer se não estivermos no modo rádio/youtube
             if (not self.radio_ativo and
@@ -1096,6 +1327,9 @@ class UIPlayer:
                 not self.musica_pausada_para_radio and
                 not self.musica_pausada_para_youtube):
                 self.proxima()
+            elif not self.radio_ativo and not self.youtube_ativo and self._crossfade_pendente():
+                self._transicao_iniciada_para = self.player.musica_atual
+                self.proxima()
 
 
             current_lines = curses.LINES
@@ -1264,6 +1498,10 @@ class UIPlayer:
                 self.anterior()
             elif key in (ord('4'), ):
                 self.proxima()
+            elif key in (ord(','), ord('<')):
+                self.retroceder()
+            elif key in (ord('.'), ord('>')):
+                self.adiantar()
             elif key in (ord('='), ord('+'), ):
                 self.aumentar_volume()
             elif key in (ord('-'), ):
@@ -1276,18 +1514,50 @@ class UIPlayer:
                 self.controlar_equalizacao()
             elif key in (ord('x'), ord('X')):
                 self.mostrar_estatisticas()
+            elif key in (ord('n'), ord('N')):
+                self.alternar_normalizacao()
+            elif key in (ord('w'), ord('W')):
+                self.alternar_crossfade()
+            elif key in (ord('p'), ord('P')):
+                self.alternar_perfil_buffer()
+            elif key in (ord('g'), ord('G')):
+                self.alternar_modo_espectro()
             elif key == ord('i') or key == ord('I'):
                 self.abrir_navegador_arquivos()
+            elif key == curses.KEY_MOUSE:
+                self._buscar_pelo_clique()
 
             # Pequeno delay no loop para evitar consumo excessivo de CPU.
             # Este sleep é mais importante quando a UI Curses está desativada.
             time.sleep(0.02)
 
+    def _buscar_pelo_clique(self):
+        """Clique na mini forma de onda: salta para o ponto correspondente da faixa."""
+        try:
+            _, coluna, linha, _, _ = curses.getmouse()
+        except curses.error:
+            return
+        area = self.ui_components.area_forma_onda
+        if area is None or not self.player.musica_atual:
+            return
+        linha_onda, x_onda, largura = area
+        if linha != linha_onda or not x_onda <= coluna < x_onda + largura:
+            return
+        forma = self.forma_onda.obter(self.player.musica_atual)
+        if forma is not None:
+            self.player.seek(forma.coluna_para_segundos(coluna - x_onda, largura))
+
     def __del__(self):
         if hasattr(self, 'player') and self.player is not None:
             self.player.quit()
         if hasattr(self, 'youtube_integration'):
             self.youtube_integration.stop_player()
+        if hasattr(self, 'controle_eq'):
+            self.controle_eq.encerrar()
+        if hasattr(self, 'render_eq'):
+            self.render_eq.encerrar()
+        if hasattr(self, 'forma_onda'):
+            self.forma_onda.encerrar()
 
 
 def main(stdscr):
@@ -1,4 +1,69 @@
+# utils.py
+import os
+import shutil
+
+
 def formatar_tempo(segundos):
     minutos = int(segundos) // 60
     segundos_restantes = int(segundos) % 60
     return f"{minutos:02d}:{segundos_restantes:02d}"
+
+def processos_em_segundo_plano():
+    """
+    Processos de cada pool de análise em segundo plano: metade dos núcleos, para
+    que os pools que rodam juntos ao abrir uma pasta não disputem a CPU com as
+    threads de áudio.
+    """
+    return max(1, (os.cpu_count() or 2) // 2)
+
+def _contem(item, caminho):
+    item = os.path.abspath(item)
+    return caminho == item or caminho.startswith(os.path.join(item, ''))
+
+def aplicar_cota_lru(pasta, cota_bytes, em_uso=()):
+    """
+    Mantém o tamanho de uma pasta de cache abaixo de `cota_bytes`, removendo
+    primeiro as entradas usadas há mais tempo. Uma entrada é um subdiretório
+    ou o conjunto de arquivos com o mesmo nome base (ex.: 'abc.pcm' + 'abc.json');
+    o uso é medido pelo mtime mais recente dos seus arquivos. Entradas que
+    contêm um dos caminhos de `em_uso` (ex.: a faixa tocando) nunca são removidas.
+    """
+    protegidos = {os.path.abspath(c) for c in em_uso}
+    entradas = {}
+    try:
+        nomes = os.listdir(pasta)
+    except OSError:
+        return
+    for nome in nomes:
+        caminho = os.path.join(pasta, nome)
+        try:
+            if os.path.isdir(caminho):
+                arquivos = [os.path.join(caminho, f) for f in os.listdir(caminho)]
+                base = nome
+            else:
+                arquivos = [caminho]
+                base = nome.split('.', 1)[0]
+            for arquivo in arquivos:
+                st = os.stat(arquivo)
+                uso, tamanho, itens = entradas.get(base, (0, 0, set()))
+                itens.add(caminho)
+                entradas[base] = (max(uso, st.st_mtime), tamanho + st.st_size, itens)
+        except OSError:
+            continue
+
+    total = sum(tamanho for _, tamanho, _ in entradas.values())
+    for uso, tamanho, itens in sorted(entradas.values(), key=lambda e: e[0]):
+        if total <= cota_bytes:
+            break
+        if any(_contem(item, protegido) for item in itens for protegido in protegidos):
+            continue
+        try:
+            for item in itens:
+                if os.path.isdir(item):
+                    shutil.rmtree(item)
+                else:
+                    os.remove(item)
+            total -= tamanho
+        except OSError:
+            # Em uso (ex.: memmap aberto no Windows); tenta de novo na próxima vez
+            pass
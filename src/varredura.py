@@ -0,0 +1,123 @@
+# varredura.py
+import os
+import time
+
+EXTENSOES_MUSICA = ('.mp3', '.wav', '.flac', '.ogg')
+INTERVALO_PROGRESSO = 0.1  # Segundos entre dois eventos de progresso
+
+
+class Varredura:
+    """
+    Varredura recursiva de uma pasta com os.scandir, em profundidade e com as
+    entradas de cada pasta em ordem alfabética (arquivos antes das subpastas).
+    Iterar sobre ela devolve os os.DirEntry dos arquivos com uma das `extensoes`
+    à medida que são encontrados: quem consome pode mostrar as primeiras faixas
+    antes de a árvore inteira ser percorrida, e entry.stat() reaproveita o que o
+    scandir já trouxe (no Windows, sem nenhuma chamada extra ao sistema).
+
+    `profundidade`: None percorre tudo; 0 só a própria pasta; n desce até n
+    níveis de subpastas. `seguir_links`: entra em links simbólicos para pastas,
+    sem repetir uma pasta já visitada (evita ciclos). `ao_progredir(progresso)`
+    recebe o dict de progresso() no máximo a cada INTERVALO_PROGRESSO segundos
+    e uma última vez ao terminar.
+
+    Uma pasta que não pode ser lida é contada em 'erros' e pulada; se for a
+    própria raiz, o OSError chega a quem está iterando.
+    """
+
+    def __init__(self, raiz, extensoes=EXTENSOES_MUSICA, profundidade=None, seguir_links=False,
+                 ao_progredir=None, intervalo=INTERVALO_PROGRESSO):
+        self.raiz = raiz
+        self.extensoes = tuple(e.lower() for e in extensoes)
+        self.profundidade = profundidade
+        self.seguir_links = seguir_links
+        self.ao_progredir = ao_progredir
+        self.intervalo = intervalo
+        self.pastas = 0
+        self.arquivos = 0  # Todos os arquivos vistos, com ou sem extensão de áudio
+        self.musicas = 0
+        self.erros = 0
+        self.concluida = False
+        self._inicio = None
+        self._ultimo_evento = 0.0
+
+    def __iter__(self):
+        self._inicio = self._ultimo_evento = time.perf_counter()
+        visitadas = {self._identidade(self.raiz)} if self.seguir_links else set()
+        pilha = [(self.raiz, 0)]
+        while pilha:
+            pasta, nivel = pilha.pop()
+            try:
+                with os.scandir(pasta) as it:
+                    entradas = sorted(it, key=lambda e: e.name)
+            except OSError:
+                if pasta == self.raiz:
+                    raise
+                self.erros += 1
+                continue
+            self.pastas += 1
+
+            subpastas = []
+            for entrada in entradas:
+                try:
+                    if entrada.is_dir(follow_symlinks=self.seguir_links):
+                        if self.profundidade is None or nivel < self.profundidade:
+                            subpastas.append(entrada)
+                        continue
+                    if not entrada.is_file():
+                        continue
+                except OSError:
+                    self.erros += 1
+                    continue
+                self.arquivos += 1
+                if os.path.splitext(entrada.name)[1].lower() in self.extensoes:
+                    self.musicas += 1
+                    yield entrada
+                self._notificar()
+
+            # Pilha: empilhadas ao contrário para sair em ordem alfabética
+            for entrada in reversed(subpastas):
+                if self.seguir_links:
+                    # Com links, a mesma pasta pode aparecer por mais de um caminho
+                    identidade = self._identidade(entrada.path)
+                    if identidade is None or identidade in visitadas:
+                        continue
+                    visitadas.add(identidade)
+                pilha.append((entrada.path, nivel + 1))
+            self._notificar()
+
+        self.concluida = True
+        self._notificar(forcar=True)
+
+    @staticmethod
+    def _identidade(pasta):
+        try:
+            st = os.stat(pasta)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino
+
+    def _notificar(self, forcar=False):
+        if self.ao_progredir is None:
+            return
+        agora = time.perf_counter()
+        if forcar or agora - self._ultimo_evento >= self.intervalo:
+            self._ultimo_evento = agora
+            self.ao_progredir(self.progresso())
+
+    def progresso(self):
+        segundos = time.perf_counter() - self._inicio if self._inicio is not None else 0.0
+        return {
+            'pastas': self.pastas,
+            'arquivos': self.arquivos,
+            'musicas': self.musicas,
+            'erros': self.erros,
+            'segundos': segundos,
+            'arquivos_por_segundo': self.arquivos / segundos if segundos > 0 else 0.0,
+            'concluida': self.concluida,
+        }
+
+
+def varrer(raiz, extensoes=EXTENSOES_MUSICA, profundidade=None, seguir_links=False, ao_progredir=None):
+    """Atalho para iterar uma Varredura: gera os os.DirEntry dos arquivos encontrados."""
+    return iter(Varredura(raiz, extensoes, profundidade, seguir_links, ao_progredir))
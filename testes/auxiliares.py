@@ -0,0 +1,15 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from saida_audio import SaidaNula
+from audio import AudioPlayer
+
+
+def reiniciar_player_sem_dispositivo():
+    """
+    Troca o AudioPlayer criado por um teste por um na SaidaNula, para o próximo
+    teste não herdar o estado dele. Não usa AudioPlayer() direto porque isso
+    abriria o mixer, e os testes rodam sem dispositivo de som.
+    """
+    AudioPlayer.reiniciar(SaidaNula())
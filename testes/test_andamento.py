@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+import tempfile
+import wave
+import numpy as np
+from andamento import analisar_andamento, AnalisadorAndamento
+
+
+def gravar_cliques(caminho, bpm, segundos=20, taxa=44100):
+    rng = np.random.default_rng(0)
+    sinal = 0.01 * rng.standard_normal(taxa * segundos)
+    decaimento = np.exp(-np.arange(400) / 80)
+    for inicio in np.arange(0, segundos - 1, 60 / bpm):
+        i = int(inicio * taxa)
+        sinal[i:i + 400] += 0.8 * rng.standard_normal(400) * decaimento
+    with wave.open(caminho, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(taxa)
+        f.writeframes((np.clip(sinal, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+class TestAndamento(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, 'cliques.wav')
+        gravar_cliques(self.caminho, 128)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_bpm_e_densidade(self):
+        resultado = analisar_andamento(self.caminho)
+        self.assertAlmostEqual(resultado['bpm'], 128, delta=1.5)
+        self.assertAlmostEqual(resultado['densidade_onsets'], 128 / 60, delta=0.3)
+
+    def test_checkpoint_e_metadados(self):
+        arquivo = os.path.join(self.pasta.name, 'andamento.json')
+        self.assertEqual(AnalisadorAndamento(arquivo, max_processos=1).analisar_lote([self.caminho]), 1)
+        # Uma nova instância (como após reiniciar o player) retoma do que já foi gravado
+        analisador = AnalisadorAndamento(arquivo, max_processos=1)
+        self.assertEqual(analisador.analisar_lote([self.caminho]), 0)
+        self.assertEqual(set(analisador.metadados(self.caminho)), {'bpm', 'densidade_onsets'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,12 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
+import time
 import unittest
-from audio import AudioPlayer
+import numpy as np
+from audio import AudioPlayer, _plano_bandas
+from motor_buffer import MotorBuffer
+from saida_audio import SaidaNula
 
 class TestAudioPlayer(unittest.TestCase):
     def setUp(self):
@@ -14,8 +18,60 @@ class TestAudioPlayer(unittest.TestCase):
         self.assertAlmostEqual(self.player.get_volume(), 0.7, places=1)
 
     def test_carregar_musica_invalida(self):
-        resultado = self.player.carregar_musica("arquivo_inexistente.mp3")
+        resultado = self.player.carregar_musica("arquivo_inexistente.mp3").result(timeout=5)
         self.assertFalse(resultado)
 
+
+def _bandas_por_laco(fft_data, num_bands, taxa):
+    """O cálculo antigo, banda por banda, como referência para a versão vetorizada."""
+    freqs = np.fft.rfftfreq(2 * (len(fft_data) - 1), 1 / taxa)
+    log_steps = np.log10(np.linspace(20, 20000, num_bands + 1))
+    bands_output = np.zeros(num_bands)
+    for i in range(num_bands):
+        indices = np.where((freqs >= 10 ** log_steps[i]) & (freqs < 10 ** log_steps[i + 1]))[0]
+        bands_output[i] = np.sum(fft_data[indices])
+        if 250 <= 10 ** ((log_steps[i] + log_steps[i + 1]) / 2) <= 4000:
+            bands_output[i] *= 1.5
+    return bands_output
+
+
+class TestEspectroBandas(unittest.TestCase):
+    def test_espectro_bandas_vetorizado(self):
+        self.assertIs(_plano_bandas(2049, 44100, 40), _plano_bandas(2049, 44100, 40))
+        fft = np.abs(np.random.default_rng(0).normal(size=2049))
+        for num_bandas, taxa in ((40, 44100), (20, 48000), (7, 22050)):
+            np.testing.assert_allclose(AudioPlayer._get_spectrum_bands(fft, num_bandas, taxa),
+                                       _bandas_por_laco(fft, num_bandas, taxa))
+
+
+class TestCrossfade(unittest.TestCase):
+    def test_crossfade_sobrepoe_faixas(self):
+        saida = SaidaNula(velocidade=20, gravar=True)
+        motor = MotorBuffer(saida=saida)
+        try:
+            taxa = motor.frame_rate
+            motor.duracao_crossfade = 1.0
+            motor.carregar(np.full((taxa * 3, motor.channels), 10000, dtype=np.int16))
+            motor.tocar(quadro_inicial=taxa)
+            self.assertTrue(motor.transicionar(np.full((taxa * 2, motor.channels), -10000, dtype=np.int16)))
+            limite = time.perf_counter() + 5
+            while motor.ocupado():
+                self.assertLess(time.perf_counter(), limite)
+                time.sleep(0.01)
+
+            ouvido = saida.audio_gravado()[:, 0].astype(np.float32)
+            # Começa na faixa anterior, termina na seguinte, passando por zero no meio da sobreposição
+            self.assertGreater(ouvido[0], 9000)
+            self.assertLess(ouvido[-1], -9000)
+            transicao = np.flatnonzero(np.abs(ouvido) < 9000)
+            self.assertAlmostEqual(len(transicao) / taxa, 0.87, delta=0.05)  # Rampas cos/sen: |x| < 0,9 em ~87% do crossfade
+            meio = np.flatnonzero(ouvido < 0)[0]
+            self.assertLess(abs(ouvido[meio]), 200)
+            # A anterior some no fim do crossfade; antes da troca, só blocos inteiros dela podem ter tocado
+            self.assertGreaterEqual(len(ouvido), taxa * 2)
+            self.assertEqual((len(ouvido) - taxa * 2) % motor.quadros_por_bloco, 0)
+        finally:
+            motor.encerrar()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import threading
+import unittest
+from barramento_comandos import BarramentoComandos
+
+
+class TestBarramentoComandos(unittest.TestCase):
+    def setUp(self):
+        self.liberar = threading.Event()
+        self.executados = []
+
+        def executar(nome, args):
+            if nome == 'bloquear':
+                self.liberar.wait(2)
+            self.executados.append((nome,) + args)
+            return args[0] if args else None
+
+        self.barramento = BarramentoComandos(executar)
+
+    def tearDown(self):
+        self.liberar.set()
+        self.barramento.encerrar()
+
+    def test_load_mais_recente_vence(self):
+        self.barramento.enviar('bloquear')
+        antigo = self.barramento.enviar('load', 'a.mp3')
+        self.barramento.enviar('play')
+        novo = self.barramento.enviar('load', 'b.mp3')
+        self.liberar.set()
+
+        self.assertEqual(novo.result(timeout=2), 'b.mp3')
+        self.assertTrue(antigo.cancelled())
+        self.assertEqual(self.executados, [('bloquear',), ('load', 'b.mp3'), ('play',)])
+        self.assertEqual(self.barramento.estatisticas()['load']['colapsados'], 1)
+
+    def test_stop_impede_colapso(self):
+        self.barramento.enviar('bloquear')
+        self.barramento.enviar('load', 'a.mp3')
+        self.barramento.enviar('stop')
+        self.barramento.enviar('load', 'b.mp3')
+        self.liberar.set()
+        self.barramento.encerrar()
+
+        self.assertEqual([c[0] for c in self.executados], ['bloquear', 'load', 'stop', 'load'])
+
+    def test_load_impede_colapso_de_preload(self):
+        self.barramento.enviar('bloquear')
+        self.barramento.enviar('preload', 'b.mp3')
+        self.barramento.enviar('load', 'c.mp3')
+        self.barramento.enviar('preload', 'd.mp3')
+        self.liberar.set()
+        self.barramento.encerrar()
+
+        # O preload de d.mp3 vem depois do load, que descarta a faixa preparada antes dele
+        self.assertEqual(self.executados, [('bloquear',), ('preload', 'b.mp3'), ('load', 'c.mp3'), ('preload', 'd.mp3')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,24 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
+import shutil
+import tempfile
 import unittest
-from biblioteca import Biblioteca
+from unittest import mock
+from mutagen.easyid3 import EasyID3
+from biblioteca import Biblioteca, Musica, IndiceTitulos, ler_metadados, ler_metadados_em_lotes
+from playlist import PlaylistManager
+
+QUADRO_MP3 = b'\xff\xfb\x90\x64' + b'\x00' * 413  # MPEG-1 camada III, 128 kbps, 44.1 kHz, silêncio
+
+
+def criar_mp3(caminho, titulo, artista):
+    with open(caminho, 'wb') as f:
+        f.write(QUADRO_MP3 * 40)
+    tags = EasyID3()
+    tags['title'] = titulo
+    tags['artist'] = artista
+    tags.save(caminho)
 
 class TestBiblioteca(unittest.TestCase):
     def setUp(self):
@@ -18,5 +34,101 @@ class TestBiblioteca(unittest.TestCase):
         musicas = self.bib.carregar_diretorio("diretorio_inexistente")
         self.assertEqual(musicas, [])
 
+    def test_filtrar_e_ordenar_metadados_numericos(self):
+        for nome, bpm in (('a.mp3', 128.0), ('b.mp3', 90.5), ('c.mp3', None)):
+            musica = Musica(nome)
+            if bpm is not None:
+                musica.metadados['bpm'] = bpm
+            self.bib.musicas.append(musica)
+
+        self.assertEqual([m.caminho for m in self.bib.filtrar('bpm', 128.0)], ['a.mp3'])
+        self.assertEqual([m.caminho for m in self.bib.filtrar_intervalo('bpm', 80, 100)], ['b.mp3'])
+        self.assertEqual([m.caminho for m in self.bib.ordenar_por('bpm')], ['b.mp3', 'a.mp3', 'c.mp3'])
+        self.assertEqual(len(self.bib.filtrar('genero', 'desconhecido')), 3)
+
+class TestLeituraEmLotes(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        for i in range(10):
+            criar_mp3(os.path.join(self.pasta, f"{i:02d}.mp3"), f"Faixa {i}", 'Artista')
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def _caminhos(self):
+        return sorted(os.path.join(self.pasta, f) for f in os.listdir(self.pasta))
+
+    def test_ler_metadados_abre_uma_vez(self):
+        metadados = ler_metadados(self._caminhos()[3])
+        self.assertEqual(metadados['titulo'], 'Faixa 3')
+        self.assertEqual(metadados['album'], 'Desconhecido')
+        self.assertGreater(metadados['duracao'], 1.0)
+
+    def test_lotes_com_threads_e_processos(self):
+        esperado = {c: ler_metadados(c) for c in self._caminhos()}
+        for modo in ('threads', 'processos'):
+            lotes = list(ler_metadados_em_lotes(self._caminhos(), modo=modo, max_workers=2, tamanho_lote=3))
+            self.assertEqual(sorted(len(lote) for lote in lotes), [1, 3, 3, 3])
+            self.assertEqual(dict(par for lote in lotes for par in lote), esperado)
+        with self.assertRaises(ValueError):
+            list(ler_metadados_em_lotes(self._caminhos(), modo='fibras'))
+
+    def test_carregar_diretorio_entrega_lotes_parciais(self):
+        progresso = []
+        musicas = Biblioteca().carregar_diretorio(self.pasta, ao_lote=lambda novas, feitas, total: progresso.append((feitas, total)))
+        self.assertEqual(len(musicas), 10)
+        self.assertEqual(progresso[-1], (10, 10))
+        self.assertEqual({m.metadados['titulo'] for m in musicas}, {f"Faixa {i}" for i in range(10)})
+
+    def test_carregar_faixas_da_varredura_da_playlist(self):
+        stats = {}
+        faixas = PlaylistManager().carregar_diretorio(self.pasta, stats=stats)
+        self.assertEqual(set(stats), set(faixas))
+        with mock.patch('biblioteca.varrer') as varrer:
+            musicas = Biblioteca().carregar_faixas(self.pasta, faixas, stats=stats)
+        varrer.assert_not_called()
+        self.assertEqual([m.caminho for m in musicas], faixas)
+        self.assertEqual({m.metadados['titulo'] for m in musicas}, {f"Faixa {i}" for i in range(10)})
+
+class TestIndiceTitulos(unittest.TestCase):
+    def _musica(self, titulo):
+        return Musica(f"{titulo}.mp3", {'titulo': titulo})
+
+    def test_cem_mil_titulos_em_ordem(self):
+        # Em ordem alfabética, como vêm de uma pasta: a árvore antiga estourava a recursão perto de 1.000
+        musicas = [self._musica(f"Faixa {i:06d}") for i in range(100000)]
+        indice = IndiceTitulos(musicas)
+        self.assertIs(indice.buscar("Faixa 099999"), musicas[-1])
+        self.assertIsNone(indice.buscar("Faixa 100000"))
+        self.assertEqual(len(indice.buscar_prefixo("Faixa 0123")), 100)
+        self.assertEqual([m.metadados['titulo'] for m in indice.buscar_intervalo("Faixa 000010", "Faixa 000012")],
+                         ["Faixa 000010", "Faixa 000011", "Faixa 000012"])
+
+    def test_inserir_e_remover_com_titulos_repetidos(self):
+        primeira, segunda = self._musica("Tema"), self._musica("Tema")
+        indice = IndiceTitulos([self._musica("Abertura"), primeira])
+        indice.inserir(segunda)
+        indice.inserir(self._musica("Zumbi"))
+        self.assertIs(indice.buscar("Tema"), primeira)
+        self.assertEqual(indice.buscar_prefixo("Te"), [primeira, segunda])
+        self.assertTrue(indice.remover(primeira))
+        self.assertFalse(indice.remover(primeira))
+        self.assertIs(indice.buscar("Tema"), segunda)
+        self.assertEqual(len(indice.buscar_intervalo(minimo="B")), 2)
+
+    def test_biblioteca_busca_por_titulo(self):
+        pasta = tempfile.mkdtemp()
+        try:
+            for i in range(3):
+                criar_mp3(os.path.join(pasta, f"{i}.mp3"), f"Faixa {i}", 'Artista')
+            bib = Biblioteca()
+            bib.carregar_diretorio(pasta)
+            self.assertEqual(bib.buscar_arvore("Faixa 1").caminho, os.path.join(pasta, "1.mp3"))
+            self.assertEqual(len(bib.buscar_prefixo("Faixa")), 3)
+            self.assertEqual(len(bib.buscar_intervalo_titulos("Faixa 1")), 2)
+        finally:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+
 if __name__ == '__main__':
     unittest.main()
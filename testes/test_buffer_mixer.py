@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+from buffer_mixer import AdaptadorBufferMixer, PERFIS_BUFFER, FAIXAS_PARA_REDUZIR
+from saida_audio import SaidaNula
+from audio import AudioPlayer
+from testes.auxiliares import reiniciar_player_sem_dispositivo
+
+
+class TestAdaptadorBufferMixer(unittest.TestCase):
+    def test_dobra_com_problemas_e_reduz_depois_de_faixas_limpas(self):
+        adaptador = AdaptadorBufferMixer('adaptativo')
+        inicial, minimo, maximo = PERFIS_BUFFER['adaptativo']
+        adaptador.registrar_subexecucao()
+        self.assertEqual(adaptador.proximo_tamanho(), inicial * 2)
+        for _ in range(10):
+            adaptador.registrar_atraso()
+            adaptador.proximo_tamanho()
+        self.assertEqual(adaptador.tamanho, maximo)
+
+        for _ in range(FAIXAS_PARA_REDUZIR - 1):
+            self.assertEqual(adaptador.proximo_tamanho(), maximo)
+        self.assertEqual(adaptador.proximo_tamanho(), maximo // 2)
+        estatisticas = adaptador.estatisticas()
+        self.assertEqual(estatisticas['subexecucoes'], 1)
+        self.assertEqual(estatisticas['atrasos'], 10)
+
+    def test_perfis(self):
+        adaptador = AdaptadorBufferMixer('low_latency')
+        self.assertEqual(adaptador.tamanho, PERFIS_BUFFER['low_latency'][0])
+        adaptador.set_perfil('low_cpu')
+        self.assertEqual(adaptador.tamanho, PERFIS_BUFFER['low_cpu'][0])
+        with self.assertRaises(ValueError):
+            adaptador.set_perfil('turbo')
+
+    def test_player_reabre_saida_entre_faixas(self):
+        saida = SaidaNula(velocidade=10)
+        self.addCleanup(reiniciar_player_sem_dispositivo)
+        player = AudioPlayer.reiniciar(saida)
+        player.set_perfil_buffer('low_cpu')
+        player._ajustar_buffer_mixer()
+        self.assertEqual(saida.tamanho_buffer, PERFIS_BUFFER['low_cpu'][0])
+        self.assertEqual(player.get_estatisticas_buffer()['perfil'], 'low_cpu')
+
+
+if __name__ == '__main__':
+    unittest.main()
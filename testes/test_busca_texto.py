@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+from busca_texto import IndiceTexto, PROPORCAO_COMPACTAR, normalizar, tokenizar
+from biblioteca import Biblioteca, Musica
+
+
+def musica(caminho, titulo, artista='Desconhecido', album='Desconhecido', genero='Desconhecido'):
+    return Musica(caminho, {'titulo': titulo, 'artista': artista, 'album': album, 'genero': genero, 'duracao': 0})
+
+
+class TestIndiceTexto(unittest.TestCase):
+    def setUp(self):
+        self.musicas = [
+            musica('1.mp3', 'Coração de Estudante', 'Milton Nascimento', 'Ao Vivo', 'MPB'),
+            musica('2.mp3', 'Come Together', 'The Beatles', 'Abbey Road', 'Rock'),
+            musica('3.mp3', 'Something', 'The Beatles', 'Abbey Road', 'Rock'),
+            musica('4.mp3', 'Travessia', 'Milton Nascimento', 'Travessia', 'MPB'),
+        ]
+        self.indice = IndiceTexto(self.musicas)
+
+    def _caminhos(self, termo):
+        return [m.caminho for m in self.indice.buscar(termo)]
+
+    def test_normalizacao(self):
+        self.assertEqual(normalizar('CORAÇÃO'), 'coracao')
+        self.assertEqual(tokenizar('Ação, Reação!'), ['acao', 'reacao'])
+
+    def test_varias_palavras_e_campos(self):
+        self.assertEqual(self._caminhos('coracao'), ['1.mp3'])
+        self.assertEqual(self._caminhos('beatles abbey'), ['2.mp3', '3.mp3'])
+        self.assertEqual(self._caminhos('milton trav'), ['4.mp3'])
+        self.assertEqual(self._caminhos('mpb rock'), [])
+        self.assertEqual(self._caminhos('zzz'), [])
+        self.assertEqual(self._caminhos('...'), [])
+
+    def test_adicionar_e_remover(self):
+        self.indice.adicionar(musica('5.mp3', 'Clube da Esquina', 'Milton Nascimento'))
+        self.assertEqual(self._caminhos('milton'), ['1.mp3', '4.mp3', '5.mp3'])
+        self.indice.adicionar(musica('4.mp3', 'Outra'))  # Substitui a versão anterior
+        self.assertEqual(self._caminhos('milton'), ['1.mp3', '5.mp3'])
+        self.assertTrue(self.indice.remover('1.mp3'))
+        self.assertFalse(self.indice.remover('1.mp3'))
+        self.assertEqual(self._caminhos('milton'), ['5.mp3'])
+
+    def test_compacta_depois_de_muitas_remocoes(self):
+        for m in self.musicas[:int(len(self.musicas) * PROPORCAO_COMPACTAR) + 1]:
+            self.indice.remover(m.caminho)
+        self.assertEqual(len(self.indice._musicas), len(self.indice))
+        self.assertEqual(self._caminhos('abbey'), ['3.mp3'])
+
+    def test_cem_mil_musicas(self):
+        palavras = ['amor', 'noite', 'azul', 'mar', 'sol', 'lua', 'rio', 'vento', 'fogo', 'terra']
+        musicas = [musica(f"{i}.mp3", f"{palavras[i % 10]} {palavras[i // 10 % 10]} {i}",
+                          f"Artista {i % 1000}", f"Álbum {i % 5000}") for i in range(100000)]
+        indice = IndiceTexto(musicas)
+        palavras_por_musica = [set(tokenizar(' '.join((m.metadados['titulo'], m.metadados['artista'], m.metadados['album']))))
+                               for m in musicas]
+        for termo in ('amor noite', 'noite amor artista 210', 'amor noite 99210'):
+            esperado = [m for m, palavras_musica in zip(musicas, palavras_por_musica)
+                        if all(any(p.startswith(t) for p in palavras_musica) for t in tokenizar(termo))]
+            self.assertEqual(indice.buscar(termo), esperado)
+        self.assertEqual([m.caminho for m in indice.buscar('amor noite 99210')], ['99210.mp3'])
+
+class TestBibliotecaBusca(unittest.TestCase):
+    def test_buscar_e_atualizar(self):
+        bib = Biblioteca()
+        for m in (musica('a.mp3', 'São Paulo', 'Banda A'), musica('b.mp3', 'Rio', 'Banda B')):
+            bib.adicionar(m)
+        self.assertEqual([m.caminho for m in bib.buscar('sao')], ['a.mp3'])
+        self.assertEqual([m.caminho for m in bib.buscar('banda')], ['a.mp3', 'b.mp3'])
+        self.assertTrue(bib.remover('a.mp3'))
+        self.assertEqual([m.caminho for m in bib.buscar('banda')], ['b.mp3'])
+        self.assertIsNone(bib.buscar_arvore('São Paulo'))
+        self.assertEqual(len(bib.buscar('')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
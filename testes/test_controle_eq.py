@@ -0,0 +1,169 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import unittest
+from concurrent.futures import Future
+from controle_eq import ControleEQ
+
+
+class _PlayerFalso:
+    """Registra os comandos recebidos, como o AudioPlayer os enfileiraria."""
+
+    def __init__(self):
+        self.comandos = []
+        self.motor_reproducao = 'music'
+        self.pausado = False
+        self.posicao = 42.0
+
+    def is_playing(self):
+        return not self.pausado
+
+    def get_progresso(self):
+        return self.posicao
+
+    def set_equalizacao(self, grave, medio, agudo):
+        self.comandos.append(('set_equalizacao', grave, medio, agudo))
+
+    def set_motor_reproducao(self, motor):
+        self.motor_reproducao = motor
+
+    def carregar_musica(self, caminho):
+        self.comandos.append(('load', caminho))
+
+    def seek(self, segundos):
+        self.comandos.append(('seek', segundos))
+
+    def pause(self):
+        self.comandos.append(('pause',))
+
+    def preparar_proxima(self, caminho):
+        self.comandos.append(('preload', caminho))
+
+
+class _RenderFalso:
+    """Cache de renders em memória: renderizar() registra o pedido e devolve um Future que o teste conclui."""
+
+    def __init__(self):
+        self.prontos = {}
+        self.pedidos = []
+        self.futuros = {}
+        self.cancelamentos = []
+        self.em_uso = ()
+
+    def caminho_renderizado(self, caminho, grave, medio, agudo):
+        return self.prontos.get((caminho, grave, medio, agudo))
+
+    def renderizar(self, caminho, grave, medio, agudo):
+        chave = (caminho, grave, medio, agudo)
+        self.pedidos.append(chave)
+        futuro = Future()
+        if chave in self.prontos:
+            futuro.set_result(self.prontos[chave])
+        self.futuros[chave] = futuro
+        return futuro
+
+    def renderizar_a_frente(self, caminhos, grave, medio, agudo):
+        return [self.renderizar(caminho, grave, medio, agudo) for caminho in caminhos]
+
+    def concluir(self, chave, destino):
+        self.prontos[chave] = destino
+        self.futuros[chave].set_result(destino)
+
+    def cancelar_pendentes(self, ganhos=None):
+        self.cancelamentos.append(ganhos)
+
+    def marcar_em_uso(self, *caminhos):
+        self.em_uso = caminhos
+
+
+class TestControleEQ(unittest.TestCase):
+    def setUp(self):
+        self.player = _PlayerFalso()
+        self.render = _RenderFalso()
+        self.render.prontos[('a.mp3', 3, 0, -2)] = 'cache_eq/a.wav'
+        self.controle = ControleEQ(self.player, self.render, espera_render=0)
+        self.assertEqual(self.controle.tocar('a.mp3'), 'a.mp3')
+        self.assertEqual(self.controle.preparar('b.mp3'), 'b.mp3')
+        self.controle.ganhos.update(grave=3, agudo=-2)
+
+    def test_tempo_real_leva_a_faixa_atual_para_o_motor_de_buffer(self):
+        self.controle.aplicar()
+        self.assertEqual(self.player.motor_reproducao, 'buffer')
+        self.assertEqual(self.player.comandos, [('set_equalizacao', 3, 0, -2), ('load', 'a.mp3'),
+                                                ('seek', 42.0), ('preload', 'b.mp3')])
+
+    def test_alternar_modo_nao_aplica_a_eq_duas_vezes(self):
+        self.controle.aplicar()
+        self.player.comandos.clear()
+
+        # Para o render: o equalizador ao vivo fica plano e a faixa atual passa para o render, na mesma posição
+        self.controle.definir_modo('pre_render', ['a.mp3', 'b.mp3'])
+        self.assertEqual(self.player.comandos, [('set_equalizacao', 0, 0, 0), ('load', 'cache_eq/a.wav'),
+                                                ('seek', 42.0), ('preload', 'b.mp3')])
+        self.assertEqual(self.render.em_uso, ('cache_eq/a.wav', 'b.mp3'))
+        self.assertIn(('b.mp3', 3, 0, -2), self.render.pedidos)
+        self.player.comandos.clear()
+
+        # De volta ao tempo real: o original, com a EQ ao vivo, mantendo a pausa
+        self.player.pausado = True
+        self.controle.definir_modo('tempo_real')
+        self.assertEqual(self.player.comandos, [('set_equalizacao', 3, 0, -2), ('load', 'a.mp3'),
+                                                ('seek', 42.0), ('pause',), ('preload', 'b.mp3')])
+        self.assertEqual(self.controle.arquivo_tocando, 'a.mp3')
+
+    def test_pre_render_segue_no_arquivo_atual_ate_o_render_ficar_pronto(self):
+        self.controle.definir_modo('pre_render', ['a.mp3', 'b.mp3'])
+        self.player.comandos.clear()
+        self.controle.ganhos['medio'] = 1
+        self.controle.aplicar(['a.mp3', 'b.mp3'])
+        self.assertEqual(self.player.comandos, [('set_equalizacao', 0, 0, 0)])
+        self.assertEqual(self.controle.arquivo_tocando, 'cache_eq/a.wav')
+        self.assertIn(('a.mp3', 3, 1, -2), self.render.pedidos)
+
+    def test_ajustes_seguidos_renderizam_so_os_ultimos_ganhos(self):
+        controle = ControleEQ(self.player, self.render, modo='pre_render', espera_render=0.05)
+        controle.tocar('a.mp3')
+        controle.preparar('b.mp3')
+        for grave in (0.5, 1.0, 1.5, 2.0):
+            controle.ganhos['grave'] = grave
+            controle.aplicar(['a.mp3', 'b.mp3'])
+            # Cada ajuste cancela o que ainda está na fila com outros ganhos
+            self.assertEqual(self.render.cancelamentos[-1], (grave, 0, 0))
+        self.assertEqual(self.render.pedidos, [])
+        limite = time.perf_counter() + 5
+        while len(self.render.pedidos) < 2:
+            self.assertLess(time.perf_counter(), limite)
+            time.sleep(0.01)
+        time.sleep(0.1)
+        self.assertEqual(self.render.pedidos, [('a.mp3', 2.0, 0, 0), ('b.mp3', 2.0, 0, 0)])
+
+        # Render pronto: a faixa atual passa para ele na mesma posição, e a pré-carregada também
+        self.player.comandos.clear()
+        self.render.concluir(('a.mp3', 2.0, 0, 0), 'cache_eq/a2.wav')
+        self.assertEqual(self.player.comandos, [('load', 'cache_eq/a2.wav'), ('seek', 42.0), ('preload', 'b.mp3')])
+        self.render.concluir(('b.mp3', 2.0, 0, 0), 'cache_eq/b2.wav')
+        self.assertEqual(self.player.comandos[-1], ('preload', 'cache_eq/b2.wav'))
+        self.assertEqual(self.render.em_uso, ('cache_eq/a2.wav', 'cache_eq/b2.wav'))
+        controle.encerrar()
+
+    def test_render_de_ganhos_antigos_e_ignorado(self):
+        self.controle.definir_modo('pre_render', ['a.mp3'])
+        self.controle.ganhos['grave'] = 4
+        self.controle.aplicar(['a.mp3'])
+        self.controle.ganhos['grave'] = 5
+        self.controle.aplicar(['a.mp3'])
+        self.player.comandos.clear()
+        self.render.concluir(('a.mp3', 4, 0, -2), 'cache_eq/a4.wav')
+        self.assertEqual(self.player.comandos, [])
+        self.render.concluir(('a.mp3', 5, 0, -2), 'cache_eq/a5.wav')
+        self.assertEqual(self.player.comandos[0], ('load', 'cache_eq/a5.wav'))
+
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            self.controle.definir_modo('outro')
+
+
+if __name__ == '__main__':
+    unittest.main()
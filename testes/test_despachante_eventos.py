@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+import threading
+import time
+from despachante_eventos import DespachanteEventos
+
+
+class ObservadorLento:
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.recebidos = []
+
+    def atualizar(self, evento):
+        self.liberar.wait(5)
+        self.recebidos.append(evento)
+
+
+class ObservadorRapido:
+    def __init__(self):
+        self.recebidos = []
+
+    def atualizar(self, evento):
+        self.recebidos.append(evento)
+
+
+class TestDespachanteEventos(unittest.TestCase):
+    def setUp(self):
+        self.despachante = DespachanteEventos(capacidade=4)
+
+    def tearDown(self):
+        self.despachante.encerrar()
+
+    def test_observador_lento_nao_bloqueia(self):
+        lento, rapido = ObservadorLento(), ObservadorRapido()
+        self.despachante.adicionar(lento)
+        self.despachante.adicionar(rapido)
+
+        self.despachante.publicar('play')
+        time.sleep(0.05)  # 'play' já está em entrega no observador lento
+        inicio = time.perf_counter()
+        for evento in ('volume', 'volume', 'volume', 'pause', 'a', 'b', 'c'):
+            self.despachante.publicar(evento)
+        self.assertLess(time.perf_counter() - inicio, 0.1)
+
+        time.sleep(0.2)
+        self.assertEqual(rapido.recebidos[-1], 'c')
+        self.assertEqual(lento.recebidos, [])
+
+        lento.liberar.set()
+        time.sleep(0.2)
+        metricas = self.despachante.metricas()['ObservadorLento']
+        # Dos 7 eventos seguintes, dois 'volume' colapsam e a fila de 4 descarta o mais antigo
+        self.assertEqual(metricas['colapsados'], 2)
+        self.assertEqual(metricas['descartados'], 1)
+        self.assertEqual(lento.recebidos, ['play', 'pause', 'a', 'b', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
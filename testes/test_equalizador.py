@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+import numpy as np
+from equalizador import Equalizador3Bandas
+
+
+def energia_em(sinal, freq, taxa=44100):
+    espectro = np.abs(np.fft.rfft(sinal))
+    freqs = np.fft.rfftfreq(len(sinal), 1 / taxa)
+    return espectro[np.argmin(np.abs(freqs - freq))]
+
+
+class TestEqualizador(unittest.TestCase):
+    def setUp(self):
+        self.eq = Equalizador3Bandas(44100, 2)
+        t = np.arange(44100) / 44100
+        sinal = 3000 * (np.sin(2 * np.pi * 100 * t) + np.sin(2 * np.pi * 8000 * t))
+        self.bloco = np.stack([sinal, sinal], axis=1).astype(np.int16)
+
+    def test_eq_plana_nao_altera_o_audio(self):
+        self.assertFalse(self.eq.ativo)
+        np.testing.assert_array_equal(self.eq.processar(self.bloco), self.bloco)
+
+    def test_reforco_de_grave(self):
+        self.eq.set_ganhos(6, 0, 0)
+        saida = np.concatenate([self.eq.processar(self.bloco[i:i + 4410])
+                                for i in range(0, len(self.bloco), 4410)])
+        self.assertEqual(saida.shape, self.bloco.shape)
+        ganho_grave = energia_em(saida[:, 0], 100) / energia_em(self.bloco[:, 0], 100)
+        ganho_agudo = energia_em(saida[:, 0], 8000) / energia_em(self.bloco[:, 0], 8000)
+        self.assertGreater(ganho_grave, 1.7)
+        self.assertAlmostEqual(ganho_agudo, 1.0, delta=0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+import numpy as np
+from espectro import EspectroMultirresolucao, plano_multirresolucao
+from saida_audio import SaidaNula
+from audio import AudioPlayer
+from testes.auxiliares import reiniciar_player_sem_dispositivo
+
+
+class TestEspectroMultirresolucao(unittest.TestCase):
+    def _tom(self, freq, quadros, taxa=44100):
+        t = np.arange(quadros) / taxa
+        return np.sin(2 * np.pi * freq * t).astype(np.float32)
+
+    def test_tom_cai_na_barra_certa(self):
+        analisador = EspectroMultirresolucao(44100, 40)
+        limites = np.geomspace(20, 20000, 41)
+        for freq in (30, 55, 100, 440, 5000, 15000):
+            analisador.reiniciar()
+            analisador.alimentar(self._tom(freq, analisador.historico), analisador.historico)
+            barra = int(np.argmax(analisador.bandas() / analisador.pesos))
+            self.assertTrue(limites[barra] <= freq < limites[barra + 1], (freq, barra))
+
+    def test_graves_e_agudos_na_mesma_escala(self):
+        # Ruído branco tem a mesma potência por Hz nas barras das duas FFTs
+        analisador = EspectroMultirresolucao(44100, 40)
+        limites = np.geomspace(20, 20000, 41)
+        rng = np.random.default_rng(1)
+        potencia = np.zeros(40)
+        for _ in range(40):
+            analisador.reiniciar()
+            analisador.alimentar(rng.standard_normal(analisador.historico).astype(np.float32), 0)
+            potencia += (analisador.bandas() / analisador.pesos) ** 2
+        densidade = potencia / np.diff(limites)
+        self.assertLess(densidade.max() / densidade.min(), 1.6)
+
+    def test_alimentacao_incremental_igual_a_de_uma_vez(self):
+        sinal = np.random.default_rng(2).standard_normal(30000).astype(np.float32)
+        de_uma_vez = EspectroMultirresolucao(44100, 40)
+        de_uma_vez.alimentar(sinal, len(sinal))
+        incremental = EspectroMultirresolucao(44100, 40)
+        for inicio in range(0, len(sinal), 1470):
+            incremental.alimentar(sinal[inicio:inicio + 1470], min(len(sinal), inicio + 1470))
+        np.testing.assert_allclose(incremental._agudos, de_uma_vez._agudos)
+        np.testing.assert_allclose(incremental._graves, de_uma_vez._graves, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(incremental._resto, de_uma_vez._resto)
+
+    def test_kernels_em_cache_por_taxa_e_barras(self):
+        self.assertIs(plano_multirresolucao(44100, 40), plano_multirresolucao(44100, 40))
+        self.assertIsNot(plano_multirresolucao(48000, 40), plano_multirresolucao(44100, 40))
+        agudos, graves, _ = plano_multirresolucao(48000, 64)
+        self.assertEqual(agudos.shape, (1025, 64))
+        self.assertFalse(graves.flags.writeable)
+
+    def test_player_alterna_modo(self):
+        self.addCleanup(reiniciar_player_sem_dispositivo)
+        player = AudioPlayer.reiniciar(SaidaNula())
+        self.assertEqual(player.modo_espectro, 'multirresolucao')
+        player.set_modo_espectro('fft')
+        self.assertEqual(player.modo_espectro, 'fft')
+        with self.assertRaises(ValueError):
+            player.set_modo_espectro('wavelet')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import wave
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from fluxo_pcm import FluxoPCM
+from saida_audio import SaidaNula
+from audio import AudioPlayer
+from cache_pcm import CachePCM
+from testes.auxiliares import reiniciar_player_sem_dispositivo
+
+
+class _CacheRetido(CachePCM):
+    """Só grava no cache depois de `liberar`, para o teste ver a faixa tocando em fluxo antes."""
+
+    def __init__(self, pasta):
+        super().__init__(pasta)
+        self.liberar = threading.Event()
+
+    def armazenar(self, caminho, taxa, canais):
+        self.liberar.wait(5)
+        return super().armazenar(caminho, taxa, canais)
+
+
+class TestFluxoPCM(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.pasta, 'faixa.wav')
+        self.pcm = (np.random.default_rng(3).standard_normal((44100 * 3, 2)) * 4000).astype(np.int16)
+        with wave.open(self.caminho, 'wb') as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(44100)
+            wav.writeframes(self.pcm.tobytes())
+
+    def tearDown(self):
+        reiniciar_player_sem_dispositivo()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def _esperar(self, fluxo, inicio, fim):
+        limite = time.perf_counter() + 5
+        while not fluxo.pronto(inicio, fim):
+            self.assertLess(time.perf_counter(), limite)
+            time.sleep(0.001)
+
+    def test_leitura_sequencial_com_fila_limitada(self):
+        fluxo = FluxoPCM(self.caminho, 44100, 2, quadros_por_bloco=4096, max_blocos=4, historico=8192)
+        try:
+            partes = []
+            posicao = 0
+            while True:
+                self._esperar(fluxo, posicao, posicao + 3000)
+                if posicao >= len(fluxo):
+                    break
+                bloco = fluxo[posicao:min(posicao + 3000, len(fluxo))]
+                partes.append(bloco)
+                posicao += len(bloco)
+                estatisticas = fluxo.estatisticas()
+                self.assertLessEqual(estatisticas['blocos_na_fila'], 4)
+                self.assertLessEqual(estatisticas['quadros_guardados'], 8192 + 3 * 4096)
+            np.testing.assert_array_equal(np.concatenate(partes), self.pcm)
+            self.assertEqual(len(fluxo), len(self.pcm))
+        finally:
+            fluxo.fechar()
+
+    def test_busca_fora_do_trecho_reinicia_o_decodificador(self):
+        fluxo = FluxoPCM(self.caminho, 44100, 2, quadros_por_bloco=4096, max_blocos=4, historico=8192)
+        try:
+            self._esperar(fluxo, 0, 4096)
+            self.assertFalse(fluxo.pronto(100000, 104096))
+            self._esperar(fluxo, 100000, 104096)
+            np.testing.assert_array_equal(fluxo[100000:104096], self.pcm[100000:104096])
+            estatisticas = fluxo.estatisticas()
+            self.assertEqual(estatisticas['reinicios'], 1)
+            self.assertIsNotNone(estatisticas['latencia_recarga_ms'])
+        finally:
+            fluxo.fechar()
+
+    def test_player_em_fluxo(self):
+        saida = SaidaNula(velocidade=20)
+        player = AudioPlayer.reiniciar(saida)
+        player.set_motor_reproducao('fluxo')
+        self.assertTrue(player.carregar_musica(self.caminho).result(timeout=10))
+        self.assertFalse(player.cache_pcm.contem(self.caminho, 44100, 2))
+        player.play().result(timeout=5)
+        limite = time.perf_counter() + 5
+        while player.is_playing() and time.perf_counter() < limite:
+            player.check_events()
+            time.sleep(0.02)
+        self.assertAlmostEqual(saida.posicao(), 3.0, places=2)
+        self.assertEqual(player.get_estatisticas_fluxo()['paradas'], 0)
+
+    def test_buffer_comeca_em_fluxo_e_passa_para_o_cache(self):
+        saida = SaidaNula(velocidade=20)
+        player = AudioPlayer.reiniciar(saida)
+        player.cache_pcm = _CacheRetido(os.path.join(self.pasta, 'cache_pcm'))
+        player.set_motor_reproducao('buffer')
+        # Fora do cache, o load não espera a faixa inteira ser decodificada
+        self.assertTrue(player.carregar_musica(self.caminho).result(timeout=10))
+        self.assertIsInstance(player._motor_buffer._dados, FluxoPCM)
+        player.seek(1.0).result(timeout=5)
+        player.cache_pcm.liberar.set()
+        limite = time.perf_counter() + 5
+        while player._fluxo is not None:
+            self.assertLess(time.perf_counter(), limite)
+            time.sleep(0.01)
+        self.assertTrue(player.cache_pcm.contem(self.caminho, 44100, 2))
+        self.assertIsInstance(player._motor_buffer._dados, np.memmap)
+        # A troca de fonte não mexe na posição: a faixa toca até o fim a partir de 1 s
+        while player.is_playing() and time.perf_counter() < limite:
+            player.check_events()
+            time.sleep(0.02)
+        self.assertAlmostEqual(saida.posicao(), 2.0, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
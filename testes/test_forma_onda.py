@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+import tempfile
+import wave
+import numpy as np
+from unittest import mock
+from forma_onda import calcular_forma_onda, gravar_forma_onda, ler_forma_onda
+
+
+class TestFormaOnda(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, 'rampa.wav')
+        # Metade em silêncio, metade com uma senoide de amplitude 10000
+        t = np.arange(44100) / 44100
+        sinal = np.concatenate((np.zeros(44100), 10000 * np.sin(2 * np.pi * 440 * t)))
+        with wave.open(self.caminho, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(44100)
+            f.writeframes(sinal.astype(np.int16).tobytes())
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_baldes_e_arquivo_lateral(self):
+        minimos, maximos, rms, duracao = calcular_forma_onda(self.caminho, num_baldes=100)
+        self.assertEqual(len(minimos), 100)
+        self.assertAlmostEqual(duracao, 2.0)
+        self.assertEqual(maximos[:50].max(), 0)
+        self.assertGreater(maximos[60], 9000)
+        self.assertAlmostEqual(rms[80], 10000 / np.sqrt(2), delta=200)
+
+        arquivo = os.path.join(self.pasta.name, 'rampa.onda')
+        gravar_forma_onda(arquivo, minimos, maximos, rms, duracao)
+        forma = ler_forma_onda(arquivo)
+        np.testing.assert_array_equal(forma.rms, rms)
+
+        linha = forma.linha(20)
+        self.assertEqual(len(linha), 20)
+        self.assertEqual(linha[:10].strip(), '')
+        self.assertEqual(linha[10:], '█' * 10)
+
+        # Clique na coluna 10 de 20 cai no meio da faixa
+        self.assertAlmostEqual(forma.coluna_para_segundos(10, 20), 1.0)
+        self.assertEqual(forma.coluna_para_segundos(25, 20), 2.0)
+
+    def test_duracao_desconhecida_nao_gera_um_balde_por_amostra(self):
+        with mock.patch('forma_onda.sondar_formato', return_value=(44100, 1, 0)):
+            minimos, maximos, rms, duracao = calcular_forma_onda(self.caminho, num_baldes=100)
+        self.assertEqual(len(minimos), 100)
+        self.assertAlmostEqual(duracao, 2.0)
+        self.assertEqual(maximos[:50].max(), 0)
+        self.assertGreater(maximos[60], 9000)
+        self.assertAlmostEqual(rms[80], 10000 / np.sqrt(2), delta=200)
+
+
+if __name__ == '__main__':
+    unittest.main()
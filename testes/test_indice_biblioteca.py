@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import shutil
+import tempfile
+import unittest
+from indice_biblioteca import IndiceBiblioteca
+from biblioteca import Biblioteca
+
+
+class TestIndiceBiblioteca(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.musicas = os.path.join(self.pasta, 'musicas')
+        os.makedirs(self.musicas)
+        for nome in ('a.mp3', 'b.mp3', 'c.flac'):
+            with open(os.path.join(self.musicas, nome), 'wb') as f:
+                f.write(b'\0' * 10)
+        self.arquivo = os.path.join(self.pasta, 'biblioteca.sqlite3')
+        self.lidos = []
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def _extrair(self, caminhos):
+        for caminho in caminhos:
+            self.lidos.append(os.path.basename(caminho))
+            yield [(caminho, {'titulo': os.path.basename(caminho), 'artista': 'X', 'album': 'Y',
+                              'genero': 'Z', 'duracao': 1.5, 'faixa': 3})]
+
+    def _caminhos(self):
+        return sorted(os.path.join(self.musicas, f) for f in os.listdir(self.musicas))
+
+    def test_so_rele_alterados_e_remove_apagados(self):
+        indice = IndiceBiblioteca(self.arquivo)
+        indice.sincronizar(self.musicas, self._caminhos(), self._extrair)
+        self.assertEqual(sorted(self.lidos), ['a.mp3', 'b.mp3', 'c.flac'])
+        indice.fechar()
+
+        # Reabre de outra instância: nada é relido, e os metadados voltam completos
+        self.lidos = []
+        with open(os.path.join(self.musicas, 'b.mp3'), 'ab') as f:
+            f.write(b'\0')
+        os.remove(os.path.join(self.musicas, 'c.flac'))
+        indice = IndiceBiblioteca(self.arquivo)
+        resultado = dict(indice.sincronizar(self.musicas, self._caminhos(), self._extrair))
+        self.assertEqual(self.lidos, ['b.mp3'])
+        self.assertEqual(resultado[os.path.join(self.musicas, 'a.mp3')]['faixa'], 3)
+        self.assertEqual(resultado[os.path.join(self.musicas, 'a.mp3')]['duracao'], 1.5)
+        self.assertEqual(indice.total(), 2)
+        indice.fechar()
+
+    def test_biblioteca_usa_o_indice(self):
+        indice = IndiceBiblioteca(self.arquivo)
+        Biblioteca(indice).carregar_diretorio(self.musicas)
+        indice.sincronizar(self.musicas, self._caminhos(), self._extrair)
+        self.assertEqual(self.lidos, [])
+        musicas = Biblioteca(indice).carregar_diretorio(self.musicas)
+        self.assertEqual(len(musicas), 3)
+        self.assertEqual({m.metadados['titulo'] for m in musicas}, {'a.mp3', 'b.mp3', 'c.flac'})
+        indice.fechar()
+
+    def test_subpastas_no_indice(self):
+        subpasta = os.path.join(self.musicas, 'disco 2')
+        os.makedirs(subpasta)
+        with open(os.path.join(subpasta, 'd.mp3'), 'wb') as f:
+            f.write(b'\0' * 10)
+        indice = IndiceBiblioteca(self.arquivo)
+        caminhos = self._caminhos()[:3] + [os.path.join(subpasta, 'd.mp3')]
+        indice.sincronizar(self.musicas, caminhos, self._extrair, profundidade=None)
+        self.lidos = []
+        indice.sincronizar(self.musicas, caminhos, self._extrair, profundidade=None)
+        self.assertEqual(self.lidos, [])
+
+        # Uma varredura só do primeiro nível não apaga o que está nas subpastas
+        indice.sincronizar(self.musicas, caminhos[:3], self._extrair)
+        self.assertEqual(indice.total(), 4)
+        os.remove(caminhos[3])
+        indice.sincronizar(self.musicas, caminhos[:3], self._extrair, profundidade=None)
+        self.assertEqual(indice.total(), 3)
+        indice.fechar()
+
+
+if __name__ == '__main__':
+    unittest.main()
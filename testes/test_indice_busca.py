@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import unittest
+import tempfile
+import threading
+from indice_busca import indexar_mp3, CacheIndiceBusca
+
+# Quadro MPEG-1 Layer III, 128 kbps, 44100 Hz, sem preenchimento: 417 bytes e 1152 amostras
+QUADRO = bytes([0xFF, 0xFB, 0x90, 0x64]) + bytes(413)
+ID3 = b'ID3\x03\x00\x00\x00\x00\x00\x10' + bytes(16)
+
+
+class TestIndiceBusca(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, 'silencio.mp3')
+        with open(self.caminho, 'wb') as f:
+            f.write(ID3 + QUADRO * 2000)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_indexar_mp3(self):
+        indice = indexar_mp3(self.caminho)
+        self.assertEqual(indice.taxa, 44100)
+        self.assertEqual(indice.total_amostras, 2000 * 1152)
+
+        segundos, offset = indice.localizar(30.0)
+        self.assertLessEqual(segundos, 30.0)
+        self.assertGreater(segundos, 29.5)
+        # O ponto cai exatamente no início de um quadro, logo depois da tag ID3
+        self.assertEqual((offset - len(ID3)) % len(QUADRO), 0)
+        self.assertEqual((offset - len(ID3)) // len(QUADRO) * 1152, round(segundos * 44100))
+
+    def test_cache_persistente(self):
+        pasta_cache = os.path.join(self.pasta.name, 'cache')
+        indice = CacheIndiceBusca(pasta=pasta_cache).obter(self.caminho)
+        self.assertEqual(len(os.listdir(pasta_cache)), 1)
+        relido = CacheIndiceBusca(pasta=pasta_cache).obter(self.caminho)
+        self.assertEqual(relido.localizar(12.3), indice.localizar(12.3))
+
+    def test_construcao_nao_bloqueia_outras_faixas(self):
+        cache = CacheIndiceBusca(pasta=os.path.join(self.pasta.name, 'cache'))
+        pronto = cache.obter(self.caminho)
+        outra = os.path.join(self.pasta.name, 'outra.mp3')
+        with open(outra, 'wb') as f:
+            f.write(ID3 + QUADRO * 100)
+
+        comecou, liberar = threading.Event(), threading.Event()
+
+        def indexar_lento(caminho):
+            comecou.set()
+            liberar.wait(5)
+            return indexar_mp3(caminho)
+
+        cache.EXTENSOES = {'.mp3': indexar_lento}
+        construcao = threading.Thread(target=cache.obter, args=(outra,))
+        construcao.start()
+        try:
+            self.assertTrue(comecou.wait(5))
+            # Com a outra faixa ainda sendo indexada, a já indexada sai da memória sem esperar
+            inicio = time.perf_counter()
+            self.assertIs(cache.obter(self.caminho), pronto)
+            self.assertLess(time.perf_counter() - inicio, 1)
+        finally:
+            liberar.set()
+            construcao.join()
+        self.assertEqual(cache.obter(outra).total_amostras, 100 * 1152)
+
+
+if __name__ == '__main__':
+    unittest.main()
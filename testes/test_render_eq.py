@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import wave
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from render_eq import ServicoRenderEQ
+
+
+class TestServicoRenderEQ(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.pasta, 'faixa.wav')
+        sinal = (np.random.default_rng(5).standard_normal((22050, 2)) * 3000).astype(np.int16)
+        with wave.open(self.caminho, 'wb') as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(44100)
+            wav.writeframes(sinal.tobytes())
+        self.servico = ServicoRenderEQ(pasta=os.path.join(self.pasta, 'cache_eq'), max_processos=1)
+
+    def tearDown(self):
+        self.servico.encerrar()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def test_cache_por_conjunto_de_ganhos(self):
+        self.assertIsNone(self.servico.caminho_renderizado(self.caminho, 3, 0, -2))
+        destino = self.servico.obter(self.caminho, 3, 0, -2, timeout=30)
+        self.assertNotEqual(destino, self.caminho)
+        with wave.open(destino, 'rb') as wav:
+            self.assertEqual(wav.getnframes(), 22050)
+        # Mesmos ganhos: o render já existe e não é refeito
+        futuro = self.servico.renderizar(self.caminho, 3, 0, -2)
+        self.assertTrue(futuro.done())
+        self.assertEqual(futuro.result(), destino)
+        self.assertEqual(self.servico.caminho_renderizado(self.caminho, 3, 0, -2), destino)
+        # Outros ganhos: outra chave, outro arquivo
+        self.assertIsNone(self.servico.caminho_renderizado(self.caminho, 3, 0.5, -2))
+        outro = self.servico.obter(self.caminho, 3, 0.5, -2, timeout=30)
+        self.assertNotEqual(os.path.dirname(outro), os.path.dirname(destino))
+
+    def test_cancelar_renders_de_ganhos_antigos(self):
+        futuros = [self.servico.renderizar(self.caminho, grave, 0, 0) for grave in (1, 2, 3, 4, 5)]
+        # O pool de um processo já tem no máximo dois renders em andamento; os demais ainda podem ser cancelados
+        self.assertGreater(self.servico.cancelar_pendentes((5, 0, 0)), 0)
+        self.assertFalse(futuros[-1].cancelled())
+        self.assertTrue(futuros[-1].result(timeout=30))
+        for grave, futuro in zip((1, 2, 3, 4), futuros):
+            if futuro.cancelled():
+                self.assertIsNone(self.servico.caminho_renderizado(self.caminho, grave, 0, 0))
+        restantes = os.listdir(self.servico.pasta)
+        self.assertEqual(len(restantes), sum(1 for f in futuros if not f.cancelled()))
+
+    def test_falha_no_render_devolve_o_original(self):
+        invalido = os.path.join(self.pasta, 'invalido.wav')
+        with open(invalido, 'wb') as f:
+            f.write(b'isto nao e audio')
+        self.assertEqual(self.servico.obter(invalido, 2, 2, 2, timeout=30), invalido)
+        self.assertIsNone(self.servico.caminho_renderizado(invalido, 2, 2, 2))
+
+    def test_cota_nao_apaga_o_render_em_uso(self):
+        tocando = self.servico.obter(self.caminho, 1, 0, 0, timeout=30)
+        antigo = time.time() - 100
+        os.utime(tocando, (antigo, antigo))  # O mais antigo do cache: o primeiro a sair pela LRU
+        self.servico.marcar_em_uso(tocando)
+        self.servico.cota_bytes = os.path.getsize(tocando) + 1
+        segundo = self.servico.obter(self.caminho, 2, 0, 0, timeout=30)
+        # A cota só comporta um render: sai o que não está em uso, mesmo sendo o mais novo.
+        # Ela é aplicada no callback de conclusão do render, que pode rodar depois de obter()
+        limite = time.perf_counter() + 5
+        while os.path.exists(segundo):
+            self.assertLess(time.perf_counter(), limite)
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(tocando))
+
+
+if __name__ == '__main__':
+    unittest.main()
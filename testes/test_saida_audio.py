@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import wave
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from saida_audio import SaidaNula
+from audio import AudioPlayer
+from testes.auxiliares import reiniciar_player_sem_dispositivo
+
+
+class TestSaidaNula(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.pasta, 'faixa.wav')
+        t = np.arange(44100 * 4) / 44100
+        sinal = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+        with wave.open(self.caminho, 'wb') as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(44100)
+            wav.writeframes(np.repeat(sinal, 2).tobytes())
+
+    def tearDown(self):
+        reiniciar_player_sem_dispositivo()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def test_canal_consome_no_ritmo_do_relogio(self):
+        saida = SaidaNula(velocidade=1000)
+        canal = saida.abrir_canal()
+        canal.tocar(np.zeros((4410, 2), dtype=np.int16))
+        canal.enfileirar(np.zeros((4410, 2), dtype=np.int16))
+        self.assertTrue(canal.tem_fila())
+        time.sleep(0.05)  # 50 s no relógio virtual
+        self.assertFalse(canal.ocupado())
+        self.assertEqual(canal.quadros_consumidos(), 8820)
+        self.assertAlmostEqual(saida.posicao(), 0.2)
+
+    def test_player_sem_dispositivo(self):
+        saida = SaidaNula(velocidade=40)
+        player = AudioPlayer.reiniciar(saida)
+        self.assertEqual(player.motor_reproducao, 'buffer')
+        with self.assertRaises(ValueError):
+            player.set_motor_reproducao('music')
+
+        self.assertTrue(player.carregar_musica(self.caminho).result(timeout=10))
+        player.play().result(timeout=5)
+        limite = time.perf_counter() + 5
+        while player.is_playing() and time.perf_counter() < limite:
+            player.check_events()
+            time.sleep(0.02)
+        self.assertFalse(player.is_playing())
+        self.assertAlmostEqual(saida.posicao(), 4.0, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+import tempfile
+import wave
+import numpy as np
+from sonoridade import medir_sonoridade, AnalisadorSonoridade
+
+
+def gravar_senoide(caminho, amplitude, freq=1000, segundos=5, taxa=44100):
+    t = np.arange(taxa * segundos) / taxa
+    sinal = amplitude * np.sin(2 * np.pi * freq * t)
+    estereo = np.stack([sinal, sinal], axis=1)
+    with wave.open(caminho, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(taxa)
+        f.writeframes((estereo * 32767).astype(np.int16).tobytes())
+
+
+class TestSonoridade(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, 'seno.wav')
+        gravar_senoide(self.caminho, 0.1)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_senoide_de_referencia(self):
+        # BS.1770: senoide de 1 kHz a -20 dBFS nos dois canais mede -20 LUFS
+        medida = medir_sonoridade(self.caminho)
+        self.assertAlmostEqual(medida['lufs'], -20.0, delta=0.1)
+        self.assertAlmostEqual(medida['pico_db'], -20.0, delta=0.1)
+
+    def test_analise_incremental_e_ganho(self):
+        analisador = AnalisadorSonoridade(arquivo=os.path.join(self.pasta.name, 'sonoridade.json'),
+                                          max_processos=1)
+        self.assertEqual(analisador.analisar_lote([self.caminho]), 1)
+        self.assertEqual(analisador.analisar_lote([self.caminho]), 0)
+        # -20 LUFS -> alvo de -14 LUFS pede +6 dB, e o pico (-20 dBFS) comporta
+        self.assertAlmostEqual(analisador.ganho_db(self.caminho), 6.0, delta=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
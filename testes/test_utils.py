@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import shutil
+import tempfile
+import unittest
+from utils import aplicar_cota_lru
+
+
+class TestCotaLRU(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.arquivos = []
+        for i, chave in enumerate(('antigo', 'medio', 'novo')):
+            os.makedirs(os.path.join(self.pasta, chave))
+            arquivo = os.path.join(self.pasta, chave, 'faixa.wav')
+            with open(arquivo, 'wb') as f:
+                f.write(b'\0' * 1000)
+            os.utime(arquivo, (time.time() - 100 + i, time.time() - 100 + i))
+            self.arquivos.append(arquivo)
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def test_remove_os_mais_antigos_menos_os_em_uso(self):
+        aplicar_cota_lru(self.pasta, 2000, em_uso={self.arquivos[0]})
+        # O mais antigo está tocando: sai o seguinte na ordem de uso
+        self.assertEqual(sorted(os.listdir(self.pasta)), ['antigo', 'novo'])
+        aplicar_cota_lru(self.pasta, 1000)
+        self.assertEqual(os.listdir(self.pasta), ['novo'])
+
+
+if __name__ == '__main__':
+    unittest.main()
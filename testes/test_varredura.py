@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import shutil
+import tempfile
+import unittest
+from varredura import Varredura, varrer
+from playlist import PlaylistManager
+
+
+class TestVarredura(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        for relativo in ('b.mp3', 'a.flac', 'capa.jpg', 'x/c.ogg', 'x/y/d.wav', 'x/y/z/e.mp3', 'w/f.MP3'):
+            caminho = os.path.join(self.pasta, relativo)
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            with open(caminho, 'wb') as f:
+                f.write(b'\0' * 10)
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def _relativos(self, entradas):
+        return [os.path.relpath(e.path, self.pasta).replace(os.sep, '/') for e in entradas]
+
+    def test_ordem_e_profundidade(self):
+        self.assertEqual(self._relativos(varrer(self.pasta)),
+                         ['a.flac', 'b.mp3', 'w/f.MP3', 'x/c.ogg', 'x/y/d.wav', 'x/y/z/e.mp3'])
+        self.assertEqual(self._relativos(varrer(self.pasta, profundidade=0)), ['a.flac', 'b.mp3'])
+        self.assertEqual(self._relativos(varrer(self.pasta, profundidade=2))[-1], 'x/y/d.wav')
+
+    def test_entrega_antes_de_terminar_e_reaproveita_stat(self):
+        varredura = Varredura(self.pasta)
+        it = iter(varredura)
+        primeira = next(it)
+        self.assertFalse(varredura.concluida)
+        self.assertEqual(varredura.pastas, 1)
+        self.assertEqual(primeira.stat().st_size, 10)
+        list(it)
+        self.assertTrue(varredura.concluida)
+
+    def test_progresso(self):
+        eventos = []
+        list(varrer(self.pasta, ao_progredir=eventos.append))
+        final = eventos[-1]
+        self.assertTrue(final['concluida'])
+        self.assertEqual((final['pastas'], final['arquivos'], final['musicas']), (5, 7, 6))
+        self.assertGreaterEqual(final['arquivos_por_segundo'], 0)
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "sem links simbólicos")
+    def test_links_simbolicos_sem_ciclos(self):
+        try:
+            os.symlink(self.pasta, os.path.join(self.pasta, 'x', 'volta'))
+        except OSError:
+            self.skipTest("sem permissão para criar links")
+        self.assertEqual(len(list(varrer(self.pasta))), 6)
+        self.assertEqual(len(list(varrer(self.pasta, seguir_links=True))), 6)
+
+    def test_raiz_inexistente(self):
+        with self.assertRaises(OSError):
+            list(varrer(os.path.join(self.pasta, 'nao_existe')))
+
+    def test_playlist_recursiva(self):
+        playlist = PlaylistManager.__new__(PlaylistManager)  # Sem carregar o estado salvo do usuário
+        playlist.playlist_atual = ['anterior.mp3']
+        self.assertEqual(playlist.carregar_diretorio(os.path.join(self.pasta, 'nao_existe')), [])
+        self.assertEqual(playlist.playlist_atual, ['anterior.mp3'])
+        self.assertEqual(len(playlist.carregar_diretorio(self.pasta)), 6)
+        self.assertEqual(len(playlist.carregar_diretorio(self.pasta, profundidade=1)), 4)
+
+        vistas = []
+        playlist.carregar_diretorio(self.pasta, ao_encontrar=lambda c: vistas.append(list(playlist.playlist_atual)))
+        # Cada faixa já está na playlist quando o aviso chega
+        self.assertEqual([len(v) for v in vistas], [1, 2, 3, 4, 5, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()